@@ -7,17 +7,19 @@ alert). This file owns only WHAT is checked and HOW it reads to a human.
 
 from __future__ import annotations
 
+import http.client
 import json
+import math
 import os
 import re
-import socket
+import threading
 import time
 import urllib.error
 import urllib.parse
-import urllib.request
+from functools import partial
 
 import engine
-from engine import Problem
+from engine import Check, Problem
 
 STATE_PATH = "/var/lib/ops-alerts/state.json"
 TIMEOUT = 15
@@ -25,6 +27,42 @@ TIMEOUT = 15
 # it either answers at once or the broker is not there. Kept well under the
 # unit's TimeoutStartSec so a wedged broker cannot stall the whole cycle.
 BROKER_TIMEOUT = 8
+# A wildcard has no count of publishers to wait for. The broker sends every
+# retained match straight after the SUBACK, so a read of one is complete once
+# this long has passed with nothing new arriving.
+RETAINED_SETTLE_SECONDS = 0.5
+
+# The websocket watch (EntityWatch): a ping after this much silence, a reconnect
+# if the ping goes unanswered as long; reconnects back off up to WATCH_RETRY_MAX.
+WATCH_IDLE_SECONDS = 60
+WATCH_RETRY_SECONDS = 5
+WATCH_RETRY_MAX = 300
+
+# The broker tracker (LinkTracker) keeps every link heartbeat's arrival time here,
+# so a restart still knows when hsb1 was last heard from. Rewritten at most once
+# per LINK_INDEX_FLUSH_SECONDS: at 10-minute staleness limits, losing a minute
+# of arrivals to a crash changes nothing.
+LINK_INDEX_PATH = os.path.join(os.path.dirname(STATE_PATH), "links.json")
+LINK_INDEX_FLUSH_SECONDS = 60
+
+# Per-house round-trip times for the latency budget: the last LATENCY_SAMPLES of
+# each kind in LATENCY_KINDS, kept in the state directory so a restart keeps the
+# window. A file of its own, not the engine state: that is the write-ahead record
+# only run_cycle writes, once per cycle, while ping samples arrive from the
+# websocket threads between cycles. Fewer than LATENCY_MIN_SAMPLES say nothing
+# yet -- one slow first request after a restart is a cold connection, not a house
+# in trouble. Like the link index it is rewritten at most once per
+# LATENCY_FLUSH_SECONDS, and once more on the way out: every house's check used
+# to fsync it, several times a cycle.
+LATENCY_PATH = os.path.join(os.path.dirname(STATE_PATH), "latency.json")
+LATENCY_SAMPLES = 48
+LATENCY_MIN_SAMPLES = 8
+LATENCY_FLUSH_SECONDS = 60
+# A websocket ping is one hop through HA's event loop; an /api/template request
+# also renders against the state machine. Each kind keeps its own window and is
+# held to the budget on its own, never mixed into one percentile. Resident, the
+# watch answers the check, so pings are then the only samples a house gives.
+LATENCY_KINDS = {"api": "API requests", "ping": "websocket pings"}
 
 # Substituted by ops-alerts.nix at build time, so the built script holds literals
 # and no runtime data reaches a request URL (CodeQL partial-SSRF, 2026-07-30).
@@ -39,28 +77,353 @@ SMARTHOME_LINKS = json.loads(r"""@SMARTHOME_LINKS_JSON@""")
 ALLOWED_BASE = re.compile(r"^http://100\.(6[4-9]|[7-9]\d|1[01]\d|12[0-7])\.\d{1,3}\.\d{1,3}:8123$")
 
 
-def ha_get(base: str, token: str, path: str):
+# An entity id as Home Assistant writes them. Ids are interpolated into the
+# template below, so anything else is refused rather than quoted.
+ENTITY_ID = re.compile(r"^[a-z0-9_]+\.[a-z0-9_]+$")
+
+# Idle kept-alive connections per house, reused by every cycle a resident poller
+# runs. A request takes one out under the lock and hands it back when the answer
+# is in: a check the engine abandoned at its deadline is still waiting on its
+# connection when the next cycle probes the same house.
+_connections: dict[str, list[http.client.HTTPConnection]] = {}
+_connections_lock = threading.Lock()
+
+
+def ha_request(base: str, token: str, path: str, body: dict | None = None) -> str:
+    """GET (or, with `body`, POST as JSON) an /api/ path and return the response text."""
     if not ALLOWED_BASE.match(base):
         raise ValueError("target base URL is not an allowed tailnet HA address")
     if not path.startswith("/api/"):
         raise ValueError("path must stay under /api/")
-    request = urllib.request.Request(
-        urllib.parse.urljoin(base, path), headers={"Authorization": f"Bearer {token}"}
-    )
-    with urllib.request.urlopen(request, timeout=TIMEOUT) as response:  # noqa: S310
-        return json.loads(response.read().decode())
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = None
+    if body is not None:
+        payload = json.dumps(body).encode()
+        headers["Content-Type"] = "application/json"
+    for attempt in (1, 2):
+        with _connections_lock:
+            idle = _connections.get(base)
+            connection = idle.pop() if idle else None
+        reused = connection is not None
+        if connection is None:
+            parsed = urllib.parse.urlsplit(base)
+            connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=TIMEOUT)
+        try:
+            connection.request("POST" if body is not None else "GET", path, payload, headers)
+            response = connection.getresponse()
+            text = response.read().decode()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            connection.close()
+            # HA closed an idle kept-alive connection before answering: one
+            # retry on a fresh one is safe, a second failure is an outage.
+            if reused and attempt == 1:
+                continue
+            raise
+        except Exception:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            with _connections_lock:
+                _connections.setdefault(base, []).append(connection)
+        if response.status >= 400:
+            raise urllib.error.HTTPError(base + path, response.status, response.reason, response.headers, None)
+        return text
+    raise ConnectionError("connection closed twice in a row")
+
+
+# Houses whose token got 401 from /api/template. Home Assistant serves that
+# endpoint to admin users only (/api/ and /api/states need no more than a valid
+# token), so a non-admin token reads entity by entity instead -- and stops
+# asking for the render after the first refusal.
+_template_refused: set[str] = set()
+
+
+def watched_entities(target: dict) -> list[str]:
+    return [target[key] for key in ("witness", "budgetEntity") if target.get(key)]
+
+
+def ha_states(base: str, token: str, entities: list[str]) -> dict[str, str | None]:
+    """Every watched entity's state in ONE request; None for an entity that does not exist.
+
+    One /api/template render instead of a request per entity, so watching one
+    more entity on a house costs a line of template, not another timeout. A
+    successful render is also the liveness answer: it needs a running core and
+    a valid token. The render needs an admin token; with any other it falls
+    back to /api/ and one /api/states read per entity (_template_refused).
+    """
+    for entity in entities:
+        if not ENTITY_ID.match(entity):
+            raise ValueError("watched entity is not a plain entity id")
+    if base not in _template_refused:
+        # expand() yields nothing for an unknown id, so a missing entity renders
+        # as [] -- different from states(), which would call it "unknown".
+        pairs = ", ".join(f'"{e}": (expand("{e}") | map(attribute="state") | list)' for e in entities)
+        try:
+            rendered = json.loads(
+                ha_request(base, token, "/api/template", {"template": "{{ {%s} | tojson }}" % pairs})
+            )
+        except urllib.error.HTTPError as error:
+            if error.code != 401:
+                raise
+        else:
+            return {e: (rendered.get(e) or [None])[0] for e in entities}
+    # An invalid token is refused here too, and reads as HTTP 401 as before.
+    ha_request(base, token, "/api/")
+    if base not in _template_refused:
+        _template_refused.add(base)
+        print(f"{base}: /api/template needs an admin token; reading entities one by one", flush=True)
+    return {e: ha_entity_state(base, token, e) for e in entities}
+
+
+def ha_entity_state(base: str, token: str, entity: str) -> str | None:
+    """One entity's state over /api/states; None if it does not exist."""
+    try:
+        return json.loads(ha_request(base, token, f"/api/states/{entity}")).get("state")
+    except urllib.error.HTTPError as error:
+        if error.code == 404:
+            return None
+        raise
+
+
+class LatencyRing:
+    """A fixed-size window of round-trip times per house, mirrored to disk.
+
+    Stored as whole milliseconds with a write cursor, so the file stays a few
+    hundred bytes per window however long the poller runs. A window is named
+    "<house>:<kind>" (LATENCY_KINDS); samples come from several threads.
+    """
+
+    def __init__(self, path: str, size: int = LATENCY_SAMPLES) -> None:
+        self.path = path
+        self.size = size
+        self.lock = threading.Lock()
+        self.rings: dict[str, dict] | None = None  # read on first use
+        self.dirty = False
+        self.flushed = 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        with self.lock:
+            ring = self._rings().setdefault(name, {"next": 0, "ms": []})
+            sample = int(round(seconds * 1000))
+            if len(ring["ms"]) < self.size:
+                ring["ms"].append(sample)
+            else:
+                ring["ms"][ring["next"] % self.size] = sample
+            ring["next"] = (ring["next"] + 1) % self.size
+            self.dirty = True
+
+    def p95(self, name: str) -> tuple[float, int] | None:
+        """(95th-percentile seconds, samples) for `name`, or None if too few yet."""
+        with self.lock:
+            samples = sorted(self._rings().get(name, {}).get("ms", []))
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        return samples[math.ceil(0.95 * len(samples)) - 1] / 1000, len(samples)
+
+    def tick(self, now: float) -> None:
+        """Flush, unless the window was written less than LATENCY_FLUSH_SECONDS ago."""
+        with self.lock:
+            if not self.dirty or now - self.flushed < LATENCY_FLUSH_SECONDS:
+                return
+            self.flushed = now  # claimed under the lock: one writer per interval
+        self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return
+            rings = json.loads(json.dumps(self._rings()))
+            self.dirty = False
+        try:
+            engine.atomic_write_state(self.path, {"houses": rings})
+        except OSError as error:
+            print(f"latency window not written ({type(error).__name__}); kept in memory", flush=True)
+
+    def _rings(self) -> dict[str, dict]:
+        if self.rings is None:
+            self.rings = {}
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    raw = json.load(handle)["houses"]
+                for name, ring in raw.items():
+                    if ":" not in name:
+                        continue  # a window from before the kinds were split, both mixed
+                    samples = [int(ms) for ms in ring["ms"]][: self.size]
+                    self.rings[str(name)] = {"next": int(ring["next"]) % self.size, "ms": samples}
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass  # a lost window refills within a few cycles
+        return self.rings
+
+
+LATENCY = LatencyRing(LATENCY_PATH)
+
+
+class EntityWatch:
+    """A live copy of one house's watched entities, pushed over HA's websocket API.
+
+    Resident only (PUSH SOURCES in engine.py). One authenticated connection per
+    house, subscribed to the watched entities and nothing else, so a quiet house
+    sends nothing at all. A witness change sets `wake` and the poller runs a
+    cycle within seconds instead of up to 15 minutes later. While the connection
+    is down -- HA restarting, a bad token, the tailnet gone -- states() returns
+    None and the check polls /api/template exactly as in timer mode, so losing
+    the push never loses the liveness check.
+    """
+
+    def __init__(self, target: dict, token: str, wake) -> None:
+        if not ALLOWED_BASE.match(target["url"]):
+            raise ValueError("target base URL is not an allowed tailnet HA address")
+        self.url = "ws" + target["url"][len("http") :] + "/api/websocket"
+        self.name = target["name"]
+        self.token = token
+        self.entities = watched_entities(target)
+        self.witness = target.get("witness")
+        self.wake = wake
+        self.lock = threading.Lock()
+        self.live: dict[str, str] | None = None
+        self.stopped = threading.Event()
+        self.connection = None
+        threading.Thread(target=self._run, name=f"ha-watch:{self.name}", daemon=True).start()
+
+    def states(self) -> dict[str, str | None] | None:
+        """The watched entities' latest states, or None while not subscribed."""
+        with self.lock:
+            if self.live is None:
+                return None
+            return {e: self.live.get(e) for e in self.entities}
+
+    def close(self) -> None:
+        """Stop watching; the thread ends at its next wake-up."""
+        self.stopped.set()
+        if self.connection is not None:
+            self.connection.abort()
+
+    def _run(self) -> None:
+        delay = WATCH_RETRY_SECONDS
+        while not self.stopped.is_set():
+            began = time.monotonic()
+            try:
+                self._session()
+            except Exception as error:  # noqa: BLE001 - every failure means "reconnect"
+                if self.stopped.is_set():
+                    return
+                print(f"{self.name}: websocket watch lost ({type(error).__name__}); polling meanwhile", flush=True)
+            with self.lock:
+                self.live = None
+            # A session that lasted resets the back-off; a flapping one doubles it.
+            if time.monotonic() - began > WATCH_RETRY_MAX:
+                delay = WATCH_RETRY_SECONDS
+            else:
+                delay = min(2 * delay, WATCH_RETRY_MAX)
+            self.stopped.wait(delay)
+
+    def _session(self) -> None:
+        import websocket
+
+        connection = self.connection = websocket.create_connection(self.url, timeout=TIMEOUT)
+        try:
+            if json.loads(connection.recv()).get("type") != "auth_required":
+                raise ConnectionError("no auth_required greeting")
+            connection.send(json.dumps({"type": "auth", "access_token": self.token}))
+            if json.loads(connection.recv()).get("type") != "auth_ok":
+                raise PermissionError("token refused")
+            connection.send(json.dumps({"id": 1, "type": "subscribe_entities", "entity_ids": self.entities}))
+            connection.settimeout(WATCH_IDLE_SECONDS)
+            waiting = False  # a ping is out and unanswered
+            pinged = time.monotonic()
+            ping = 1  # message ids must increase; 1 was the subscription
+            while True:
+                try:
+                    message = json.loads(connection.recv())
+                except websocket.WebSocketTimeoutException:
+                    # Silence is normal for a quiet house; silence after a ping
+                    # is a dead connection that TCP alone might not notice for hours.
+                    if waiting:
+                        raise
+                    message = None
+                waiting = False
+                if message is not None and message.get("type") == "pong" and message.get("id") == ping:
+                    # The round trip through HA's event loop: the latency sample
+                    # for a house whose check no longer needs a request.
+                    LATENCY.add(f"{self.name}:ping", time.monotonic() - pinged)
+                if message is None or time.monotonic() - pinged >= WATCH_IDLE_SECONDS:
+                    ping += 1
+                    connection.send(json.dumps({"id": ping, "type": "ping"}))
+                    pinged = time.monotonic()
+                    waiting = message is None
+                if message is None:
+                    continue
+                if message.get("type") == "result" and not message.get("success"):
+                    raise ConnectionError(f"subscription refused: {message.get('error')}")
+                if message.get("type") == "event":
+                    self._apply(message.get("event") or {})
+        finally:
+            connection.close()
+
+    def _apply(self, event: dict) -> None:
+        """Fold one subscribe_entities event in: a(dded), c(hanged), r(emoved)."""
+        with self.lock:
+            before = dict(self.live or {})
+            live = dict(before)
+            for entity, state in (event.get("a") or {}).items():
+                live[entity] = state.get("s")
+            for entity, diff in (event.get("c") or {}).items():
+                if "s" in diff.get("+", {}):
+                    live[entity] = diff["+"]["s"]
+            for entity in event.get("r") or []:
+                live.pop(entity, None)
+            first = self.live is None
+            self.live = live
+        # Only the witness is urgent. The budget counter ticks with every billed
+        # poll and crossing its monthly limit can wait for the next slot.
+        if not first and self.witness and live.get(self.witness) != before.get(self.witness):
+            self.wake.set()
+
+
+# name -> EntityWatch; filled only by a resident poller (see main()).
+WATCHES: dict[str, EntityWatch] = {}
+
+
+def start_watches(wake) -> bool:
+    """Open one websocket watch per house that has entities to watch, and one
+    tracking session per broker the smart-home links go through."""
+    for target in TARGETS:
+        token = os.environ.get(target["tokenVar"], "")
+        if token and watched_entities(target):
+            WATCHES[target["name"]] = EntityWatch(target, token, wake)
+    user = os.environ.get("MQTT_USER", "")
+    password = os.environ.get("MQTT_PASS", "")
+    if user and password:
+        for (host, port), links in broker_sessions(SMARTHOME_LINKS).items():
+            TRACKERS[(host, port)] = LinkTracker(host, port, links, user, password, wake).start()
+    return bool(WATCHES or TRACKERS)
 
 
 def check_home_assistant(target: dict) -> list[Problem]:
+    """Liveness, the integration witness and the Tesla budget -- one round trip.
+
+    The budget counter is monthly and used to run as its own hourly
+    budget:<house> check (CADENCE in engine.py) to save a request. Read in the
+    same render it costs nothing, so it is checked every cycle again; the
+    cadence stays for checks whose answer still costs a request of its own.
+    """
     name = target["name"]
     token = os.environ.get(target["tokenVar"], "")
     if not token:
         return [Problem(f"{name}:token", f"{name}: no API token in the environment")]
 
     # 1. Is Home Assistant answering at all? The check no in-HA automation can
-    #    ever perform on itself.
+    #    ever perform on itself. A live websocket subscription already says so,
+    #    and holds the states too -- no request needed.
+    watch = WATCHES.get(name)
+    states = watch.states() if watch else None
     try:
-        ha_get(target["url"], token, "/api/")
+        if states is None:
+            began = time.monotonic()
+            states = ha_states(target["url"], token, watched_entities(target))
+            LATENCY.add(f"{name}:api", time.monotonic() - began)
     except urllib.error.HTTPError as error:
         return [Problem(f"{name}:api", f"{name}: HA API returned HTTP {error.code}")]
     except Exception as error:  # noqa: BLE001 - any failure here means unreachable
@@ -74,54 +437,77 @@ def check_home_assistant(target: dict) -> list[Problem]:
     #    so a parked car reports 'unknown' for hours.
     witness = target.get("witness")
     if witness:
-        try:
-            state = ha_get(target["url"], token, f"/api/states/{witness}").get("state")
-            if state == "unavailable":
-                found.append(
-                    Problem(
-                        f"{name}:entry",
-                        f"{name}: Tesla integration not loaded ({witness} is unavailable). "
-                        f"The self-heal automation should reload it within the hour.",
-                    )
-                )
-        except Exception as error:  # noqa: BLE001
+        state = states[witness]
+        if state is None:
+            found.append(Problem(f"{name}:entry", f"{name}: cannot read {witness} (no such entity)"))
+        elif state == "unavailable":
             found.append(
-                Problem(f"{name}:entry", f"{name}: cannot read {witness} ({type(error).__name__})")
+                Problem(
+                    f"{name}:entry",
+                    f"{name}: Tesla integration not loaded ({witness} is unavailable). "
+                    f"The self-heal automation should reload it within the hour.",
+                )
             )
 
     # 3. Is the Fleet API budget burning faster than planned?
     budget = target.get("budgetEntity")
     if budget:
         try:
-            used = int(float(ha_get(target["url"], token, f"/api/states/{budget}").get("state")))
-            limit = target.get("budgetLimit", 0)
-            if used > limit:
-                found.append(
-                    Problem(
-                        f"{name}:budget",
-                        f"{name}: Tesla API budget at {used} billed polls this month "
-                        f"(threshold {limit}). Check that built-in polling was not "
-                        f"re-enabled and that no new vehicle joined the account.",
-                    )
+            used = int(float(states[budget]))  # type: ignore[arg-type]
+        except (TypeError, ValueError):  # a missing counter is not an outage
+            used = None
+        limit = target.get("budgetLimit", 0)
+        if used is not None and used > limit:
+            found.append(
+                Problem(
+                    f"{name}:budget",
+                    f"{name}: Tesla API budget at {used} billed polls this month "
+                    f"(threshold {limit}). Check that built-in polling was not "
+                    f"re-enabled and that no new vehicle joined the account.",
                 )
-        except Exception:  # noqa: BLE001 - a missing counter is not an outage
-            pass
+            )
 
+    # 4. Is it answering, but slowly? A house that takes 12 s is one step from
+    #    the 15 s timeout; a recorder purge or a dying SD card looks like this
+    #    for days before the API stops answering at all.
+    found += check_latency(target)
     return found
 
 
+def check_latency(target: dict) -> list[Problem]:
+    """Each kind's rolling p95 round trip against the house's latencyBudgetSeconds."""
+    LATENCY.tick(time.time())
+    name = target["name"]
+    budget = target.get("latencyBudgetSeconds")
+    if not budget:
+        return []
+    slow = []
+    for kind, label in LATENCY_KINDS.items():
+        window = LATENCY.p95(f"{name}:{kind}")
+        if window is not None and window[0] > budget:
+            slow.append(f"p95 {window[0]:.1f} s over the last {window[1]} {label}")
+    if not slow:
+        return []
+    return [
+        Problem(
+            f"{name}:latency",
+            f"{name}: HA answers slowly -- {'; '.join(slow)} (budget {budget} s). Look for a "
+            f"recorder purge, a full or failing disk, or an integration blocking the event "
+            f"loop before it stops answering.",
+        )
+    ]
+
+
 def check_peer(peer: dict) -> list[Problem]:
     """Is the peer host's poller still running? See heartbeat.nix for the design.
 
     A host cannot detect its own death, so csb0 and csb1 check each other. The
-    heartbeat is the peer's state-file mtime, served as one integer over the
-    tailnet.
+    heartbeat says when the peer's poller last finished a cycle and, from a v2
+    server, since when one of its alerts has been waiting for delivery.
     """
     name = peer["name"]
     try:
-        with socket.create_connection((peer["address"], peer["port"]), timeout=TIMEOUT) as sock:
-            raw = sock.recv(64).decode().strip()
-        stamp = float(raw)
+        beat = engine.read_heartbeat(peer["address"], peer["port"], TIMEOUT)
     except Exception as error:  # noqa: BLE001
         return [
             Problem(
@@ -132,10 +518,10 @@ def check_peer(peer: dict) -> list[Problem]:
             )
         ]
 
-    if stamp <= 0:
+    if beat.at <= 0:
         return [Problem(f"peer:{name}", f"{name}: poller has never recorded a run")]
 
-    age = int(time.time() - stamp)
+    age = int(time.time() - beat.at)
     if age > peer["maxAgeSeconds"]:
         return [
             Problem(
@@ -144,50 +530,92 @@ def check_peer(peer: dict) -> list[Problem]:
                 f"(limit {peer['maxAgeSeconds'] // 60} min). Its alerts are not firing.",
             )
         ]
+    # Running but wedged: cycles happen, yet an alert has waited longer than a
+    # stopped poller would be allowed to. A legacy heartbeat cannot say.
+    waited = int(time.time() - beat.pending) if beat.pending else 0
+    if waited > peer["maxAgeSeconds"]:
+        return [
+            Problem(
+                f"peer:{name}:delivery",
+                f"{name}: poller is running but an alert has waited {waited // 60} min "
+                f"for delivery (limit {peer['maxAgeSeconds'] // 60} min). Its alerts "
+                f"are not reaching anyone.",
+            )
+        ]
     return []
 
 
-def read_retained(host: str, port: int, user: str, password: str, topic: str, timeout: int):
-    """Return the retained payload on `topic`, or None if none is set.
+def read_retained_many(
+    host: str, port: int, user: str, password: str, topics: list[str], timeout: float
+) -> dict[str, bytes]:
+    """Return the retained payload of every topic that has one, in ONE broker session.
 
     A retained message is delivered the instant we subscribe, so this is a
-    bounded read, not a wait for the next publish. Returning None means the
-    broker answered and has nothing retained there -- a different fact from the
-    broker being unreachable, and the caller reports them differently.
+    bounded read, not a wait for the next publish: it returns as soon as every
+    topic has answered, or at `timeout` with whatever has. A topic missing from
+    the result means the broker answered and has nothing retained there -- a
+    different fact from the broker being unreachable (which raises), and the
+    caller reports them differently.
+
+    Results are keyed by the topic each message arrived on. A wildcard cannot
+    say how many publishers it has, so it is answered only once the broker has
+    gone RETAINED_SETTLE_SECONDS without sending another match -- stopping at
+    the first would drop the rest, and their keys would flap between cycles.
     """
     import paho.mqtt.client as mqtt
 
+    wanted = set(topics)
+    exact = {pattern for pattern in wanted if not set(pattern.split("/")) & {"+", "#"}}
     received: dict[str, bytes] = {}
+    last: list[float] = []  # when the SUBACK or the latest message came
 
     def on_connect(client, userdata, flags, reason_code, properties=None):
-        client.subscribe(topic, qos=0)
+        client.subscribe([(topic, 0) for topic in sorted(wanted)])
+
+    def on_subscribe(client, userdata, mid, reason_codes, properties=None):
+        last[:] = [time.monotonic()]
 
     def on_message(client, userdata, message):
-        received["payload"] = message.payload
+        # The retained copy arrives first; a live publish racing it is no fresher
+        # in any way that matters here.
+        if any(topic_matches(pattern, message.topic) for pattern in wanted):
+            received.setdefault(message.topic, message.payload)
+            last[:] = [time.monotonic()]
+
+    def answered() -> bool:
+        if not all(any(topic_matches(pattern, topic) for topic in received) for pattern in exact):
+            return False
+        return wanted == exact or bool(last) and time.monotonic() - last[0] >= RETAINED_SETTLE_SECONDS
 
     client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id="ops-alerts-probe")
     client.username_pw_set(user, password)
     client.on_connect = on_connect
+    client.on_subscribe = on_subscribe
     client.on_message = on_message
     client.connect(host, port, keepalive=30)
-    deadline = time.time() + timeout
+    deadline = time.monotonic() + timeout
     try:
-        while time.time() < deadline and "payload" not in received:
-            client.loop(timeout=0.5)
+        while time.monotonic() < deadline and not answered():
+            client.loop(timeout=min(RETAINED_SETTLE_SECONDS / 5, max(deadline - time.monotonic(), 0)))
     finally:
         try:
             client.disconnect()
         except Exception:  # noqa: BLE001 - teardown must not mask the result
             pass
-    return received.get("payload")
+    return received
+
 
+def check_smarthome_links(links: list[dict]) -> list[Problem]:
+    """Is the smart-home command path from this host to each house still carrying traffic?
 
-def check_smarthome_link(link: dict) -> list[Problem]:
-    """Is the smart-home command path from this host to hsb1 still carrying traffic?
+    Every link here goes through the same broker, so all of their heartbeats
+    are read in one session: adding a house costs a topic, not a connection. A
+    resident poller keeps that session open (LinkTracker) and this answers from
+    its index with no I/O at all; the read below is the fallback while it is down.
 
-    hsb1's Node-RED publishes a retained timestamp every 60s THROUGH this broker.
-    That is the same hop every Telegram /zufahrt takes, so the heartbeat goes
-    stale for the same reasons a real command would be dropped.
+    Each house's Node-RED publishes a retained timestamp every 60s THROUGH this
+    broker. That is the same hop every Telegram /zufahrt takes, so the heartbeat
+    goes stale for the same reasons a real command would be dropped.
 
     Why this check exists: on 2026-07-29 hsb1's container lost DNS and could no
     longer re-resolve mosquitto.barta.cm to reconnect here. Every access-gate
@@ -196,25 +624,65 @@ def check_smarthome_link(link: dict) -> list[Problem]:
     check green (OPS-113/OPS-115). A check that only proved 'Node-RED is up'
     would have stayed green throughout; this one would not.
     """
-    name = link["name"]
     user = os.environ.get("MQTT_USER", "")
     password = os.environ.get("MQTT_PASS", "")
     if not user or not password:
-        return [Problem(f"link:{name}", f"{name}: no broker credentials in the environment")]
+        return [
+            Problem(f"link:{link['name']}", f"{link['name']}: no broker credentials in the environment")
+            for link in links
+        ]
 
+    tracker = TRACKERS.get((links[0]["host"], links[0]["port"]))
+    seen = tracker.seen() if tracker else None
+    if seen is not None:
+        return judge_links(links, seen, time.time())
     try:
-        payload = read_retained(
-            link["host"], link["port"], user, password, link["topic"], BROKER_TIMEOUT
+        payloads = read_retained_many(
+            links[0]["host"], links[0]["port"], user, password, [link["topic"] for link in links], BROKER_TIMEOUT
         )
     except Exception as error:  # noqa: BLE001 - any failure here means we cannot tell
         return [
             Problem(
-                f"link:{name}",
-                f"{name}: cannot read the local MQTT broker ({type(error).__name__}). "
+                f"link:{link['name']}",
+                f"{link['name']}: cannot read the local MQTT broker ({type(error).__name__}). "
                 f"Smart-home command delivery is unverifiable, not necessarily broken.",
             )
+            for link in links
         ]
+    return judge_links(links, {topic: (None, payload) for topic, payload in payloads.items()}, time.time())
+
+
+def judge_links(links: list[dict], seen: dict[str, tuple], now: float) -> list[Problem]:
+    """Every link's verdict from `seen`: topic -> (arrival time or None, payload).
+
+    A wildcard link is judged per publisher, each under its own key, so one
+    house going quiet is not hidden by another that is still talking.
+    """
+    found: list[Problem] = []
+    for link in links:
+        heard = sorted(topic for topic in seen if topic_matches(link["topic"], topic))
+        if not heard:
+            found += judge_link(link, None, now=now)
+        for topic in heard:
+            publisher = link
+            if topic != link["topic"]:
+                publisher = {**link, "name": f"{link['name']} ({topic})", "topic": topic}
+            arrived, payload = seen[topic]
+            found += judge_link(publisher, payload, arrived, now)
+    return found
+
 
+def judge_link(
+    link: dict, payload: bytes | None, arrived: float | None = None, now: float | None = None
+) -> list[Problem]:
+    """One link's verdict from its heartbeat (None: nothing retained).
+
+    Age runs from `arrived`, when the message actually reached this host, so
+    silence is measured as the broker's subscribers saw it, broker-side delays
+    included. A retained copy read on subscribe has no arrival time and is dated
+    by its own timestamp.
+    """
+    name = link["name"]
     if payload is None:
         return [
             Problem(
@@ -236,7 +704,7 @@ def check_smarthome_link(link: dict) -> list[Problem]:
     if stamp > 1e12:
         stamp /= 1000.0
 
-    age = int(time.time() - stamp)
+    age = int((time.time() if now is None else now) - (stamp if arrived is None else arrived))
     if age > link["maxAgeSeconds"]:
         return [
             Problem(
@@ -250,15 +718,209 @@ def check_smarthome_link(link: dict) -> list[Problem]:
     return []
 
 
+def broker_sessions(links: list[dict]) -> dict[tuple[str, int], list[dict]]:
+    """Links grouped by the broker they are read through; one session each.
+
+    Credentials are the unit's one MQTT_USER / MQTT_PASS pair, so the broker
+    address alone decides who can share a session.
+    """
+    sessions: dict[tuple[str, int], list[dict]] = {}
+    for link in links:
+        sessions.setdefault((link["host"], link["port"]), []).append(link)
+    return sessions
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """MQTT subscription matching: `+` is one level, a trailing `#` the rest."""
+    wanted = pattern.split("/")
+    levels = topic.split("/")
+    for index, level in enumerate(wanted):
+        if level == "#":
+            return True
+        if index >= len(levels) or level not in ("+", levels[index]):
+            return False
+    return len(levels) == len(wanted)
+
+
+class LinkTracker:
+    """One broker session held open on every link topic, with a last-seen index.
+
+    Resident only (PUSH SOURCES in engine.py), the MQTT counterpart of
+    EntityWatch. Each message is recorded with the time it arrived, so
+    check_smarthome_links answers from memory and judges silence from real
+    arrivals. The index is mirrored to LINK_INDEX_PATH and read back on start,
+    so a restart does not forget that hsb1 already went quiet.
+
+    A link crossing maxAgeSeconds -- or coming back -- sets `wake`, so the
+    OPS-115 failure mode starts a cycle minutes after the last real message
+    instead of at the next 15-minute slot. While the session is down seen()
+    returns None and the check reads the broker as in timer mode.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        links: list[dict],
+        user: str,
+        password: str,
+        wake,
+        index_path: str = LINK_INDEX_PATH,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.links = links
+        self.user = user
+        self.password = password
+        self.wake = wake
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        self.index = self._load()
+        self.live = False
+        self.dirty = False
+        self.flushed = 0.0
+        self.stale: set[str] | None = None
+        self.stopped = threading.Event()
+
+    def start(self) -> "LinkTracker":
+        threading.Thread(target=self._run, name=f"mqtt-track:{self.host}:{self.port}", daemon=True).start()
+        return self
+
+    def seen(self) -> dict[str, tuple] | None:
+        """topic -> (arrival time or None, payload), or None while not subscribed."""
+        with self.lock:
+            if not self.live:
+                return None
+            return {topic: (arrived, payload.encode()) for topic, (arrived, payload) in self.index.items()}
+
+    def close(self) -> None:
+        """Stop tracking; the thread ends within a second."""
+        self.stopped.set()
+
+    def record(self, topic: str, payload: bytes, retained: bool, now: float) -> None:
+        """Fold one message in. A retained copy is not an arrival: it keeps the
+        arrival time the index already has for that topic, if any."""
+        if not any(topic_matches(link["topic"], topic) for link in self.links):
+            return
+        text = payload.decode(errors="replace")
+        with self.lock:
+            arrived = self.index.get(topic, (None, ""))[0] if retained else now
+            if retained and self.index.get(topic, (None, ""))[1] != text:
+                arrived = None  # published while we were away; its own stamp is all we know
+            self.index[topic] = (arrived, text)
+            self.dirty = True
+
+    def tick(self, now: float) -> None:
+        """Wake the poller when the set of stale links changes; flush the index."""
+        seen = self.seen()
+        if seen is not None:
+            stale = {problem.key for problem in judge_links(self.links, seen, now)}
+            if self.stale is not None and stale != self.stale:
+                self.wake.set()
+            self.stale = stale
+        if self.dirty and now - self.flushed >= LINK_INDEX_FLUSH_SECONDS:
+            self.flush(now)
+
+    def flush(self, now: float) -> None:
+        with self.lock:
+            index = {topic: [arrived, payload] for topic, (arrived, payload) in self.index.items()}
+            self.dirty = False
+        try:
+            engine.atomic_write_state(self.index_path, {"topics": index})
+        except OSError as error:
+            print(f"link index not written ({type(error).__name__}); kept in memory", flush=True)
+        self.flushed = now
+
+    def _load(self) -> dict[str, tuple]:
+        try:
+            with open(self.index_path, encoding="utf-8") as handle:
+                raw = json.load(handle)["topics"]
+            return {str(topic): (entry[0], str(entry[1])) for topic, entry in raw.items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, IndexError):
+            return {}
+
+    def _run(self) -> None:
+        delay = WATCH_RETRY_SECONDS
+        while not self.stopped.is_set():
+            began = time.monotonic()
+            try:
+                self._session()
+            except Exception as error:  # noqa: BLE001 - every failure means "reconnect"
+                print(
+                    f"{self.host}:{self.port}: broker session lost ({type(error).__name__}); polling meanwhile",
+                    flush=True,
+                )
+            with self.lock:
+                self.live = False
+            self.stale = None
+            if time.monotonic() - began > WATCH_RETRY_MAX:
+                delay = WATCH_RETRY_SECONDS
+            else:
+                delay = min(2 * delay, WATCH_RETRY_MAX)
+            self.stopped.wait(delay)
+        if self.dirty:
+            self.flush(time.time())
+
+    def _session(self) -> None:
+        import paho.mqtt.client as mqtt
+
+        def on_connect(client, userdata, flags, reason_code, properties=None):
+            if reason_code.is_failure:
+                return  # loop() reports the refusal
+            client.subscribe(sorted({(link["topic"], 0) for link in self.links}))
+
+        def on_subscribe(client, userdata, mid, reason_codes, properties=None):
+            with self.lock:
+                self.live = True
+
+        def on_message(client, userdata, message):
+            self.record(message.topic, message.payload, bool(message.retain), time.time())
+
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id="ops-alerts-tracker")
+        client.username_pw_set(self.user, self.password)
+        client.on_connect = on_connect
+        client.on_subscribe = on_subscribe
+        client.on_message = on_message
+        client.connect(self.host, self.port, keepalive=30)
+        try:
+            while not self.stopped.is_set():
+                code = client.loop(timeout=1.0)
+                if code != mqtt.MQTT_ERR_SUCCESS:
+                    raise ConnectionError(mqtt.error_string(code))
+                self.tick(time.time())
+        finally:
+            try:
+                client.disconnect()
+            except Exception:  # noqa: BLE001 - teardown must not mask the cause
+                pass
+
+
+# (host, port) -> LinkTracker; filled only by a resident poller (see main()).
+TRACKERS: dict[tuple[str, int], LinkTracker] = {}
+
+
+def checks() -> list[Check]:
+    """Every probe, independent of the others, so the engine can run them side by side.
+
+    A Home Assistant check is one request, retried once on a kept-alive
+    connection the server dropped, so it gets two timeouts' worth of deadline;
+    the broker probe is bounded far tighter.
+    """
+    return (
+        [
+            Check(f"ha:{t['name']}", partial(check_home_assistant, t), deadline=2 * TIMEOUT + 5)
+            for t in TARGETS
+        ]
+        + [Check(f"peer:{p['name']}", partial(check_peer, p)) for p in PEERS]
+        + [
+            Check(f"links:{host}:{port}", partial(check_smarthome_links, links), deadline=BROKER_TIMEOUT + 5)
+            for (host, port), links in broker_sessions(SMARTHOME_LINKS).items()
+        ]
+    )
+
+
 def collect() -> list[Problem]:
-    found: list[Problem] = []
-    for target in TARGETS:
-        found.extend(check_home_assistant(target))
-    for peer in PEERS:
-        found.extend(check_peer(peer))
-    for link in SMARTHOME_LINKS:
-        found.extend(check_smarthome_link(link))
-    return found
+    return engine.gather(checks())
 
 
 def render(announced: list[str], cleared: list[str]) -> str:
@@ -280,9 +942,33 @@ def main() -> int:
     ):
         print("telegram credentials missing or malformed", flush=True)
         return engine.EXIT_UNDELIVERED
-    return engine.run_cycle(
-        STATE_PATH, time.time(), collect, render, engine.telegram_sender(token, chat)
-    )
+    sender = engine.telegram_sender(token, chat)
+    probes = checks()
+    # Fast confirm: a new problem is re-probed a minute later in the same run and
+    # pages then, instead of waiting out the 15-minute timer. The 120 s budget
+    # covers first probe, settle and re-probe, and leaves delivery and the commit
+    # well inside one 15-minute slot.
+    # Resident, each house also pushes its watched entities (EntityWatch) and the
+    # broker its link heartbeats (LinkTracker); a change starts a cycle at once
+    # instead of at the next slot.
+    stop = threading.Event()
+    try:
+        return engine.run_or_serve(
+            lambda: engine.run_cycle(
+                STATE_PATH,
+                time.time(),
+                probes,
+                render,
+                sender,
+                budget=120,
+                confirm_after=engine.FAST_CONFIRM_SECONDS,
+                stop=stop,
+            ),
+            push=start_watches,
+            stop=stop,
+        )
+    finally:
+        LATENCY.flush()  # whatever the last interval added
 
 
 if __name__ == "__main__":
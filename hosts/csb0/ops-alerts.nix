@@ -28,7 +28,11 @@
 #     and every existing problem re-announced on the next run
 #
 # Exit 2 means "could not deliver". SuccessExitStatus keeps 0 and 1 as success, so
-# an undeliverable alert deliberately shows up in `systemctl --failed` too.
+# an undeliverable alert deliberately shows up in `systemctl --failed` too. The
+# poller went resident for the websocket watch and keeps that contract: a
+# delivery still wedged one interval after it first failed exits 2 (RESIDENT
+# MODE in engine.py), the unit stays failed, and the timer starts it again one
+# interval later. csb1 also sees the wedge through the v2 heartbeat.
 #
 # WHY NOT UPTIME KUMA (it runs on this very host)
 # ==============================================
@@ -53,6 +57,19 @@ let
   # `unavailable` ONLY. `unknown` is what a healthy but SLEEPING car reports,
   # because tesla_fleet sets updated_once only after a successful vehicle_data
   # fetch -- alerting on it would fire permanently on a parked car.
+  #
+  # Liveness, the witness and the budget counter come back from ONE /api/template
+  # request per house, so watching another entity costs no extra request. Home
+  # Assistant renders templates for ADMIN users only: make each HA_TOKEN_* a
+  # long-lived token of an admin user. A non-admin token still works -- the
+  # poller falls back to /api/ plus one /api/states read per entity and logs it
+  # -- but pays a request per watched entity again.
+  #
+  # latencyBudgetSeconds = the p95 round trip (requests and websocket pings,
+  # last 48) above which the house pages as slow. A third of the 15 s timeout:
+  # a healthy house answers in well under a second, so crossing it means real
+  # trouble -- a recorder purge, a dying SD card -- while there is still room
+  # before the API stops answering. hsb9 sits behind a foreign LAN's uplink.
   targets = [
     {
       name = "hsb1";
@@ -61,6 +78,7 @@ let
       witness = "binary_sensor.model_x_markus_status";
       budgetEntity = "counter.tesla_x_month";
       budgetLimit = 1920; # 80% of the Model X's 2400/month cap
+      latencyBudgetSeconds = 5;
     }
     {
       name = "hsb8";
@@ -69,6 +87,7 @@ let
       witness = "binary_sensor.my_status";
       budgetEntity = "counter.tesla_y_month";
       budgetLimit = 480; # 80% of the Model Y's 600/month cap
+      latencyBudgetSeconds = 5;
     }
     {
       # No Tesla integration here yet (OPS-80 — needs the in-laws present). Still
@@ -77,6 +96,7 @@ let
       name = "hsb9";
       url = "http://100.64.0.12:8123";
       tokenVar = "HA_TOKEN_HSB9";
+      latencyBudgetSeconds = 8;
     }
   ];
 
@@ -113,10 +133,14 @@ let
     }
   ];
 
-  # paho-mqtt only for the OPS-115 probe. Everything else here is stdlib on
-  # purpose; a protocol implementation is the one place where hand-rolling the
-  # bytes would be worse than the dependency.
-  pollerPython = pkgs.python3.withPackages (ps: [ ps.paho-mqtt ]);
+  # paho-mqtt only for the OPS-115 link tracker, websocket-client only for the Home
+  # Assistant push watch. Everything else here is stdlib on purpose; a protocol
+  # implementation is the one place where hand-rolling the bytes would be worse
+  # than the dependency.
+  pollerPython = pkgs.python3.withPackages (ps: [
+    ps.paho-mqtt
+    ps.websocket-client
+  ]);
 
   poller = fleetLib.mkPoller {
     name = "ops-alerts";
@@ -139,9 +163,18 @@ in
     description = "Fleet alert poller — watch all HA instances, report to Telegram (OPS-104)";
     after = [ "network-online.target" ];
     wants = [ "network-online.target" ];
+    # Resident (RESIDENT MODE in engine.py): the process holds one Home Assistant
+    # websocket per house, so an integration going `unavailable` starts a cycle
+    # within seconds instead of waiting up to 15 minutes for the next poll. It
+    # also keeps the broker session open on the link heartbeats (LinkTracker),
+    # so a silent hsb1 pages minutes after its last message, and the last-seen
+    # index in the StateDirectory (links.json) carries over a restart.
+    environment.FLEET_ALERTS_SERVE_SECONDS = toString (15 * 60);
     serviceConfig = {
-      Type = "oneshot";
+      Type = "simple";
       ExecStart = "${pollerPython}/bin/python3 ${poller}/checks.py";
+      Restart = "always";
+      RestartSec = "30s";
       # HA tokens + Telegram credentials. systemd reads this directly, so the
       # values never pass through a shell or a command line.
       # Second file adds MQTT_USER / MQTT_PASS for the OPS-115 broker probe. Kept
@@ -156,30 +189,31 @@ in
       StateDirectoryMode = "0700";
       # 0 = clean, 1 = problems found (both are a successful RUN); 2 = could not
       # deliver, which must fail the unit so it is visible in systemctl --failed.
+      # Resident, that is bad Telegram credentials or a delivery wedged for an
+      # interval. Restart = "always" would hide it behind an auto-restart, so
+      # exit 2 is left failed and the timer below retries it.
       SuccessExitStatus = [
         0
         1
       ];
+      RestartPreventExitStatus = [ 2 ];
       PrivateTmp = true;
       ProtectHome = true;
       ProtectSystem = "strict";
       NoNewPrivileges = true;
-      TimeoutStartSec = "180";
     };
   };
 
+  # Starts the resident poller; its 15-minute schedule is its own now. After an
+  # undeliverable exit it starts it again 15 minutes on, as the oneshot timer did.
   systemd.timers.ops-alerts = {
-    description = "Fleet alert poller schedule (OPS-104)";
+    description = "Fleet alert poller start after boot (OPS-104)";
     wantedBy = [ "timers.target" ];
     timerConfig = {
-      # 15 min: fast enough that a dead integration is caught within the hour,
-      # slow enough to stay quiet.
-      OnCalendar = "*:0/15";
       # Not immediately at boot — the network and tailnet must come up first, or
       # the first run reports the entire fleet down.
       OnBootSec = "5min";
-      RandomizedDelaySec = "60";
-      Persistent = true;
+      OnUnitInactiveSec = "15min";
     };
   };
 }
@@ -193,6 +193,7 @@ in
     ./tailnet-watch.nix # OPS-181: page when this host's tailnet view is persistently broken
     ./fleet-drift.nix # OPS-187: page when a fleet host's deployed nixcfg is persistently behind main (reads pharosd's store)
     ../../modules/shared/fleet-alerts/heartbeat.nix # OPS-107: let csb0 see this poller is alive
+    ../../modules/shared/fleet-alerts/host-runner.nix # OPS-107: peer-watch, tailnet-watch and fleet-drift in one process
     ./hardware-configuration.nix
     ./disk-config.zfs.nix
     ./hausv-alerts.nix
@@ -217,6 +218,11 @@ in
     ../../modules/shared/ssh-authorized-nixos.nix
   ];
 
+  # OPS-107 — peer-watch, tailnet-watch and fleet-drift run in one resident
+  # fleet-alerts-host process instead of three timer units (host-runner.nix).
+  # Set false to fall back to the per-poller units; state carries over either way.
+  nixcfg.fleetAlerts.hostRunner.enable = true;
+
   # OPS-116 — the container stack, rendered from Nix into the closure.
   #
   # 🟡 reconcile = false while this host is prepared: the spec lands in /etc and
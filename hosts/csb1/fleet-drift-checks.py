@@ -16,18 +16,32 @@ in the local nixcfg checkout, best effort) or it is at least MAX_COMMITS behind.
 are skipped — Pharos' own HostDown incident covers them. Hosts whose beacon
 carries no evidence are skipped (nothing to judge).
 
+Where a beacon leaves out `commits_behind` (or its comparison altogether), the
+count and the relation come from CommitGraph: main's history in the checkout
+with parent links and generation numbers, extended with only the commits added
+since the last cycle, answered in-process for every host.
+
+Commit dates never change, so each is asked of the checkout once: whatever
+revisions are new this cycle go to one `git cat-file --batch`, and the answers
+are kept in commits.json next to the state (CommitTimes). It used to run
+`git log -1` per host on every cycle.
+
 Depends on OPS-186 (beacons must see the CURRENT evidence; before that fix the
 numbers lag the beacon container's start time).
 """
 
 from __future__ import annotations
 
+import bisect
+import heapq
 import json
+import os
+import re
 import subprocess
 import time
 
 import engine
-from engine import Problem
+from engine import Check, Problem
 
 STATE_PATH = "/var/lib/fleet-drift/state.json"
 NOTIFICATION_ENV = "@NOTIFICATION_ENV@"
@@ -37,6 +51,19 @@ GIT = "@GIT_BIN@"
 MAX_AGE_DAYS = 7
 MAX_COMMITS = 25
 STALE_SECONDS = 30 * 60
+# Just under the hourly cycle, so a jittered slot never finds it not quite due.
+SAFETY_NET_SECONDS = 55 * 60
+# Commit timestamps never change, so each one is asked of git once and kept
+# (CommitTimes). Bounded: the least recently judged revisions go first, and
+# COMMITS_MAX is far more than the fleet has deployed at once.
+COMMITS_PATH = os.path.join(os.path.dirname(STATE_PATH), "commits.json")
+COMMITS_MAX = 512
+# Only hashes are cached or looked up: a name like `main` moves.
+REVISION = re.compile(r"[0-9a-f]{7,64}")
+# What "main" is in the checkout for the commit graph (CommitGraph): the remote's
+# branch as last fetched, which a pull moves even while a feature branch is out.
+MAIN_REF = "refs/remotes/origin/main"
+GRAPH_PATH = os.path.join(os.path.dirname(STATE_PATH), "graph.json")
 
 
 def load_store(path: str) -> list[dict]:
@@ -47,22 +74,312 @@ def load_store(path: str) -> list[dict]:
     return [h for h in data if isinstance(h, dict)]
 
 
-def commit_age_days(revision: str, now: float) -> float | None:
-    """Age of a commit in the local nixcfg checkout; None if unknown (no fetch here)."""
-    if not revision or len(revision) < 7:
+class CommitTimes:
+    """Commit timestamps by revision, asked of the nixcfg checkout once each.
+
+    Misses are resolved together by one `git cat-file --batch`, however many
+    hosts brought new revisions. A revision the checkout does not have (yet) is
+    not asked again until the checkout moves -- a pull or fetch touches
+    logs/HEAD or FETCH_HEAD -- so a host on an unpushed commit costs no git run
+    per cycle either. Mirrored to disk so a restart does not ask again.
+    """
+
+    def __init__(self, path: str, size: int = COMMITS_MAX) -> None:
+        self.path = path
+        self.size = size
+        self.stamps: dict[str, float] | None = None  # read on first use; oldest use first
+        self.missing: set[str] = set()
+        self.moved: list | None = None  # the checkout's signature when `missing` was found
+        self.dirty = False
+
+    def resolve(self, revisions) -> None:
+        """Look up every revision not known yet, in one git run."""
+        stamps = self._stamps()
+        checkout = engine.signature([os.path.join(NIXCFG_CHECKOUT, ".git", name)
+                                     for name in ("logs/HEAD", "FETCH_HEAD", "packed-refs")])
+        if checkout != self.moved:
+            self.missing.clear()
+            self.moved = checkout
+        wanted = [r for r in dict.fromkeys(revisions)
+                  if REVISION.fullmatch(r) and r not in stamps and r not in self.missing]
+        if not wanted:
+            return
+        try:
+            found = cat_file(wanted)
+        except Exception as error:  # noqa: BLE001 -- ages stay unknown this cycle
+            print(f"commit times not read ({type(error).__name__})", flush=True)
+            return
+        for revision in wanted:
+            if revision in found:
+                stamps[revision] = found[revision]
+                self.dirty = True
+            else:
+                self.missing.add(revision)
+
+    def get(self, revision: str) -> float | None:
+        """The revision's commit time if resolve() found it; never runs git."""
+        stamps = self._stamps()
+        stamp = stamps.get(revision)
+        if stamp is not None and next(reversed(stamps)) != revision:
+            del stamps[revision]
+            stamps[revision] = stamp  # most recently used goes last
+            # The order is saved once it decides evictions: in a full cache. Below
+            # that, an order lost to a restart costs nothing and is not written.
+            self.dirty = self.dirty or len(stamps) >= self.size
+        return stamp
+
+    def flush(self) -> None:
+        stamps = self._stamps()
+        while len(stamps) > self.size:
+            del stamps[next(iter(stamps))]
+            self.dirty = True
+        if not self.dirty:
+            return
+        try:
+            engine.atomic_write_state(self.path, {"commits": stamps})
+        except OSError as error:
+            print(f"commit times not written ({type(error).__name__}); kept in memory", flush=True)
+            return
+        self.dirty = False
+
+    def _stamps(self) -> dict[str, float]:
+        if self.stamps is None:
+            self.stamps = {}
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    raw = json.load(handle)["commits"]
+                for revision, stamp in raw.items():
+                    if REVISION.fullmatch(revision):
+                        self.stamps[revision] = float(stamp)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass  # asked of git again, once
+        return self.stamps
+
+
+def cat_file(revisions: list[str]) -> dict[str, float]:
+    """Committer timestamps (`%ct`) of the revisions the checkout has, in one git run."""
+    completed = subprocess.run(  # noqa: S603 -- literal argv, substituted at build
+        [GIT, "-c", f"safe.directory={NIXCFG_CHECKOUT}", "-C", NIXCFG_CHECKOUT, "cat-file", "--batch"],
+        input="".join(f"{revision}^{{commit}}\n" for revision in revisions).encode(),
+        capture_output=True, timeout=15, check=True,
+    )
+    out = completed.stdout
+    found: dict[str, float] = {}
+    at = 0
+    for revision in revisions:
+        end = out.index(b"\n", at)
+        header = out[at:end].split()
+        at = end + 1
+        if len(header) != 3:  # "<revision>^{commit} missing" (or ambiguous)
+            continue
+        size = int(header[2])
+        body, at = out[at:at + size], at + size + 1
+        for line in body.split(b"\n"):
+            if not line:
+                break  # end of the headers
+            if line.startswith(b"committer "):
+                found[revision] = float(line.rsplit(b" ", 2)[1])
+    return found
+
+
+COMMIT_TIMES = CommitTimes(COMMITS_PATH)
+
+
+class CommitGraph:
+    """Parent links and generation numbers of main's history in the checkout.
+
+    Built once with `git rev-list --parents`, then extended with only the
+    commits main gained since -- and not even that while the ref has not moved,
+    which is read from the ref files, not asked of git. "How far behind main"
+    and "is it an ancestor of main" are then walks over the part of history
+    between the two commits, pruned by generation: a commit is never an
+    ancestor of one with a lower or equal generation number (other than itself).
+    Mirrored to disk, so a restart builds nothing.
+    """
+
+    MAIN, HOST = 1, 2  # which side of a behind() walk reaches a commit
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.loaded = False
+        self.tip = ""
+        self.shas: list[str] = []
+        self.index: dict[str, int] = {}
+        self.parents: list[tuple[int, ...]] = []
+        self.generation: list[int] = []
+        self.prefixes: list[str] | None = None  # sorted shas, for abbreviations
+
+    def update(self) -> None:
+        """Catch up with MAIN_REF: one git run if it moved, none otherwise."""
+        self._load()
+        tip = read_ref(NIXCFG_CHECKOUT, MAIN_REF)
+        if not tip or tip == self.tip:
+            return
+        try:
+            lines = rev_list(tip, self.tip if self.tip in self.index else "")
+        except subprocess.CalledProcessError:
+            self._reset()  # the old tip is gone (a force push, then gc): start over
+            lines = rev_list(tip, "")
+        for line in lines:
+            sha, *parents = line.split()
+            if sha in self.index:
+                continue
+            known = tuple(self.index[p] for p in parents if p in self.index)  # a shallow clone stops short
+            self.index[sha] = len(self.shas)
+            self.shas.append(sha)
+            self.parents.append(known)
+            self.generation.append(1 + max((self.generation[p] for p in known), default=0))
+        self.prefixes = None
+        self.tip = tip
+        try:
+            engine.atomic_write_state(self.path, {
+                "ref": MAIN_REF,
+                "tip": self.tip,
+                "commits": [[sha, list(parents)] for sha, parents in zip(self.shas, self.parents)],
+            })
+        except OSError as error:
+            print(f"commit graph not written ({type(error).__name__}); kept in memory", flush=True)
+
+    def find(self, revision: str) -> int | None:
+        """The commit a full or unambiguously abbreviated hash names, if indexed."""
+        if revision in self.index:
+            return self.index[revision]
+        if not REVISION.fullmatch(revision):
+            return None
+        if self.prefixes is None:
+            self.prefixes = sorted(self.shas)
+        at = bisect.bisect_left(self.prefixes, revision)
+        matches = self.prefixes[at:at + 2]
+        if matches and matches[0].startswith(revision) and not (len(matches) > 1 and matches[1].startswith(revision)):
+            return self.index[matches[0]]
         return None
+
+    def is_ancestor(self, revision: str, main: str = "") -> bool | None:
+        """Whether `revision` is in main's history; None if the graph lacks either."""
+        commit, top = self.find(revision), self.find(main or self.tip)
+        if commit is None or top is None:
+            return None
+        floor = self.generation[commit]
+        stack, seen = [top], {top}
+        while stack:
+            current = stack.pop()
+            if current == commit:
+                return True
+            for parent in self.parents[current]:
+                if parent not in seen and self.generation[parent] >= floor:
+                    seen.add(parent)
+                    stack.append(parent)
+        return False
+
+    def behind(self, revision: str, main: str = "") -> int | None:
+        """Commits in main's history but not in `revision`'s -- `git rev-list --count
+        main ^revision` -- or None if the graph lacks either."""
+        commit, top = self.find(revision), self.find(main or self.tip)
+        if commit is None or top is None:
+            return None
+        # Highest generation first: every child is taken before its parents, so
+        # a commit's flags are complete when it comes up. Done once nothing
+        # queued is reachable from main alone.
+        flags = {top: self.MAIN}
+        flags[commit] = flags.get(commit, 0) | self.HOST
+        queue = [(-self.generation[c], c) for c in flags]
+        heapq.heapify(queue)
+        main_only = sum(1 for f in flags.values() if f == self.MAIN)
+        count = 0
+        while main_only:
+            _, current = heapq.heappop(queue)
+            mark = flags[current]
+            if mark == self.MAIN:
+                main_only -= 1
+                count += 1
+            for parent in self.parents[current]:
+                before = flags.get(parent)
+                after = (before or 0) | mark
+                if before is None:
+                    heapq.heappush(queue, (-self.generation[parent], parent))
+                    main_only += after == self.MAIN
+                elif before == self.MAIN and after != self.MAIN:
+                    main_only -= 1
+                flags[parent] = after
+        return count
+
+    def _reset(self) -> None:
+        self.tip, self.shas, self.index, self.parents, self.generation = "", [], {}, [], []
+
+    def _load(self) -> None:
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                raw = json.load(handle)
+            if raw["ref"] != MAIN_REF:
+                return
+            for sha, parents in raw["commits"]:
+                known = tuple(int(p) for p in parents)
+                self.index[str(sha)] = len(self.shas)
+                self.shas.append(str(sha))
+                self.parents.append(known)
+                self.generation.append(1 + max((self.generation[p] for p in known), default=0))
+            self.tip = str(raw["tip"])
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            self._reset()  # rebuilt from git, once
+
+
+def read_ref(checkout: str, ref: str) -> str:
+    """A ref's commit straight from the checkout's files; "" if it has none."""
+    git_dir = os.path.join(checkout, ".git")
     try:
-        completed = subprocess.run(  # noqa: S603 -- literal argv, substituted at build
-            [GIT, "-c", f"safe.directory={NIXCFG_CHECKOUT}", "-C", NIXCFG_CHECKOUT,
-             "log", "-1", "--format=%ct", revision],
-            capture_output=True, text=True, timeout=15, check=True,
-        )
-        stamp = float(completed.stdout.strip())
-    except Exception:  # noqa: BLE001
+        with open(os.path.join(git_dir, ref), encoding="utf-8") as handle:
+            return handle.read().strip()
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(git_dir, "packed-refs"), encoding="utf-8") as handle:
+            for line in handle:
+                sha, _, name = line.strip().partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return ""
+
+
+def rev_list(tip: str, known: str) -> list[str]:
+    """"<commit> <parents...>" from `known` (exclusive) to `tip`, parents first."""
+    completed = subprocess.run(  # noqa: S603 -- literal argv, substituted at build
+        [GIT, "-c", f"safe.directory={NIXCFG_CHECKOUT}", "-C", NIXCFG_CHECKOUT,
+         "rev-list", "--parents", "--topo-order", "--reverse", tip] + ([f"^{known}"] if known else []),
+        capture_output=True, text=True, timeout=60, check=True,
+    )
+    return completed.stdout.splitlines()
+
+
+GRAPH = CommitGraph(GRAPH_PATH)
+
+
+def commit_age_days(revision: str, now: float) -> float | None:
+    """Age of a commit in the local nixcfg checkout; None if unknown (no fetch here).
+
+    Only what collect() resolved beforehand is known.
+    """
+    stamp = COMMIT_TIMES.get(revision.lower())
+    if stamp is None:
         return None
     return max(0.0, (now - stamp) / 86400.0)
 
 
+def local_relation(revision: str) -> str | None:
+    """The beacon's relation as far as the local graph can tell: current or behind.
+
+    A commit main does not contain may be ahead, diverged or just newer than the
+    checkout's last fetch; that is not for this side to guess.
+    """
+    if not GRAPH.is_ancestor(revision):
+        return None
+    return "current" if GRAPH.find(revision) == GRAPH.find(GRAPH.tip) else "behind"
+
+
 def judge(host: dict, now: float) -> list[Problem]:
     name = str(host.get("name") or "?")
     if not host.get("is_nix"):
@@ -75,6 +392,8 @@ def judge(host: dict, now: float) -> list[Problem]:
     relation = comparison.get("relation")
     evidence = fresh.get("deployment_evidence") or {}
     revision = str(evidence.get("source_revision") or "")
+    if relation in (None, "") and revision:
+        relation = local_relation(revision.lower())
     if relation in (None, "", "current"):
         return []
     if relation in ("diverged", "ahead"):
@@ -83,6 +402,11 @@ def judge(host: dict, now: float) -> list[Problem]:
                         f"somebody switched from a branch or a dirty tree; reconcile before the next change.")]
     behind = comparison.get("commits_behind")
     behind = int(behind) if isinstance(behind, (int, float)) else None
+    if behind is None:
+        # The beacon left the count out: count it in the local commit graph,
+        # against the main it compared with if the checkout has that one too.
+        upstream = str(comparison.get("upstream_revision") or "").lower()
+        behind = GRAPH.behind(revision.lower(), upstream if GRAPH.find(upstream) is not None else "")
     age = commit_age_days(revision, now)
     if (age is not None and age >= MAX_AGE_DAYS) or (behind is not None and behind >= MAX_COMMITS):
         age_text = f"{int(age)} d old" if age is not None else "age unknown"
@@ -100,12 +424,42 @@ def collect() -> list[Problem]:
         return [Problem("drift:store", f"pharosd store unreadable at {STORE_PATH} ({type(error).__name__}); "
                                        f"fleet drift is currently unwatched.")]
     now = time.time()
+    try:
+        GRAPH.update()
+    except Exception as error:  # noqa: BLE001 -- counts the beacon leaves out stay unknown
+        print(f"commit graph not updated ({type(error).__name__})", flush=True)
+    # Every revision that may need an age, resolved up front: one git run for
+    # whatever is new, none at all on most cycles.
+    COMMIT_TIMES.resolve(
+        str(((h.get("freshness") or {}).get("deployment_evidence") or {}).get("source_revision") or "").lower()
+        for h in hosts
+        # "behind", or no relation, which the commit graph may still call behind
+        if ((h.get("freshness") or {}).get("nixcfg_comparison") or {}).get("relation") in ("behind", None, "")
+    )
     found: list[Problem] = []
     for host in sorted(hosts, key=lambda h: str(h.get("name"))):
         found.extend(judge(host, now))
+    COMMIT_TIMES.flush()
     return found
 
 
+def checks() -> list[Check]:
+    # One check: every host is judged from the same store read. New commit
+    # times take one bounded git run, so it may use the whole cycle budget
+    # rather than one probe's allowance. It re-runs when pharosd
+    # rewrites the store (resident, within seconds) and otherwise at least every
+    # SAFETY_NET_SECONDS, because commit ages and staleness move with the clock.
+    return [
+        Check(
+            "store",
+            collect,
+            deadline=engine.CYCLE_BUDGET_SECONDS,
+            watch=(STORE_PATH,),
+            every=SAFETY_NET_SECONDS,
+        )
+    ]
+
+
 def render(announced: list[str], cleared: list[str]) -> str:
     lines: list[str] = []
     if announced:
@@ -115,17 +469,12 @@ def render(announced: list[str], cleared: list[str]) -> str:
     return "\n".join(lines)
 
 
+def poller() -> engine.Poller:
+    return engine.Poller("fleet-drift", STATE_PATH, checks(), render, NOTIFICATION_ENV)
+
+
 def main() -> int:
-    target = engine.env_file_value(NOTIFICATION_ENV, "WATCHTOWER_NOTIFICATION_URL")
-    if not target:
-        print("notification target missing")
-        return engine.EXIT_UNDELIVERED
-    try:
-        sender = engine.shoutrrr_telegram_sender(target)
-    except ValueError as error:
-        print(f"notification target unusable: {error}")
-        return engine.EXIT_UNDELIVERED
-    return engine.run_cycle(STATE_PATH, time.time(), collect, render, sender)
+    return engine.run_poller(poller())
 
 
 if __name__ == "__main__":
@@ -13,6 +13,7 @@
 }:
 let
   fleetLib = import ../../modules/shared/fleet-alerts/lib.nix { inherit pkgs lib; };
+  runner = config.nixcfg.fleetAlerts.hostRunner;
   # pharosd's store: compose project csb1 → volume csb1_pharos_data, mounted at /data.
   storePath = "/var/lib/docker/volumes/csb1_pharos_data/_data/pharos.json";
   poller = fleetLib.mkPoller {
@@ -27,7 +28,21 @@ let
   };
 in
 {
-  systemd.services.fleet-drift = {
+  # OPS-107: with csb1's host runner on, this poller runs inside
+  # fleet-alerts-host and the unit and timer below step aside.
+  nixcfg.fleetAlerts.hostRunner.pollers.fleet-drift = {
+    package = poller;
+    interval = 60 * 60;
+    stateDirectory = "fleet-drift";
+    # The directory, not the file: a resident process keeps its mount namespace,
+    # and a bind mount of the file would pin the inode pharosd's atomic rewrite
+    # replaces -- the poller would judge the same stale store forever, and the
+    # engine's inotify watch (WATCHED FILES) needs the directory anyway.
+    readOnlyPaths = [ (dirOf storePath) ];
+    readsHome = true; # commit ages and the commit graph come from mba's nixcfg checkout
+  };
+
+  systemd.services.fleet-drift = lib.mkIf (!runner.enable) {
     description = "Page when a fleet host runs a nixcfg generation persistently behind main (OPS-187)";
     after = [ "network-online.target" ];
     wants = [ "network-online.target" ];
@@ -61,7 +76,7 @@ in
     };
   };
 
-  systemd.timers.fleet-drift = {
+  systemd.timers.fleet-drift = lib.mkIf (!runner.enable) {
     description = "Recurring fleet drift watch (OPS-187)";
     wantedBy = [ "timers.target" ];
     timerConfig = {
@@ -17,11 +17,11 @@ Reuses csb1's existing WATCHTOWER_NOTIFICATION_URL so no new secret is needed.
 from __future__ import annotations
 
 import json
-import socket
 import time
+from functools import partial
 
 import engine
-from engine import Problem
+from engine import Check, Problem
 
 STATE_PATH = "/var/lib/fleet-peer-watch/state.json"
 NOTIFICATION_ENV = "@NOTIFICATION_ENV@"
@@ -32,8 +32,7 @@ TIMEOUT = 15
 def check_peer(peer: dict) -> list[Problem]:
     name = peer["name"]
     try:
-        with socket.create_connection((peer["address"], peer["port"]), timeout=TIMEOUT) as sock:
-            stamp = float(sock.recv(64).decode().strip())
+        beat = engine.read_heartbeat(peer["address"], peer["port"], TIMEOUT)
     except Exception as error:  # noqa: BLE001
         return [
             Problem(
@@ -43,9 +42,9 @@ def check_peer(peer: dict) -> list[Problem]:
                 f"Assistant fleet is currently unwatched.",
             )
         ]
-    if stamp <= 0:
+    if beat.at <= 0:
         return [Problem(f"peer:{name}", f"{name}: alert poller has never recorded a run")]
-    age = int(time.time() - stamp)
+    age = int(time.time() - beat.at)
     if age > peer["maxAgeSeconds"]:
         return [
             Problem(
@@ -54,14 +53,25 @@ def check_peer(peer: dict) -> list[Problem]:
                 f"(limit {peer['maxAgeSeconds'] // 60} min). The HA fleet is unwatched.",
             )
         ]
+    # A v2 heartbeat also says whether it is running but wedged on delivery.
+    waited = int(time.time() - beat.pending) if beat.pending else 0
+    if waited > peer["maxAgeSeconds"]:
+        return [
+            Problem(
+                f"peer:{name}:delivery",
+                f"{name}: alert poller is running but an alert has waited {waited // 60} min "
+                f"for delivery. The HA fleet is watched, but nobody is told.",
+            )
+        ]
     return []
 
 
+def checks() -> list[Check]:
+    return [Check(f"peer:{peer['name']}", partial(check_peer, peer)) for peer in PEERS]
+
+
 def collect() -> list[Problem]:
-    found: list[Problem] = []
-    for peer in PEERS:
-        found.extend(check_peer(peer))
-    return found
+    return engine.gather(checks())
 
 
 def render(announced: list[str], cleared: list[str]) -> str:
@@ -73,17 +83,12 @@ def render(announced: list[str], cleared: list[str]) -> str:
     return "\n".join(lines)
 
 
+def poller() -> engine.Poller:
+    return engine.Poller("peer-watch", STATE_PATH, checks(), render, NOTIFICATION_ENV)
+
+
 def main() -> int:
-    target = engine.env_file_value(NOTIFICATION_ENV, "WATCHTOWER_NOTIFICATION_URL")
-    if not target:
-        print("notification target missing")
-        return engine.EXIT_UNDELIVERED
-    try:
-        sender = engine.shoutrrr_telegram_sender(target)
-    except ValueError as error:
-        print(f"notification target unusable: {error}")
-        return engine.EXIT_UNDELIVERED
-    return engine.run_cycle(STATE_PATH, time.time(), collect, render, sender)
+    return engine.run_poller(poller())
 
 
 if __name__ == "__main__":
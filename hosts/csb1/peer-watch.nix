@@ -17,6 +17,7 @@
 }:
 let
   fleetLib = import ../../modules/shared/fleet-alerts/lib.nix { inherit pkgs lib; };
+  runner = config.nixcfg.fleetAlerts.hostRunner;
 
   # csb0's ops-alerts runs every 15 min; two missed runs before we call it stopped.
   peers = [
@@ -44,7 +45,15 @@ in
     tailnetAddress = "100.64.0.4";
   };
 
-  systemd.services.fleet-peer-watch = {
+  # OPS-107: with csb1's host runner on, this poller runs inside
+  # fleet-alerts-host and the unit and timer below step aside.
+  nixcfg.fleetAlerts.hostRunner.pollers.peer-watch = {
+    package = poller;
+    interval = 10 * 60;
+    stateDirectory = "fleet-peer-watch";
+  };
+
+  systemd.services.fleet-peer-watch = lib.mkIf (!runner.enable) {
     description = "Watch csb0's alert poller so its silence cannot go unnoticed (OPS-107)";
     after = [ "network-online.target" ];
     wants = [ "network-online.target" ];
@@ -82,7 +91,7 @@ in
     };
   };
 
-  systemd.timers.fleet-peer-watch = {
+  systemd.timers.fleet-peer-watch = lib.mkIf (!runner.enable) {
     description = "Recurring peer-poller watch (OPS-107)";
     wantedBy = [ "timers.target" ];
     timerConfig = {
@@ -3,8 +3,8 @@
 # 2026-08-21: headscale on csb0 served an EMPTY DERP map after a failed scheduled
 # refresh; every node lost its relay and nothing paged for ~57 minutes. The
 # existing pollers watch services, not the mesh underneath them. This unit reads
-# csb1's own `tailscale status --json` / `tailscale debug derp-map` and pages
-# Telegram when that view is persistently broken.
+# csb1's own status and DERP map from tailscaled's LocalAPI and pages Telegram
+# when that view is persistently broken.
 #
 # DELIBERATELY SEPARATE from hausv-alerts and peer-watch (mature, test-pinned).
 # Same engine, same hardening, same reused WATCHTOWER_NOTIFICATION_URL — no new
@@ -18,20 +18,55 @@
 }:
 let
   fleetLib = import ../../modules/shared/fleet-alerts/lib.nix { inherit pkgs lib; };
+  runner = config.nixcfg.fleetAlerts.hostRunner;
+
+  # The fleet peers this witness pings each cycle for the mesh checks (direct
+  # or DERP, and how fast), by tailnet address. Not csb1 itself.
+  meshPeers = [
+    {
+      name = "csb0";
+      address = "100.64.0.8";
+    }
+    {
+      name = "hsb1";
+      address = "100.64.0.7";
+    }
+    {
+      name = "hsb8";
+      address = "100.64.0.3";
+    }
+    {
+      name = "hsb9";
+      address = "100.64.0.12";
+    }
+  ];
 
   poller = fleetLib.mkPoller {
     name = "tailnet-watch";
     checks = ../../modules/shared/fleet-alerts/tailnet-watch-checks.py;
     substitutions = {
       HOSTNAME = "csb1";
-      # The same binary tailscaled runs from, so CLI and daemon never disagree.
-      TAILSCALE_BIN = "${config.services.tailscale.package}/bin/tailscale";
+      # tailscaled's LocalAPI, read directly instead of through the CLI. The
+      # NixOS module starts tailscaled with this default socket path.
+      TAILSCALED_SOCKET = "/run/tailscale/tailscaled.sock";
+      MESH_PEERS_JSON = builtins.toJSON meshPeers;
       NOTIFICATION_ENV = config.age.secrets.csb1-watchtower-env.path;
     };
   };
 in
 {
-  systemd.services.tailnet-watch = {
+  # OPS-107: with csb1's host runner on, this poller runs inside
+  # fleet-alerts-host and the unit and timer below step aside. Resident there,
+  # it also holds tailscaled's IPN bus open (PUSH SOURCES in engine.py): a
+  # Health, BackendState or DERP-map change starts a cycle within seconds.
+  nixcfg.fleetAlerts.hostRunner.pollers.tailnet-watch = {
+    package = poller;
+    interval = 10 * 60;
+    stateDirectory = "tailnet-watch";
+    readWritePaths = [ "/run/tailscale" ];
+  };
+
+  systemd.services.tailnet-watch = lib.mkIf (!runner.enable) {
     description = "Page when csb1's tailnet view is persistently broken (OPS-181)";
     after = [
       "network-online.target"
@@ -53,7 +88,7 @@ in
       PrivateDevices = true;
       ProtectHome = true;
       ProtectSystem = "strict";
-      # The tailscale CLI talks to tailscaled over this unix socket.
+      # The poller talks to tailscaled's LocalAPI over this unix socket.
       ReadWritePaths = [ "/run/tailscale" ];
       ProtectKernelTunables = true;
       ProtectKernelModules = true;
@@ -67,11 +102,12 @@ in
         "AF_INET6"
       ];
       SystemCallArchitectures = "native";
-      TimeoutStartSec = "90";
+      # Check budget (100 s, including the fast-confirm re-probe) plus delivery.
+      TimeoutStartSec = "150";
     };
   };
 
-  systemd.timers.tailnet-watch = {
+  systemd.timers.tailnet-watch = lib.mkIf (!runner.enable) {
     description = "Recurring tailnet witness (OPS-181)";
     wantedBy = [ "timers.target" ];
     timerConfig = {
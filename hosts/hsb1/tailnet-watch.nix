@@ -14,13 +14,36 @@
 let
   fleetLib = import ../../modules/shared/fleet-alerts/lib.nix { inherit pkgs lib; };
 
+  # The fleet peers this witness pings each cycle for the mesh checks (direct
+  # or DERP, and how fast), by tailnet address. Not hsb1 itself.
+  meshPeers = [
+    {
+      name = "csb0";
+      address = "100.64.0.8";
+    }
+    {
+      name = "csb1";
+      address = "100.64.0.4";
+    }
+    {
+      name = "hsb8";
+      address = "100.64.0.3";
+    }
+    {
+      name = "hsb9";
+      address = "100.64.0.12";
+    }
+  ];
+
   poller = fleetLib.mkPoller {
     name = "tailnet-watch";
     checks = ../../modules/shared/fleet-alerts/tailnet-watch-checks.py;
     substitutions = {
       HOSTNAME = "hsb1";
-      # The same binary tailscaled runs from, so CLI and daemon never disagree.
-      TAILSCALE_BIN = "${config.services.tailscale.package}/bin/tailscale";
+      # tailscaled's LocalAPI, read directly instead of through the CLI. The
+      # NixOS module starts tailscaled with this default socket path.
+      TAILSCALED_SOCKET = "/run/tailscale/tailscaled.sock";
+      MESH_PEERS_JSON = builtins.toJSON meshPeers;
       NOTIFICATION_ENV = config.age.secrets.hsb1-tailnet-watch-env.path;
     };
   };
@@ -40,22 +63,33 @@ in
       "tailscaled.service"
     ];
     wants = [ "network-online.target" ];
+    # Resident (RESIDENT MODE in engine.py): a cycle every 10 minutes as before,
+    # and the process holds tailscaled's IPN bus open, so a Health, BackendState
+    # or DERP-map change starts a cycle within seconds (PUSH SOURCES). hsb1 is
+    # the witness that can page while netcup is dark; minutes matter here.
+    environment.FLEET_ALERTS_SERVE_SECONDS = toString (10 * 60);
     serviceConfig = {
-      Type = "oneshot";
+      Type = "simple";
       ExecStart = "${pkgs.python3}/bin/python3 ${poller}/checks.py";
+      Restart = "always";
+      RestartSec = "30s";
       StateDirectory = "tailnet-watch";
       StateDirectoryMode = "0700";
       # 0 = clean, 1 = problems found; 2 = undeliverable, which must fail the
-      # unit so it shows in systemctl --failed. Same contract as peer-watch.
+      # unit so it shows in systemctl --failed. Same contract as peer-watch;
+      # resident, a bad notification target or a delivery still wedged an
+      # interval later exits with it (RESIDENT MODE in engine.py). Left failed
+      # rather than auto-restarted, so it stays visible; the timer retries it.
       SuccessExitStatus = [
         0
         1
       ];
+      RestartPreventExitStatus = [ 2 ];
       PrivateTmp = true;
       PrivateDevices = true;
       ProtectHome = true;
       ProtectSystem = "strict";
-      # The tailscale CLI talks to tailscaled over this unix socket.
+      # The poller talks to tailscaled's LocalAPI over this unix socket.
       ReadWritePaths = [ "/run/tailscale" ];
       ProtectKernelTunables = true;
       ProtectKernelModules = true;
@@ -69,17 +103,17 @@ in
         "AF_INET6"
       ];
       SystemCallArchitectures = "native";
-      TimeoutStartSec = "90";
     };
   };
 
+  # Starts the resident poller; its 10-minute schedule is its own now. After an
+  # undeliverable exit it starts it again 10 minutes on, as the oneshot timer did.
   systemd.timers.tailnet-watch = {
-    description = "Recurring tailnet witness (OPS-185)";
+    description = "Tailnet witness start after boot (OPS-185)";
     wantedBy = [ "timers.target" ];
     timerConfig = {
       OnBootSec = "10m";
-      OnUnitActiveSec = "10m";
-      RandomizedDelaySec = "45s";
+      OnUnitInactiveSec = "10m";
       Unit = "tailnet-watch.service";
     };
   };
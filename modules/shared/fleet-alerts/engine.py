@@ -29,35 +29,250 @@ outright if the notification channel is down: state says "announced", nothing wa
 delivered, and nothing retries. The ops-alerts poller shipped with exactly that
 bug. This is the fix:
 
-    1. write state containing pending{event_id, text, next_state}
-    2. attempt delivery
-    3. ONLY on success, commit next_state (dropping pending)
-
-A failed send leaves `pending` on disk and returns EXIT_UNDELIVERED, so the next
-cycle re-sends the identical text before committing anything. An alert is
-therefore never lost and never announced twice, and because the caller maps
-EXIT_UNDELIVERED outside SuccessExitStatus, an undeliverable alert also surfaces
-as a failed systemd unit.
+    1. write state containing the new `seen` AND the event appended to `outbox`
+    2. attempt delivery of the outbox, oldest first
+    3. ONLY on success, drop the delivered events from `outbox` and write again
+
+The first version held one `pending` event and, while it was undeliverable,
+skipped evaluation entirely -- so during a Telegram outage new transitions went
+unseen until the channel came back. The outbox is a bounded FIFO instead: checks
+keep running, transitions keep being staged, and when delivery returns the
+backlog drains in order, consecutive events merged into one digest message. An
+event leaves the outbox only after the send that carried it succeeded, so an
+alert is still never lost and never announced twice.
+
+An event too long for one Telegram message -- a fleet-wide outage rendered as
+one transition -- used to be rejected on every retry and wedge the outbox for
+good. It now goes out as numbered chunks split at line breaks, and each chunk
+that is delivered is committed like a whole event: the outbox entry keeps only
+the undelivered remainder plus a count of chunks sent, so a retry resumes at the
+first chunk that failed instead of repeating the ones that arrived. A non-empty outbox at the
+end of a cycle returns EXIT_UNDELIVERED, and because the caller maps that outside
+SuccessExitStatus, an undeliverable alert also surfaces as a failed systemd unit.
+
+THE STATE JOURNAL
+=================
+Writing the whole state file with an fsync three times a cycle, from four
+pollers on one shared disk, was most of what a quiet cycle cost. State is now a
+snapshot (the state file itself, written atomically as before) plus an
+append-only journal beside it (`<state>.journal`). Every save appends one small
+record -- a JSON merge patch against the previous state, tagged stage, commit or
+advance -- and fsyncs only that. A save that changes nothing writes nothing.
+Loading replays the journal over the snapshot; a record torn by a crash is the
+last thing on the file and is discarded (and cut off before the next append), so
+state is always some whole, earlier-or-equal version, never a corrupt one. Every
+COMPACT_RECORDS records the state is folded into a fresh snapshot carrying the
+sequence number it includes, and the journal is truncated; a crash between the
+two is harmless because replay skips records the snapshot already holds.
+
+heartbeat.nix reads the state file's mtime, so every cycle still stamps it --
+with utime, which costs no data write and no fsync.
+
+HEARTBEAT
+=========
+The peer watch used to learn one fact from heartbeat.nix: the time of the last
+cycle. A poller that ran but could not deliver -- the outbox wedged -- looked
+alive. heartbeat.py now stays resident and answers a `v2` request with one line
+of what it last saw beside the state file: when the cycle ended, how long it
+took, how many announced problems stand, since when a delivery has been pending,
+and a sequence number that moves only when cycles happen. A client that sends
+nothing still gets the bare number, so pre-v2 peers keep working; read_heartbeat
+speaks both and falls back when the far end is still the old one.
+
+PARALLEL CHECKS
+===============
+A check set may hand run_cycle a list of named `Check`s instead of one collect()
+callable. They run concurrently on a small pool of daemon threads, each against
+its own deadline and all of them against one cycle budget. Every probe in the
+fleet is bounded by a 15 s network timeout, so run one after another the worst
+case was the SUM of those timeouts: on csb0 a dead tailnet cost three HA targets,
+a peer and the broker probe in a row. Run side by side it costs one. A check that
+overruns its deadline is abandoned -- its thread finishes on its own and the
+result is discarded -- and comes back as a problem of its own ("state unknown"),
+so one wedged probe can neither hold up the rest nor pass for healthy.
+
+FAST CONFIRM
+============
+CONFIRM_RUNS = 2 means a real outage pages one timer interval after it is first
+seen: 15-30 min on csb0, 10-20 min for tailnet-watch. With `confirm_after` set,
+run_cycle instead re-runs ONLY the checks that produced a first sighting, after
+that many seconds of settle time and inside the same cycle. A problem seen by
+both probes counts as two consecutive sightings and pages about a minute after
+it was first seen; one that is gone on the re-probe was a blip and never pages.
+The settle delay is the blip protection: the 2026-07-30 tailscaled restart made
+one run see every house unreachable, and the next run, 15 minutes later, found
+all of them answering. That bounds the outage from above and no closer -- nobody
+timed the restart -- so FAST_CONFIRM_SECONDS is a default, not a measurement:
+each poller passes its own `confirm_after`, and one that sees a blip page should
+lengthen it. The settle and the re-probe both come out of the cycle budget, and
+the re-probe is skipped when the settle would use it all. With the default
+CYCLE_BUDGET_SECONDS (60) and a 60 s settle that is every time, so fast confirm
+only runs for pollers that raise their budget: ops-alerts (120 s) and
+tailnet-watch (100 s). Everything else confirms on its next timer run.
+
+CADENCE
+=======
+Not every check needs every cycle: a value that moves slowly -- a monthly
+counter, a judgement by the hour -- need not cost a request every time the way
+liveness must. A Check with `every` set runs only when that many
+seconds have passed since its last result, which is kept in state under
+`checks` with its time. In between, the cached problems are fed to advance() as
+ZERO sightings: an announced problem stays announced and is not cleared, and a
+cached result can never confirm anything on its own, so confirmation still
+means two real observations. Timed-out and crashed runs are not cached -- an
+unknown answer is retried next cycle, not remembered for an hour.
+
+WATCHED FILES
+=============
+Some checks only read a local file that changes rarely -- fleet-drift judges
+pharosd's persisted store. A Check with `watch` paths is cached like CADENCE
+for as long as those files are unchanged (same inode, size and mtime, recorded
+with its result), so an idle cycle no longer re-parses them; `every` becomes the
+safety net that re-runs it anyway, for judgements that age with the clock. A
+resident poller (RESIDENT MODE, HOST RUNNER) also watches the files' directories
+with inotify and starts a cycle WATCH_SETTLE_SECONDS after one is rewritten or
+renamed into place, instead of at the next slot: a drifted beacon is seen in
+seconds rather than up to an hour later. Directories, not files, because an
+atomic rewrite replaces the inode a file watch would hold. Where inotify is
+unavailable the timer alone still covers everything, only slower.
+
+CIRCUIT BREAKER
+===============
+A target that stays dead costs its full network timeout every cycle: a dead
+house's HA probe or a peer whose tailnet address black-holes each burn 15 s, and
+on csb0 one of them alone pushed the cycle toward TimeoutStartSec. After
+BREAKER_FAILURES consecutive EXPENSIVE failures -- a timeout, or problems that
+took at least BREAKER_SLOW_SECONDS to report -- a check's breaker opens and it is
+probed only every BREAKER_PROBE_CYCLES-th cycle. In between, its last problems
+are held, as zero sightings exactly like a CADENCE cache: the alert stays
+announced, nothing clears, and nothing new confirms on a held answer. The first
+probe that comes back cheap (healthy, or a fast definite answer) closes the
+breaker and the check is back on every cycle. Cheap failures never trip it --
+HA answering "entry not loaded" in 40 ms costs nothing to ask again.
+
+METRICS
+=======
+After every cycle run_cycle writes metrics.prom next to the state file: an
+OpenMetrics/Prometheus text exposition of what the cycle cost -- its duration,
+each check's latency and outcome, delivery attempts and their time, the time
+spent making state durable, the outbox depth and the age of its oldest event,
+and how many problems await confirmation. It is replaced atomically, so a
+textfile collector never reads half of it, but not fsynced: it is rebuilt every
+cycle, and a crash loses nothing worth a disk flush. A failure to write it is
+logged and never fails the cycle.
+
+HISTORY
+=======
+Each cycle also appends one compact JSON line to history.jsonl beside the state:
+when it ran, how long it took, each check's latency and outcome, the problem
+keys, the transitions and what delivery did. Checks and problem keys are the
+first probe's; a FAST CONFIRM re-probe is recorded beside them under `confirm`,
+so a blip it swallowed and the first probe's latency both survive. The file
+rotates at HISTORY_BYTES into history.jsonl.1 .. .HISTORY_KEEP, so history is
+bounded on disk -- about six months of a 15-minute poller. Like METRICS it is
+neither fsynced nor allowed to fail a cycle; it is for tuning, not for
+correctness.
+
+`python3 engine.py stats <state dir> [--days N]` streams those files oldest
+first and reports latency percentiles per check, how often each problem key was
+announced and how often it was a blip that confirmation swallowed, and the
+delivery success rate. Latencies go into fixed log-spaced buckets, so memory is
+constant however much history there is; percentiles are accurate to a bucket
+width (about 12 %).
+
+HOST RUNNER
+===========
+csb1 ran peer-watch, tailnet-watch and fleet-drift as three units, each paying
+for its own interpreter, its own import of this module, its own parse of the
+same WATCHTOWER_NOTIFICATION_URL and its own Telegram connection. A check set
+that describes itself as a `Poller` (what it checks, where its state lives, how
+it renders, where its notification target is) can instead be hosted by host():
+one resident process, one thread per poller, each on its own interval and each
+with its own state file -- so its write-ahead outbox and heartbeat stamp are
+those of its own unit. Its exit status cannot be: the process has only one, and
+failing it for one poller would stop the others. A poller whose notification
+target is unusable, or whose alerts are still undeliverable a full interval
+after the first failed attempt (RESIDENT MODE), is instead reported as the
+problem `host-runner:<poller>` by the first poller that did start, through that
+poller's own channel -- so a missing secret pages rather than leaving one line
+in the journal. Only a host with no usable poller at all exits, with
+EXIT_UNDELIVERED, and host-runner.nix keeps that unit failed. The Telegram
+client and the parsed senders are shared. Worker threads are NOT: each poller
+gets a pool of its own, so a check set whose probes are all hanging can exhaust
+only its own workers and its own cycle budget, never another poller's. Log
+lines are prefixed with the poller that wrote them. lib.nix builds the process
+with mkHostRunner; host-runner.nix is the unit.
+
+RESIDENT MODE
+=============
+By default a poller is one process per systemd timer tick. With
+FLEET_ALERTS_SERVE_SECONDS set in the unit's environment, run_or_serve() instead
+keeps the process resident and calls run_cycle on its own monotonic schedule, so
+the interpreter, imports, parsed config and the sender (with its TLS context and
+connections) stay warm between cycles. Each cycle is the same run_cycle as a
+timer run: the write-ahead outbox, the atomic state writes and the state-file
+stamp heartbeat.nix reads are all unchanged. An undeliverable alert is logged
+and retried at the next slot; if it is still undeliverable a full interval
+after the first failed attempt, serve() returns EXIT_UNDELIVERED and the process
+exits with it, so the unit fails and shows in `systemctl --failed` as a timer
+run's would. The units keep it failed (RestartPreventExitStatus) and their
+timer starts them again an interval later -- the retry a timer run got.
+
+Measured on one core with five no-op checks and no network (so excluding the
+TLS handshake that warm connections also save): a timer run cost 188 ms wall /
+185 ms CPU per cycle, nearly all interpreter start-up and imports; a resident
+cycle cost 1.7 ms wall / 1.4 ms CPU.
+
+PUSH SOURCES
+============
+A resident check set can also be told about changes instead of polling for
+them. run_or_serve(push=...) lets it start its own listeners -- ops-alerts keeps
+a Home Assistant websocket per house and an MQTT session on its link heartbeats
+-- which set the same wake event a watched file does, so a change starts a
+cycle WATCH_SETTLE_SECONDS later rather than at the next slot. A listener may
+also wake for the absence of a change: the MQTT one does when a heartbeat it
+tracks falls silent past its limit. A Poller carries its `push` too, so the
+same listeners run under host(); tailnet-watch holds tailscaled's IPN bus open
+that way. The listeners only speed detection up: the cycle still judges,
+confirms (FAST CONFIRM) and delivers exactly as a timed one would, and a check
+whose listener is down polls as before.
 """
 
 from __future__ import annotations
 
+import argparse
+import http.client
 import json
+import math
 import os
+import queue
+import signal
+import socket
 import ssl
+import struct
+import sys
 import tempfile
-import urllib.error
+import threading
+import time
 import urllib.parse
-import urllib.request
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Mapping, Sequence
 
 EXIT_CLEAN = 0
 EXIT_PROBLEMS = 1
 EXIT_UNDELIVERED = 2
 
 NETWORK_TIMEOUT_SECONDS = 15
+TELEGRAM_HOST = "api.telegram.org"
+
+# Set (in seconds) by a unit that runs its poller resident; unset means one cycle
+# per process, driven by a systemd timer.
+SERVE_INTERVAL_ENV = "FLEET_ALERTS_SERVE_SECONDS"
+# The check host() adds to its first poller to report the others; see HOST RUNNER.
+HOST_CHECK = "host-runner"
 
 # A problem must be seen on this many CONSECUTIVE runs before it is announced.
 # The csb0 switch on 2026-07-30 restarted tailscaled; one run saw all three
@@ -67,6 +282,52 @@ NETWORK_TIMEOUT_SECONDS = 15
 # prevent.
 CONFIRM_RUNS = 2
 
+# Telegram rejects a message over 4096 characters; a digest stops short of it,
+# and a longer event is sent in chunks of CHUNK_LIMIT plus a "(2/5)" marker.
+MESSAGE_LIMIT = 4096
+CHUNK_LIMIT = MESSAGE_LIMIT - 32
+# Events held while the channel is down. Past this the two oldest are merged
+# into one -- never dropped -- so the state file stays bounded in entries.
+OUTBOX_LIMIT = 50
+
+# Journal records between snapshots. Replay of a few hundred small patches is
+# far cheaper than the snapshot rewrites they replace.
+COMPACT_RECORDS = 200
+
+# One probe's allowance: a single network timeout plus slack for parsing. A check
+# that makes several sequential requests declares a longer deadline itself.
+CHECK_DEADLINE_SECONDS = NETWORK_TIMEOUT_SECONDS + 5
+# The whole check phase. Kept well inside the smallest TimeoutStartSec of any
+# consumer (90 s) so delivery and the state commit always get to run.
+CYCLE_BUDGET_SECONDS = 60
+WORKERS = 8
+
+# Default settle time before an in-cycle re-probe; a poller's `confirm_after`
+# overrides it (see FAST CONFIRM). A guess at tailscaled's restart, not a timing
+# of one. Needs a budget above it: at CYCLE_BUDGET_SECONDS the re-probe never runs.
+FAST_CONFIRM_SECONDS = 60
+
+# See CIRCUIT BREAKER. A third of a network timeout separates "answered no" from
+# "waited on a dead host"; four cycles is an hour on csb0's 15-minute timer.
+BREAKER_FAILURES = 3
+BREAKER_PROBE_CYCLES = 4
+BREAKER_SLOW_SECONDS = NETWORK_TIMEOUT_SECONDS / 3
+
+# A writer that rewrites a file in several steps gets this long to finish before
+# the cycle it triggered reads it; see WATCHED FILES.
+WATCH_SETTLE_SECONDS = 2
+
+# Sent by read_heartbeat; a peer that sends nothing gets the legacy number.
+HEARTBEAT_REQUEST = b"v2\n"
+
+# Written beside the state file; see METRICS and HISTORY.
+METRICS_NAME = "metrics.prom"
+HISTORY_NAME = "history.jsonl"
+# A record is a few hundred bytes: one file holds about a month of a 15-minute
+# poller, and the rotations behind it five more.
+HISTORY_BYTES = 1 << 20
+HISTORY_KEEP = 5
+
 Sender = Callable[[str, str], bool]
 
 
@@ -78,6 +339,381 @@ class Problem:
     text: str
 
 
+@dataclass(frozen=True)
+class Check:
+    """One independent probe. `name` is stable across runs and unique per poller."""
+
+    name: str
+    run: Callable[[], list[Problem]]
+    deadline: float = CHECK_DEADLINE_SECONDS
+    every: float = 0  # seconds between runs; 0 = every cycle (see CADENCE)
+    watch: tuple[str, ...] = ()  # files whose change makes it due (see WATCHED FILES)
+
+
+@dataclass
+class Outcome:
+    """What one check produced this cycle, and how long it took to say so."""
+
+    name: str
+    problems: list[Problem] = field(default_factory=list)
+    seconds: float = 0.0
+    status: str = "ok"  # ok | problems | timeout | error | cached | held
+
+
+class WorkerPool:
+    """A bounded set of daemon threads that run checks.
+
+    Daemon threads because a probe that never returns must not keep the process
+    alive after the cycle is done. An abandoned worker is replaced at once so the
+    checks queued behind it still start; it retires when its probe finally ends.
+    """
+
+    def __init__(self, size: int = WORKERS) -> None:
+        self._size = max(1, size)
+        self._tasks: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._threads = 0
+        self._retiring = 0
+
+    def submit(self, function: Callable, *args) -> Future:
+        future: Future = Future()
+        self._tasks.put((future, function, args))
+        with self._lock:
+            if self._threads < self._size:
+                self._spawn()
+        return future
+
+    def abandon(self) -> None:
+        """Give up on one running task: replace its worker, retire it later."""
+        with self._lock:
+            self._retiring += 1
+            self._spawn()
+
+    def _spawn(self) -> None:
+        self._threads += 1
+        threading.Thread(target=self._work, name="fleet-check", daemon=True).start()
+
+    def _work(self) -> None:
+        while True:
+            future, function, args = self._tasks.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function(*args))
+                except BaseException as error:  # noqa: BLE001 - reported by the caller
+                    future.set_exception(error)
+            with self._lock:
+                if self._retiring:
+                    self._retiring -= 1
+                    self._threads -= 1
+                    return
+
+
+_POOL: WorkerPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def shared_pool() -> WorkerPool:
+    """The process's one pool. Idle workers never exit, so a resident poller that
+    built a pool per cycle leaked WORKERS threads every cycle; sharing one keeps
+    them warm instead."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = WorkerPool(WORKERS)
+        return _POOL
+
+
+def unknown(name: str, why: str) -> Problem:
+    """A check that could not give an answer is a problem of its own, never a pass."""
+    return Problem(f"check:{name}", f"{name}: {why} -- its state is unknown.")
+
+
+def run_checks(
+    checks: Sequence[Check],
+    *,
+    budget: float = CYCLE_BUDGET_SECONDS,
+    pool: WorkerPool | None = None,
+) -> list[Outcome]:
+    """Run independent checks concurrently; return one Outcome per check, in order.
+
+    A check's deadline counts from the moment a worker picks it up, so a check
+    queued behind others is not charged for their time; the cycle budget caps
+    everything, queued or not.
+    """
+    pool = pool or shared_pool()
+    begun: dict[str, float] = {}
+
+    def timed(check: Check) -> list[Problem]:
+        begun[check.name] = time.monotonic()
+        return list(check.run())
+
+    cycle_end = time.monotonic() + budget
+    futures = {pool.submit(timed, check): check for check in checks}
+    outcomes: dict[str, Outcome] = {}
+    waiting = set(futures)
+    while waiting:
+        now = time.monotonic()
+        limits: dict[Future, float] = {}
+        for future in waiting:
+            check = futures[future]
+            start = begun.get(check.name)
+            # Not started yet: it cannot start before `now`, so its deadline can
+            # be no earlier than now + deadline. Waking early is harmless.
+            limit = (start if start is not None else now) + check.deadline
+            limits[future] = min(limit, cycle_end)
+        expired = [f for f, limit in limits.items() if now >= limit and not f.done()]
+        # Cancel everything still queued BEFORE replacing abandoned workers, or a
+        # replacement could pick up a check the budget has already ruled out.
+        running = [f for f in expired if not f.cancel()]
+        for future in expired:
+            check = futures[future]
+            waiting.discard(future)
+            started = begun.get(check.name)
+            if started is None:
+                why = f"check never started within the {budget:g} s cycle budget"
+            elif started + check.deadline > cycle_end:
+                why = f"check ran out the {budget:g} s cycle budget"
+            else:
+                why = f"check did not finish within {check.deadline:g} s"
+            outcomes[check.name] = Outcome(
+                check.name, [unknown(check.name, why)], now - (started or now), "timeout"
+            )
+        for _ in running:
+            pool.abandon()
+        if not waiting:
+            break
+        done, _ = wait(
+            waiting,
+            timeout=max(0.0, min(limits[f] for f in waiting) - time.monotonic()),
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            check = futures[future]
+            waiting.discard(future)
+            seconds = time.monotonic() - begun.get(check.name, now)
+            try:
+                problems = future.result()
+            except Exception as error:  # noqa: BLE001 - a crashed check is a finding
+                outcomes[check.name] = Outcome(
+                    check.name,
+                    [unknown(check.name, f"check crashed ({type(error).__name__})")],
+                    seconds,
+                    "error",
+                )
+                continue
+            outcomes[check.name] = Outcome(
+                check.name, problems, seconds, "problems" if problems else "ok"
+            )
+    return [outcomes[check.name] for check in checks]
+
+
+def signature(paths: Sequence[str]) -> list:
+    """What identifies these files' contents without reading them; None if missing."""
+    found: list = []
+    for path in paths:
+        try:
+            info = os.stat(path)
+        except OSError:
+            found.append(None)
+        else:
+            found.append([info.st_ino, info.st_size, info.st_mtime_ns])
+    return found
+
+
+def split_due(
+    checks: Sequence[Check],
+    cache: Mapping[str, dict],
+    stamp: float,
+    files: Mapping[str, list] | None = None,
+) -> tuple[list[Check], list[Outcome]]:
+    """Checks to run now, and cached Outcomes for the ones not yet due.
+
+    `files` holds the current signature() of each watching check's files.
+    """
+    files = files or {}
+    due: list[Check] = []
+    cached: list[Outcome] = []
+    for check in checks:
+        entry = cache.get(check.name)
+        fresh = (check.every > 0 or bool(check.watch)) and isinstance(entry, dict)
+        if fresh and check.every > 0:
+            fresh = stamp - float(entry.get("at", 0)) < check.every
+        if fresh and check.watch:
+            fresh = entry.get("files") == files.get(check.name)
+        if fresh:
+            problems = [Problem(key, text) for key, text in entry.get("problems", [])]
+            cached.append(Outcome(check.name, problems, 0.0, "cached"))
+        else:
+            due.append(check)
+    return due, cached
+
+
+def remember(
+    checks: Sequence[Check],
+    outcomes: list[Outcome],
+    cache: dict,
+    stamp: float,
+    files: Mapping[str, list] | None = None,
+) -> dict:
+    """The cadence cache after this cycle: fresh answers of cacheable checks only.
+
+    A watching check's entry records the signature its files had BEFORE it ran,
+    so a rewrite that lands mid-run still makes the next cycle run it again.
+    """
+    files = files or {}
+    timed = {c.name for c in checks if c.every > 0 or c.watch}
+    kept = {name: entry for name, entry in cache.items() if name in timed}
+    for outcome in outcomes:
+        if outcome.name in timed and outcome.status in ("ok", "problems"):
+            kept[outcome.name] = {"at": stamp, "problems": [[p.key, p.text] for p in outcome.problems]}
+            if outcome.name in files:
+                kept[outcome.name]["files"] = files[outcome.name]
+    return kept
+
+
+class Watcher:
+    """Sets `wake` when a watched file is rewritten; see WATCHED FILES.
+
+    inotify through ctypes, so the engine stays standard-library only. Raises
+    OSError where inotify is unavailable; callers fall back to the timer.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+
+    def __init__(self, paths: Sequence[str], wake: threading.Event) -> None:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.wake = wake
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.names: dict[int, set[str]] = {}
+        for directory in sorted({os.path.dirname(os.path.abspath(p)) for p in paths}):
+            descriptor = libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+            )
+            if descriptor < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+            self.names[descriptor] = {
+                os.path.basename(p) for p in paths if os.path.dirname(os.path.abspath(p)) == directory
+            }
+        threading.Thread(target=self._read, name="fleet-watch", daemon=True).start()
+
+    def _read(self) -> None:
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError:
+                return
+            offset = 0
+            while offset + 16 <= len(data):
+                descriptor, _mask, _cookie, length = struct.unpack_from("iIII", data, offset)
+                name = data[offset + 16 : offset + 16 + length].rstrip(b"\0").decode(errors="replace")
+                offset += 16 + length
+                if name in self.names.get(descriptor, ()):
+                    self.wake.set()
+
+
+def watch(checks: Sequence[Check], wake: threading.Event) -> Watcher | None:
+    """A Watcher for every file these checks watch, or None (logged) if there is none."""
+    paths = sorted({path for check in checks for path in check.watch})
+    if not paths:
+        return None
+    try:
+        return Watcher(paths, wake)
+    except (OSError, AttributeError) as error:
+        print(f"file watch unavailable ({error}); relying on the timer")
+        return None
+
+
+def expensive(outcome: Outcome) -> bool:
+    """Did this failure cost real wall time? Only those count toward the breaker."""
+    if outcome.status == "timeout":
+        return True
+    return bool(outcome.problems) and outcome.seconds >= BREAKER_SLOW_SECONDS
+
+
+def split_open(checks: Sequence[Check], breakers: Mapping[str, dict]) -> tuple[list[Check], list[Outcome]]:
+    """Checks to probe now, and held Outcomes for those behind an open breaker."""
+    run: list[Check] = []
+    held: list[Outcome] = []
+    for check in checks:
+        entry = breakers.get(check.name)
+        if (
+            isinstance(entry, dict)
+            and int(entry.get("failures", 0)) >= BREAKER_FAILURES
+            and int(entry.get("held", 0)) < BREAKER_PROBE_CYCLES - 1
+        ):
+            problems = [Problem(key, text) for key, text in entry.get("problems", [])]
+            held.append(Outcome(check.name, problems, 0.0, "held"))
+        else:
+            run.append(check)
+    return run, held
+
+
+def trip(checks: Sequence[Check], outcomes: list[Outcome], breakers: dict) -> dict:
+    """The breakers after this cycle: count expensive failures, reset on a cheap answer."""
+    names = {c.name for c in checks}
+    after: dict[str, dict] = {}
+    for outcome in outcomes:
+        entry = breakers.get(outcome.name)
+        if outcome.status == "held" and isinstance(entry, dict):
+            after[outcome.name] = {**entry, "held": int(entry.get("held", 0)) + 1}
+        elif outcome.status == "cached" and isinstance(entry, dict):
+            after[outcome.name] = entry
+        elif expensive(outcome):
+            failures = int(entry.get("failures", 0)) if isinstance(entry, dict) else 0
+            after[outcome.name] = {
+                "failures": failures + 1,
+                "held": 0,
+                "problems": [[p.key, p.text] for p in outcome.problems],
+            }
+    return {name: entry for name, entry in after.items() if name in names}
+
+
+def fast_confirm(
+    checks: Sequence[Check],
+    outcomes: list[Outcome],
+    seen: Mapping[str, dict],
+    settle: float,
+    budget: float,
+    pool: WorkerPool | None = None,
+    stop: threading.Event | None = None,
+) -> tuple[list[Outcome], dict[str, int]]:
+    """Re-probe only the checks that saw something new; see FAST CONFIRM.
+
+    Returns the outcomes with those checks' results replaced by the re-probe,
+    and the keys that both probes saw, which count as two sightings. If the
+    settle delay would not leave budget for the re-probe it is skipped, and
+    confirmation falls back to the next cycle. So it is when `stop` is set
+    during the settle: SIGTERM should not wait out a minute of nothing.
+    """
+    fresh = {o.name for o in outcomes if any(p.key not in seen for p in o.problems)}
+    if not fresh or budget - settle <= 0:
+        return outcomes, {}
+    first = {o.name: {p.key for p in o.problems if p.key not in seen} for o in outcomes}
+    if (stop or threading.Event()).wait(settle):
+        return outcomes, {}
+    rerun = [c for c in checks if c.name in fresh]
+    again = {o.name: o for o in run_checks(rerun, budget=budget - settle, pool=pool)}
+    twice = {
+        problem.key: 2
+        for name, outcome in again.items()
+        for problem in outcome.problems
+        if problem.key in first[name]
+    }
+    return [again.get(o.name, o) for o in outcomes], twice
+
+
+def gather(checks: Sequence[Check], **options) -> list[Problem]:
+    """Every problem from a concurrent run of `checks`, in check order."""
+    return [problem for outcome in run_checks(checks, **options) for problem in outcome.problems]
+
+
 def atomic_write_state(path: str, state: dict) -> None:
     """Write state so a crash mid-write cannot corrupt it.
 
@@ -103,22 +739,21 @@ def atomic_write_state(path: str, state: dict) -> None:
         raise
 
 
-def load_state(path: str) -> dict:
-    """Read state, tolerating absence, corruption and the pre-OPS-107 formats."""
-    try:
-        with open(path, encoding="utf-8") as handle:
-            raw = json.load(handle)
-    except Exception:
-        return {"seen": {}, "pending": None}
+def empty_state() -> dict:
+    return {"seen": {}, "outbox": []}
+
+
+def normalise(raw: object) -> dict:
+    """State in the current shape, from any format this engine has ever written."""
     if not isinstance(raw, dict):
-        return {"seen": {}, "pending": None}
+        return empty_state()
 
     seen = raw.get("seen")
     if not isinstance(seen, dict):
         # ops-alerts v1 was {key: message}; v2 was {key: {msg, count, alerted}}.
         seen = {}
         for key, value in raw.items():
-            if key == "pending":
+            if key in ("pending", "outbox", "seq"):
                 continue
             if isinstance(value, str):
                 seen[key] = {"text": value, "count": CONFIRM_RUNS, "alerted": True}
@@ -128,17 +763,254 @@ def load_state(path: str) -> dict:
                     "count": int(value.get("count", CONFIRM_RUNS)),
                     "alerted": bool(value.get("alerted", False)),
                 }
+    outbox = [
+        {"event_id": str(e.get("event_id", "retry")), "text": e["text"]}
+        | ({"at": e["at"]} if isinstance(e.get("at"), (int, float)) else {})
+        | ({"sent": e["sent"]} if isinstance(e.get("sent"), int) and e["sent"] > 0 else {})
+        for e in raw.get("outbox") or []
+        if isinstance(e, dict) and isinstance(e.get("text"), str)
+    ]
+    # The single-slot format held one undelivered event and the state to commit
+    # once it went out. Committing that state now, with the event queued, is
+    # exactly what the outbox would have written.
     pending = raw.get("pending")
-    return {"seen": seen, "pending": pending if isinstance(pending, dict) else None}
+    if isinstance(pending, dict) and isinstance(pending.get("text"), str):
+        committed = pending.get("next_state")
+        if isinstance(committed, dict) and isinstance(committed.get("seen"), dict):
+            seen = committed["seen"]
+        outbox.append({"event_id": str(pending.get("event_id", "retry")), "text": pending["text"]})
+    state = {"seen": seen, "outbox": outbox}
+    # Per-check bookkeeping (CADENCE, CIRCUIT BREAKER) is carried as-is.
+    for name in ("checks", "breakers"):
+        if isinstance(raw.get(name), dict):
+            state[name] = raw[name]
+    return state
+
+
+def merge_patch(previous: dict, current: dict) -> dict:
+    """RFC 7396 patch turning `previous` into `current`. State never stores null."""
+    patch: dict = {}
+    for key, value in current.items():
+        before = previous.get(key)
+        if isinstance(value, dict) and isinstance(before, dict):
+            inner = merge_patch(before, value)
+            if inner:
+                patch[key] = inner
+        elif key not in previous or before != value:
+            patch[key] = value
+    for key in previous:
+        if key not in current:
+            patch[key] = None
+    return patch
+
+
+def apply_patch(target: dict, patch: dict) -> dict:
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            apply_patch(target[key], value)
+        else:
+            target[key] = json.loads(json.dumps(value))
+    return target
+
+
+def read_journal(path: str, after: int) -> tuple[list[dict], int]:
+    """Whole records with seq > `after`, and the byte length of the intact prefix."""
+    records: list[dict] = []
+    intact = 0
+    try:
+        with open(path, "rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break  # torn by a crash mid-append
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not isinstance(record, dict) or not isinstance(record.get("patch"), dict):
+                    break
+                intact += len(line)
+                if int(record.get("seq", 0)) > after:
+                    records.append(record)
+    except OSError:
+        pass
+    return records, intact
+
+
+def read_state(path: str) -> tuple[dict, int, int, int]:
+    """(state, seq, journal records, intact journal bytes) from snapshot + journal."""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            raw = json.load(handle)
+    except Exception:
+        raw = None
+    state = normalise(raw)
+    seq = int(raw.get("seq", 0)) if isinstance(raw, dict) else 0
+    records, intact = read_journal(path + ".journal", seq)
+    for record in records:
+        apply_patch(state, record["patch"])
+        seq = int(record["seq"])
+    return state, seq, len(records), intact
+
+
+def load_state(path: str) -> dict:
+    """Read state, tolerating absence, corruption and the pre-OPS-107 formats."""
+    return read_state(path)[0]
+
+
+class StateStore:
+    """The snapshot + journal pair for one poller; see THE STATE JOURNAL."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.journal = path + ".journal"
+        self._state, self._seq, self._records, intact = read_state(path)
+        self.spent = 0.0  # seconds spent in save(), for METRICS
+        # Cut a torn tail off before anything is appended after it, or replay
+        # would stop at the tear and never see the newer records.
+        try:
+            if os.path.getsize(self.journal) > intact:
+                os.truncate(self.journal, intact)
+        except OSError:
+            pass
+
+    @property
+    def state(self) -> dict:
+        """A private copy of the committed state, safe to mutate."""
+        return json.loads(json.dumps(self._state))
+
+    def save(self, state: dict, op: str) -> None:
+        """Make `state` durable as one journal record, or stamp only if unchanged."""
+        began = time.monotonic()
+        try:
+            self._save(state, op)
+        finally:
+            self.spent += time.monotonic() - began
+
+    def _save(self, state: dict, op: str) -> None:
+        patch = merge_patch(self._state, state)
+        if not patch and os.path.exists(self.path):
+            self.stamp()
+            return
+        self._seq += 1
+        if not os.path.exists(self.path) or self._records + 1 >= COMPACT_RECORDS:
+            self._state = json.loads(json.dumps(state))
+            self.compact()
+            return
+        line = json.dumps(
+            {"seq": self._seq, "op": op, "patch": patch}, sort_keys=True, separators=(",", ":")
+        )
+        descriptor = os.open(self.journal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(descriptor, (line + "\n").encode())
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+        self._records += 1
+        self._state = json.loads(json.dumps(state))
+        self.stamp()
+
+    def compact(self) -> None:
+        """Fold everything into a fresh snapshot, then empty the journal."""
+        atomic_write_state(self.path, {**self._state, "seq": self._seq})
+        try:
+            os.truncate(self.journal, 0)
+        except FileNotFoundError:
+            pass
+        self._records = 0
+
+    def stamp(self) -> None:
+        """Touch the state file for heartbeat.nix: metadata only, no fsync."""
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            self.compact()
+
+
+@dataclass(frozen=True)
+class Heartbeat:
+    """What a peer's heartbeat.py reports about its poller; see HEARTBEAT.
+
+    From a legacy server only `at` is known and the rest stay None.
+    """
+
+    at: float  # end of the last cycle (the state file's mtime); 0 = never ran
+    seconds: float | None = None  # how long that cycle took
+    problems: int | None = None  # announced problems still standing
+    pending: float | None = None  # since when a delivery has waited; 0 = nothing pending
+    seq: int | None = None  # cycles the server has seen; moves only if cycles happen
+
+    def line(self) -> str:
+        """The v2 reply: `v2 at=... seconds=...`, unknown fields left out."""
+        fields = [f"at={int(self.at)}"]
+        if self.seconds is not None:
+            fields.append(f"seconds={self.seconds:.3f}")
+        for name in ("problems", "pending", "seq"):
+            value = getattr(self, name)
+            if value is not None:
+                fields.append(f"{name}={int(value)}")
+        return "v2 " + " ".join(fields)
+
+    @classmethod
+    def parse(cls, raw: str) -> "Heartbeat":
+        """Either reply: a v2 line or a legacy bare number. ValueError otherwise."""
+        words = raw.split()
+        if words[:1] != ["v2"]:
+            return cls(float(raw))
+        fields = dict(word.split("=", 1) for word in words[1:] if "=" in word)
+        if "at" not in fields:
+            raise ValueError("heartbeat without at=")
 
+        def number(name: str, kind: Callable) -> object:
+            return kind(fields[name]) if name in fields else None
 
-def advance(previous: dict, problems: list[Problem]) -> tuple[dict, list[str], list[str]]:
+        return cls(
+            float(fields["at"]),
+            number("seconds", float),  # type: ignore[arg-type]
+            number("problems", int),  # type: ignore[arg-type]
+            number("pending", float),  # type: ignore[arg-type]
+            number("seq", int),  # type: ignore[arg-type]
+        )
+
+
+def read_heartbeat(address: str, port: int, timeout: float = NETWORK_TIMEOUT_SECONDS) -> Heartbeat:
+    """Ask a peer's heartbeat server how its poller is doing; see HEARTBEAT.
+
+    A pre-v2 server writes its number and closes without reading, which can
+    reset the connection under our request; that is retried once as a legacy
+    read, so a peer upgraded first still watches one that is not.
+    """
+    try:
+        return Heartbeat.parse(_heartbeat_exchange(address, port, timeout, HEARTBEAT_REQUEST))
+    except (ConnectionResetError, BrokenPipeError):
+        return Heartbeat.parse(_heartbeat_exchange(address, port, timeout, b""))
+
+
+def _heartbeat_exchange(address: str, port: int, timeout: float, request: bytes) -> str:
+    with socket.create_connection((address, port), timeout=timeout) as sock:
+        if request:
+            sock.sendall(request)
+        raw = b""
+        while len(raw) < 256 and (chunk := sock.recv(256)):
+            raw += chunk
+    return raw.decode()
+
+
+def advance(
+    previous: dict,
+    problems: list[Problem],
+    sightings: Mapping[str, int] | None = None,
+) -> tuple[dict, list[str], list[str]]:
     """Fold this run's problems into state; return (next_state, to_announce, cleared).
 
     `to_announce` holds only problems confirmed on CONFIRM_RUNS consecutive runs.
     `cleared` holds only problems that were actually announced -- otherwise a
     single blip produces a "recovered" message for something never reported.
+    `sightings` says how many consecutive independent observations this cycle
+    made of a key (default 1); a fast-confirm re-probe makes it 2.
     """
+    sightings = sightings or {}
     seen_before = previous.get("seen", {})
     current = {p.key: p.text for p in problems}
 
@@ -146,7 +1018,9 @@ def advance(previous: dict, problems: list[Problem]) -> tuple[dict, list[str], l
     to_announce: list[str] = []
     for key, text in current.items():
         prior = seen_before.get(key, {})
-        count = int(prior.get("count", 0)) + 1
+        # Saturates: past confirmation the count carries no information, and a
+        # steady outage should leave state -- and the disk -- unchanged.
+        count = min(int(prior.get("count", 0)) + sightings.get(key, 1), CONFIRM_RUNS)
         alerted = bool(prior.get("alerted", False))
         if count >= CONFIRM_RUNS and not alerted:
             to_announce.append(text)
@@ -158,7 +1032,8 @@ def advance(previous: dict, problems: list[Problem]) -> tuple[dict, list[str], l
         for key, prior in seen_before.items()
         if key not in current and prior.get("alerted")
     ]
-    return {"seen": seen_now, "pending": None}, to_announce, cleared
+    next_state = {**previous, "seen": seen_now, "outbox": list(previous.get("outbox", []))}
+    return next_state, to_announce, cleared
 
 
 def event_id(stamp: float, announced: list[str], cleared: list[str]) -> str:
@@ -172,28 +1047,263 @@ def event_id(stamp: float, announced: list[str], cleared: list[str]) -> str:
     return digest.hexdigest()[:12]
 
 
-def telegram_sender(token: str, chat_id: str) -> Sender:
-    """Sender posting to Telegram. Credentials are never logged."""
+def enqueue(outbox: list[dict], event: dict) -> list[dict]:
+    """Append `event`; past OUTBOX_LIMIT fold the two oldest into one, never drop."""
+    queued = [*outbox, event]
+    while len(queued) > OUTBOX_LIMIT:
+        first, second, *rest = queued
+        folded = {
+            "event_id": f"{first['event_id']}+{second['event_id']}"[-64:],
+            "text": f"{first['text']}\n\n{second['text']}",
+        }
+        # The first entry's fields describe the folded one: when it was queued,
+        # and how many of its chunks are already out (its text is the remainder).
+        folded.update({k: first[k] for k in ("at", "sent") if k in first})
+        queued = [folded, *rest]
+    return queued
 
-    def send(text: str, identifier: str) -> bool:
-        payload = urllib.parse.urlencode(
-            {"chat_id": chat_id, "text": text, "disable_web_page_preview": "true"}
-        ).encode()
-        url = urllib.parse.urlunsplit(
-            ("https", "api.telegram.org", f"/bot{token}/sendMessage", "", "")
+
+def digest(events: list[dict]) -> tuple[str, str, int]:
+    """(identifier, text, count) for the longest run of oldest events that fits one message.
+
+    A single event goes out verbatim, so a retry of one alert is the identical
+    text. Several are joined under a header saying they were held back. An event
+    over the limit never reaches here; drain() sends it in chunks.
+    """
+    if len(events) == 1:
+        return events[0]["event_id"], events[0]["text"], 1
+    taken = 1
+    length = len(events[0]["text"])
+    while taken < len(events) and length + 2 + len(events[taken]["text"]) + 80 <= MESSAGE_LIMIT:
+        length += 2 + len(events[taken]["text"])
+        taken += 1
+    if taken == 1:
+        return events[0]["event_id"], events[0]["text"], 1
+    batch = events[:taken]
+    header = f"\u23f3 {taken} updates held back while delivery was failing, oldest first:"
+    identifier = "+".join(e["event_id"] for e in batch)
+    text = "\n\n".join([header] + [e["text"] for e in batch])
+    return identifier[:64], text, taken
+
+
+def chunks(text: str, limit: int = CHUNK_LIMIT) -> list[tuple[str, int]]:
+    """Split `text` into pieces of at most `limit`, each with the characters it consumes.
+
+    A piece ends at the last line break that fits, which it consumes but does
+    not send; a line longer than `limit` is cut. Blank lines are kept, so the
+    consumed counts add up to len(text) and chunking text[consumed:] gives the
+    remaining pieces again -- which is what lets drain() resume mid-event. A
+    break that ends the text leaves nothing after it, and no empty piece is made
+    of that nothing: drain() would send it as a bare "(3/3) ".
+    """
+    pieces: list[tuple[str, int]] = []
+    at = 0
+    while len(text) - at > limit:
+        cut = text.rfind("\n", at + 1, at + limit + 1)
+        if cut == -1:
+            pieces.append((text[at:at + limit], limit))
+            at += limit
+        else:
+            pieces.append((text[at:cut], cut + 1 - at))
+            at = cut + 1
+    if at < len(text) or not pieces:
+        pieces.append((text[at:], len(text) - at))
+    return pieces
+
+
+def drain(store: StateStore, state: dict, sender: Sender) -> bool:
+    """Deliver the outbox oldest first, committing after each send; True if emptied."""
+    while state["outbox"]:
+        head = state["outbox"][0]
+        if len(head["text"]) > MESSAGE_LIMIT or head.get("sent"):
+            # An oversized event: one chunk per send, each committed on its own.
+            pieces = chunks(head["text"])
+            sent = int(head.get("sent", 0))
+            piece, consumed = pieces[0]
+            text = f"({sent + 1}/{sent + len(pieces)}) {piece}"
+            if not sender(text, f"{head['event_id']}.{sent + 1}"):
+                print(f"undelivered; {len(state['outbox'])} event(s) left in the outbox")
+                return False
+            print(text)
+            if len(pieces) > 1:
+                state["outbox"][0] = {**head, "text": head["text"][consumed:], "sent": sent + 1}
+            else:
+                state["outbox"] = state["outbox"][1:]
+            store.save(state, "commit")
+            continue
+        identifier, text, count = digest(state["outbox"])
+        if not sender(text, identifier):
+            print(f"undelivered; {len(state['outbox'])} event(s) left in the outbox")
+            return False
+        print(text)
+        state["outbox"] = state["outbox"][count:]
+        store.save(state, "commit")
+    return True
+
+
+@dataclass(frozen=True)
+class SendTiming:
+    """Where one delivery's time went.
+
+    `connection` is "new" (handshake paid inside the send), "prewarmed"
+    (handshake paid in the background during the checks; connect/tls show what
+    it cost) or "reused" (no handshake at all; connect/tls are 0).
+    """
+
+    identifier: str
+    connect: float
+    tls: float
+    request: float
+    connection: str
+    status: int
+
+
+class TelegramClient:
+    """One TLS context and one keep-alive connection to api.telegram.org.
+
+    Shared by every recipient and every retry, so a cycle pays for at most one
+    handshake -- and prewarm() lets that handshake happen on a background thread
+    while the checks are still running. The lock serialises use of the one
+    connection; a send that arrives during a prewarm simply waits for it.
+    """
+
+    # A connection idle longer than this is replaced before use rather than
+    # trusted. Just under the 120 s ops-alerts budget, so a prewarm survives the
+    # slowest check phase; a connection the server closed sooner is caught by the
+    # one-retry rule in post().
+    IDLE_SECONDS = 110
+
+    def __init__(
+        self,
+        host: str = TELEGRAM_HOST,
+        port: int = 443,
+        context: ssl.SSLContext | None = None,
+        timeout: float = NETWORK_TIMEOUT_SECONDS,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._context = context or ssl.create_default_context()
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._connection: http.client.HTTPSConnection | None = None
+        self._used = 0.0
+        # Handshake cost of a connection not yet reported by a send, and whether
+        # it was paid by prewarm() rather than by the send itself.
+        self._setup: tuple[float, float, str] | None = None
+        self.timings: deque[SendTiming] = deque(maxlen=64)
+
+    def prewarm(self) -> None:
+        """Open the connection in the background; never raises, never blocks."""
+
+        def warm() -> None:
+            with self._lock:
+                try:
+                    self._ready("prewarmed")
+                except Exception:  # noqa: BLE001 - the send itself retries and reports
+                    self._close()
+
+        threading.Thread(target=warm, name="telegram-prewarm", daemon=True).start()
+
+    def post(self, path: str, fields: dict[str, str], identifier: str) -> SendTiming:
+        """POST form `fields` to `path` and return this send's timing and status.
+
+        Transport failures raise. The path carries the bot token, so it is never
+        put into a message or an exception. The timing is returned rather than
+        read back from `timings`: once the lock is released another recipient's
+        send may already have appended its own.
+        """
+        body = urllib.parse.urlencode(fields).encode()
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        with self._lock:
+            for attempt in (1, 2):
+                self._ready("new")
+                connect, tls, kind = self._setup or (0.0, 0.0, "reused")
+                self._setup = None
+                started = time.perf_counter()
+                try:
+                    self._connection.request("POST", path, body, headers)  # type: ignore[union-attr]
+                    response = self._connection.getresponse()  # type: ignore[union-attr]
+                    response.read()
+                except (
+                    http.client.RemoteDisconnected,
+                    ConnectionResetError,
+                    BrokenPipeError,
+                    ssl.SSLEOFError,
+                ):
+                    self._close()
+                    # The server closed a kept-alive connection under us before
+                    # answering, so one retry on a fresh connection is safe.
+                    if kind != "new" and attempt == 1:
+                        continue
+                    raise
+                except Exception:
+                    self._close()
+                    raise
+                self._used = time.monotonic()
+                if response.will_close:
+                    self._close()
+                timing = SendTiming(identifier, connect, tls, time.perf_counter() - started, kind, response.status)
+                self.timings.append(timing)
+                return timing
+        raise ConnectionError("connection closed twice in a row")
+
+    def _ready(self, kind: str) -> None:
+        """Make sure a live connection exists, opening one if needed."""
+        if self._connection is not None and time.monotonic() - self._used < self.IDLE_SECONDS:
+            return
+        self._close()
+        began = time.perf_counter()
+        raw = socket.create_connection((self._host, self._port), timeout=self._timeout)
+        connected = time.perf_counter()
+        raw.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            secured = self._context.wrap_socket(raw, server_hostname=self._host)
+        except Exception:
+            raw.close()
+            raise
+        connection = http.client.HTTPSConnection(
+            self._host, self._port, timeout=self._timeout, context=self._context
         )
-        request = urllib.request.Request(url, data=payload)
+        connection.sock = secured
+        self._connection = connection
+        self._used = time.monotonic()
+        self._setup = (connected - began, time.perf_counter() - connected, kind)
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:  # noqa: BLE001 - teardown must not mask the result
+                pass
+        self._connection = None
+        self._setup = None
+
+
+def telegram_sender(token: str, chat_id: str, client: TelegramClient | None = None) -> Sender:
+    """Sender posting to Telegram. Credentials are never logged.
+
+    Pass a shared `client` to reuse one connection across recipients; the
+    returned sender exposes it as `.client` and its prewarm as `.prewarm`.
+    """
+    client = client or TelegramClient()
+    path = f"/bot{token}/sendMessage"
+
+    def send(text: str, identifier: str) -> bool:
+        fields = {"chat_id": chat_id, "text": text, "disable_web_page_preview": "true"}
         try:
-            with urllib.request.urlopen(  # noqa: S310 - scheme and host are literals
-                request,
-                timeout=NETWORK_TIMEOUT_SECONDS,
-                context=ssl.create_default_context(),
-            ):
-                return True
+            timing = client.post(path, fields, identifier)
         except Exception as error:  # noqa: BLE001
             print(f"delivery failed for {identifier}: {type(error).__name__}")
             return False
+        print(
+            f"delivery {identifier}: HTTP {timing.status}, {timing.connection} connection, "
+            f"connect {timing.connect * 1000:.0f} ms, tls {timing.tls * 1000:.0f} ms, "
+            f"request {timing.request * 1000:.0f} ms"
+        )
+        return 200 <= timing.status < 300
 
+    send.client = client  # type: ignore[attr-defined]
+    send.prewarm = client.prewarm  # type: ignore[attr-defined]
     return send
 
 
@@ -219,7 +1329,7 @@ def env_file_value(path: str, key: str) -> str:
     return ""
 
 
-def shoutrrr_telegram_sender(url: str) -> Sender:
+def shoutrrr_telegram_sender(url: str, client: TelegramClient | None = None) -> Sender:
     """Sender from a shoutrrr `telegram://TOKEN@telegram?chats=ID` URL.
 
     Lets csb1 reuse its existing WATCHTOWER_NOTIFICATION_URL secret unchanged --
@@ -240,55 +1350,654 @@ def shoutrrr_telegram_sender(url: str) -> Sender:
     if not token or not recipients:
         raise ValueError("unsupported notification target")
 
-    senders = [telegram_sender(token, chat) for chat in recipients]
+    client = client or TelegramClient()
+    senders = [telegram_sender(token, chat, client) for chat in recipients]
 
     def send(text: str, identifier: str) -> bool:
         # All recipients must receive it, or the cycle retries for everyone --
         # partial delivery would leave the write-ahead log claiming success.
         return all(one(text, identifier) for one in senders)
 
+    send.client = client  # type: ignore[attr-defined]
+    send.prewarm = client.prewarm  # type: ignore[attr-defined]
     return send
 
 
+def metric_labels(**labels: str) -> str:
+    """`{a="1",b="2"}` with the exposition format's escaping, or "" for none."""
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_metrics(
+    stamp: float,
+    seconds: float,
+    outcomes: list[Outcome],
+    sends: list[tuple[float, bool]],
+    write_seconds: float,
+    state: dict,
+) -> str:
+    """The METRICS textfile for one cycle; gauges only, since each file is one cycle."""
+    families: list[tuple[str, str, list[tuple[str, float]]]] = []
+
+    def family(name: str, about: str, *samples: tuple[str, float]) -> None:
+        families.append((f"fleet_alerts_{name}", about, list(samples)))
+
+    family("cycle_timestamp_seconds", "When the last cycle ran.", ("", stamp))
+    family("cycle_duration_seconds", "Wall time of the last cycle, checks to delivery.", ("", seconds))
+    family(
+        "check_duration_seconds",
+        "Wall time of each check in the last cycle; 0 when cached or held.",
+        *((metric_labels(check=o.name), o.seconds) for o in outcomes),
+    )
+    family(
+        "check_status",
+        "1 for each check's outcome in the last cycle.",
+        *((metric_labels(check=o.name, status=o.status), 1) for o in outcomes),
+    )
+    counts: dict[str, int] = {}
+    for outcome in outcomes:
+        counts[outcome.status] = counts.get(outcome.status, 0) + 1
+    family(
+        "check_outcomes",
+        "Checks per outcome in the last cycle.",
+        *((metric_labels(status=status), count) for status, count in sorted(counts.items())),
+    )
+    family(
+        "delivery_attempts",
+        "Sends attempted in the last cycle, by result.",
+        (metric_labels(result="sent"), sum(1 for _, ok in sends if ok)),
+        (metric_labels(result="failed"), sum(1 for _, ok in sends if not ok)),
+    )
+    family(
+        "delivery_duration_seconds",
+        "Wall time spent sending in the last cycle.",
+        ("", sum(spent for spent, _ in sends)),
+    )
+    family(
+        "state_write_duration_seconds",
+        "Wall time spent making state durable in the last cycle.",
+        ("", write_seconds),
+    )
+    ages = [stamp - e["at"] for e in state["outbox"] if isinstance(e.get("at"), (int, float))]
+    family("outbox_events", "Events waiting for delivery.", ("", len(state["outbox"])))
+    family(
+        "outbox_oldest_age_seconds",
+        "Age of the oldest undelivered event; 0 when the outbox is empty.",
+        ("", max(ages, default=0.0)),
+    )
+    family("active_problems", "Problems seen in the last cycle.", ("", len(state["seen"])))
+    family(
+        "confirm_backlog",
+        "Problems seen but not yet confirmed and announced.",
+        ("", sum(1 for v in state["seen"].values() if not v["alerted"])),
+    )
+
+    lines: list[str] = []
+    for name, about, samples in families:
+        lines += [f"# HELP {name} {about}", f"# TYPE {name} gauge"]
+        lines += [f"{name}{labels} {float(value)!r}" for labels, value in samples]
+    return "\n".join(lines + ["# EOF"]) + "\n"
+
+
+def write_metrics(state_path: str, text: str) -> None:
+    """Replace the METRICS file atomically; log, never raise, if that fails."""
+    destination = Path(state_path).with_name(METRICS_NAME)
+    try:
+        descriptor, temporary = tempfile.mkstemp(prefix=".metrics-", dir=destination.parent)
+        try:
+            os.fchmod(descriptor, 0o644)
+            with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+                handle.write(text)
+            os.replace(temporary, destination)
+        except Exception:
+            os.unlink(temporary)
+            raise
+    except OSError as error:
+        print(f"metrics not written ({type(error).__name__}: {error})")
+
+
+def append_history(state_path: str, record: dict) -> None:
+    """Append one cycle to HISTORY, rotating first if the file is full; never raise."""
+    current = Path(state_path).with_name(HISTORY_NAME)
+    line = json.dumps(record, sort_keys=True, separators=(",", ":")) + "\n"
+    try:
+        if current.exists() and current.stat().st_size + len(line) > HISTORY_BYTES:
+            for n in range(HISTORY_KEEP - 1, 0, -1):
+                older = current.with_name(f"{HISTORY_NAME}.{n}")
+                if older.exists():
+                    os.replace(older, current.with_name(f"{HISTORY_NAME}.{n + 1}"))
+            os.replace(current, current.with_name(f"{HISTORY_NAME}.1"))
+        descriptor = os.open(current, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, line.encode())
+        finally:
+            os.close(descriptor)
+    except OSError as error:
+        print(f"history not written ({type(error).__name__}: {error})")
+
+
 def run_cycle(
     state_path: str,
     stamp: float,
-    check: Callable[[], list[Problem]],
+    check: Callable[[], list[Problem]] | Sequence[Check],
     render: Callable[[list[str], list[str]], str],
     sender: Sender,
+    *,
+    budget: float = CYCLE_BUDGET_SECONDS,
+    confirm_after: float | None = None,
+    pool: WorkerPool | None = None,
+    stop: threading.Event | None = None,
 ) -> int:
-    """One poll. See the module docstring for the write-ahead-log contract."""
-    state = load_state(state_path)
-
-    # An alert left undelivered by a previous run is re-sent verbatim before any
-    # new evaluation, so ordering is preserved and nothing is silently dropped.
-    pending = state.get("pending")
-    if isinstance(pending, dict) and pending.get("text"):
-        if not sender(pending["text"], pending.get("event_id", "retry")):
-            print("still undelivered; leaving pending in place")
-            return EXIT_UNDELIVERED
-        atomic_write_state(state_path, pending.get("next_state") or {"seen": {}, "pending": None})
-        state = load_state(state_path)
-
-    problems = check()
-    next_state, announce, cleared = advance(state, problems)
+    """One poll. See the module docstring for the write-ahead-log contract.
+
+    `check` is either one collect() callable or a sequence of named Checks to run
+    concurrently (see PARALLEL CHECKS). With named checks, `confirm_after` turns
+    on the in-cycle re-probe described under FAST CONFIRM, and `pool` gives them
+    a pool of their own instead of the process's shared one (see HOST RUNNER).
+    `stop` is the resident process's shutdown event; it cuts the settle short.
+    """
+    started = time.monotonic()
+    store = StateStore(state_path)
+    state = store.state
+
+    # Open the Telegram connection while the checks run -- but only when this
+    # cycle can have something to say. Announcing needs a prior sighting,
+    # clearing needs a prior announcement and a backlog needs sending, so with
+    # none of those a quiet fleet never dials out.
+    prewarm = getattr(sender, "prewarm", None)
+    if prewarm is not None and (state["seen"] or state["outbox"]):
+        prewarm()
+
+    # Evaluation runs even while earlier events are still undelivered, so a
+    # channel outage delays alerts but never hides the transitions behind them.
+    sightings: dict[str, int] = {}
+    outcomes: list[Outcome] = []
+    probed: list[Outcome] = []  # what HISTORY records: the first probe, not the re-probe
+    confirmed: list[Outcome] = []
+    if callable(check):
+        problems = check()
+    else:
+        began = time.monotonic()
+        files = {c.name: signature(c.watch) for c in check if c.watch}
+        due, cached = split_due(check, state.get("checks", {}), stamp, files)
+        due, held = split_open(due, state.get("breakers", {}))
+        for outcome in held:
+            print(f"breaker open: {outcome.name} held, probed every {BREAKER_PROBE_CYCLES} cycles")
+        outcomes = run_checks(due, budget=budget, pool=pool) if due else []
+        probed = outcomes
+        if confirm_after is not None:
+            if prewarm is not None and any(o.problems for o in outcomes):
+                prewarm()  # a confirmed first sighting would page this cycle
+            outcomes, sightings = fast_confirm(
+                due, outcomes, state["seen"], confirm_after, budget - (time.monotonic() - began), pool, stop
+            )
+            confirmed = [o for o, first in zip(outcomes, probed) if o is not first]
+        for outcome in cached + held:
+            sightings.update({p.key: 0 for p in outcome.problems})
+        if any(c.every > 0 or c.watch for c in check) or "checks" in state:
+            state["checks"] = remember(check, outcomes, state.get("checks", {}), stamp, files)
+        order = {c.name: i for i, c in enumerate(check)}
+        outcomes = sorted(outcomes + cached + held, key=lambda o: order[o.name])
+        probed = sorted(probed + cached + held, key=lambda o: order[o.name])
+        breakers = trip(check, outcomes, state.get("breakers", {}))
+        if breakers or "breakers" in state:
+            state["breakers"] = breakers
+        problems = [problem for outcome in outcomes for problem in outcome.problems]
+    next_state, announce, cleared = advance(state, problems, sightings)
 
     if announce or cleared:
-        text = render(announce, cleared)
-        identifier = event_id(stamp, announce, cleared)
-        # Write-ahead: pending is durable BEFORE the send is attempted.
-        staged = dict(state)
-        staged["pending"] = {"event_id": identifier, "text": text, "next_state": next_state}
-        atomic_write_state(state_path, staged)
-        if not sender(text, identifier):
-            return EXIT_UNDELIVERED
-        print(text)
+        event = {
+            "event_id": event_id(stamp, announce, cleared),
+            "text": render(announce, cleared),
+            "at": stamp,
+        }
+        next_state["outbox"] = enqueue(next_state["outbox"], event)
+    # Write-ahead: the new event is durable in the same record that commits the
+    # new `seen`, BEFORE any send is attempted. A quiet cycle appends one small
+    # record here, or none at all if nothing changed -- the state file is stamped
+    # for heartbeat.nix either way.
+    store.save(next_state, "stage" if announce or cleared else "advance")
+    sends: list[tuple[float, bool]] = []
+
+    def timed(text: str, identifier: str) -> bool:
+        began = time.monotonic()
+        ok = sender(text, identifier)
+        sends.append((time.monotonic() - began, ok))
+        return ok
 
-    atomic_write_state(state_path, next_state)
+    delivered = drain(store, next_state, timed)
+    seconds = time.monotonic() - started
+    write_metrics(
+        state_path,
+        render_metrics(stamp, seconds, outcomes, sends, store.spent, next_state),
+    )
+    # HISTORY keeps what the first probe saw and how long it took; a fast-confirm
+    # re-probe goes beside it, so a blip it swallowed is still on record.
+    seen_first = problems if callable(check) else [p for o in probed for p in o.problems]
+    record = {
+        "at": stamp,
+        "seconds": round(seconds, 4),
+        "checks": {o.name: [round(o.seconds, 4), o.status] for o in probed},
+        "problems": sorted(p.key for p in seen_first),
+        "announced": sorted(
+            key
+            for key, entry in next_state["seen"].items()
+            if entry["alerted"] and not state["seen"].get(key, {}).get("alerted")
+        ),
+        "cleared": sorted(
+            key
+            for key, entry in state["seen"].items()
+            if entry.get("alerted") and key not in next_state["seen"]
+        ),
+        "sent": sum(1 for _, ok in sends if ok),
+        "failed": sum(1 for _, ok in sends if not ok),
+    }
+    if confirmed:
+        record["confirm"] = {
+            "checks": {o.name: [round(o.seconds, 4), o.status] for o in confirmed},
+            "problems": sorted(p.key for o in confirmed for p in o.problems),
+        }
+    append_history(state_path, record)
 
     pending_confirm = sum(1 for v in next_state["seen"].values() if not v["alerted"])
     print(
         f"ok — {len(problems)} active problem(s), "
         f"{pending_confirm} awaiting confirmation"
     )
+    if not delivered:
+        return EXIT_UNDELIVERED
     return EXIT_PROBLEMS if problems else EXIT_CLEAN
+
+
+def serve(
+    cycle: Callable[[], int],
+    interval: float,
+    *,
+    stop: threading.Event | None = None,
+    wake: threading.Event | None = None,
+    stuck: Callable[[bool], None] | None = None,
+) -> int:
+    """Run `cycle` every `interval` seconds until stopped; see RESIDENT MODE.
+
+    The schedule is on the monotonic clock, so a wall-clock step (NTP, suspend)
+    neither bunches cycles nor skips them. A cycle that overruns its slot makes
+    the next one start at the following slot boundary rather than immediately,
+    so a slow stretch never turns into back-to-back cycles. `wake` (set by a
+    Watcher) starts an extra cycle early without moving the schedule.
+
+    An alert still undeliverable a full interval after the first failed attempt
+    ends the loop with EXIT_UNDELIVERED -- unless `stuck` is given, which is
+    told instead (True, and False once a cycle delivers again) while the loop
+    carries on; host() uses that to keep one stuck poller from stopping the rest.
+    """
+    stop = stop or threading.Event()
+    # journald gets stdout through a pipe, which Python block-buffers; a resident
+    # process would otherwise hold its log lines back until it exits.
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=True)
+    # SIGTERM lets the cycle in flight finish; the write-ahead log covers the
+    # rest, so there is nothing else to clean up on the way out.
+    previous: dict[int, object] = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous[signum] = signal.signal(signum, lambda *_: stop.set())
+
+    due = time.monotonic()
+    undelivered_since: float | None = None
+    reported = False
+    try:
+        while not stop.is_set():
+            try:
+                result = cycle()
+            except Exception as error:  # noqa: BLE001 - state is durable; try again next slot
+                print(f"cycle failed: {type(error).__name__}", flush=True)
+            else:
+                now = time.monotonic()
+                if result != EXIT_UNDELIVERED:
+                    if reported and stuck is not None:
+                        stuck(False)
+                    undelivered_since, reported = None, False
+                elif undelivered_since is None or now - undelivered_since < interval or reported:
+                    undelivered_since = now if undelivered_since is None else undelivered_since
+                    print("cycle left an alert undelivered; retrying next cycle", flush=True)
+                elif stuck is None:
+                    # The retry a slot later failed too: fail the unit, as a timer run would.
+                    print("alert still undelivered an interval later; exiting", flush=True)
+                    return EXIT_UNDELIVERED
+                else:
+                    print("alert still undelivered an interval later; reporting it", flush=True)
+                    stuck(True)
+                    reported = True
+            now = time.monotonic()
+            while due <= now:
+                due += interval
+            if wake is None:
+                stop.wait(due - now)
+                continue
+            # Wake on whichever comes first: the slot, a watched file, or stop.
+            while not stop.is_set() and (left := due - time.monotonic()) > 0:
+                if wake.wait(min(left, 1.0)):
+                    stop.wait(WATCH_SETTLE_SECONDS)
+                    wake.clear()  # a burst of writes is one trigger
+                    print("watched change seen; running an early cycle", flush=True)
+                    break
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    return EXIT_CLEAN
+
+
+def run_or_serve(
+    cycle: Callable[[], int],
+    watched: Sequence[Check] = (),
+    push: Callable[[threading.Event], bool] | None = None,
+    stop: threading.Event | None = None,
+) -> int:
+    """One cycle (timer mode), or resident cycles if the unit asked for them.
+
+    Resident, the files `watched` checks read also trigger cycles (WATCHED FILES),
+    and so does anything `push` starts: it is handed the wake event and returns
+    whether it started a listener that will set it (PUSH SOURCES). `stop`, if
+    given, is the event SIGTERM sets, so the cycle can hand it on to run_cycle.
+    """
+    try:
+        interval = float(os.environ.get(SERVE_INTERVAL_ENV, "") or 0)
+    except ValueError:
+        interval = 0
+    if interval > 0:
+        wake = threading.Event()
+        woken = watch(watched, wake) is not None
+        woken = bool(push and push(wake)) or woken
+        return serve(cycle, interval, stop=stop, wake=wake if woken else None)
+    return cycle()
+
+
+@dataclass(frozen=True)
+class Poller:
+    """One check set, complete enough to run on its own or inside host()."""
+
+    name: str
+    state_path: str
+    checks: Sequence[Check]
+    render: Callable[[list[str], list[str]], str]
+    notification_env: str  # env file holding WATCHTOWER_NOTIFICATION_URL
+    budget: float = CYCLE_BUDGET_SECONDS
+    confirm_after: float | None = None
+    push: Callable[[threading.Event], bool] | None = None  # see PUSH SOURCES
+
+    def cycle(
+        self, sender: Sender, pool: WorkerPool | None = None, stop: threading.Event | None = None
+    ) -> int:
+        return run_cycle(
+            self.state_path,
+            time.time(),
+            self.checks,
+            self.render,
+            sender,
+            budget=self.budget,
+            confirm_after=self.confirm_after,
+            pool=pool,
+            stop=stop,
+        )
+
+
+def poller_target(poller: Poller) -> str:
+    """The shoutrrr URL a poller notifies; ValueError says why there is none."""
+    target = env_file_value(poller.notification_env, "WATCHTOWER_NOTIFICATION_URL")
+    if not target:
+        raise ValueError("notification target missing")
+    return target
+
+
+def run_poller(poller: Poller) -> int:
+    """A check file's main(): build the sender once, then cycle (or serve)."""
+    try:
+        sender = shoutrrr_telegram_sender(poller_target(poller))
+    except ValueError as error:
+        print(error)
+        return EXIT_UNDELIVERED
+    stop = threading.Event()
+    return run_or_serve(lambda: poller.cycle(sender, stop=stop), poller.checks, poller.push, stop)
+
+
+class LabelledStream:
+    """stdout for host(): every line a poller thread writes carries its name."""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        name = threading.current_thread().name
+        label = f"[{name.removeprefix('poller:')}] " if name.startswith("poller:") else ""
+        pending = getattr(self.local, "pending", "") + text
+        *lines, self.local.pending = pending.split("\n")
+        if lines:
+            with self.lock:
+                self.stream.write("".join(f"{label}{line}\n" for line in lines))
+                self.stream.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        with self.lock:
+            self.stream.flush()
+
+
+def host(pollers: Sequence[tuple[Poller, float]], *, stop: threading.Event | None = None) -> int:
+    """Run several pollers, each every `interval` seconds, in this one process.
+
+    See HOST RUNNER. A poller whose notification target is unusable is left
+    out and the rest still run, so one bad secret cannot silence a host; the
+    first poller that starts reports it, and any poller whose alerts get stuck.
+    """
+    stop = stop or threading.Event()
+    if not isinstance(sys.stdout, LabelledStream):
+        if hasattr(sys.stdout, "reconfigure"):
+            sys.stdout.reconfigure(line_buffering=True)
+        sys.stdout = LabelledStream(sys.stdout)
+    client = TelegramClient()
+    senders: dict[str, Sender] = {}
+    lanes: list[threading.Thread] = []
+    down: dict[str, str] = {}  # poller -> why its alerts reach nobody
+    guard = threading.Lock()
+
+    def mark(name: str, why: str | None) -> None:
+        with guard:
+            if why is None:
+                down.pop(name, None)
+            else:
+                down[name] = why
+
+    def report(reporter: str) -> list[Problem]:
+        with guard:
+            return [
+                Problem(
+                    f"{HOST_CHECK}:{name}",
+                    f"{name}: {why}. Its own alerts reach nobody until that is fixed "
+                    f"(reported by {reporter}, which shares its host runner).",
+                )
+                for name, why in sorted(down.items())
+                if name != reporter
+            ]
+
+    for poller, interval in pollers:
+        try:
+            target = poller_target(poller)
+            if target not in senders:
+                senders[target] = shoutrrr_telegram_sender(target, client)
+        except ValueError as error:
+            print(f"{poller.name}: {error}; not started")
+            mark(poller.name, f"not running, {error}")
+            continue
+        if not lanes:
+            reporter = Check(HOST_CHECK, lambda name=poller.name: report(name))
+            poller = replace(poller, checks=[*poller.checks, reporter])
+        pool = WorkerPool(min(max(len(poller.checks), 1), WORKERS))
+        sender = senders[target]
+        wake = threading.Event()
+        woken = watch(poller.checks, wake) is not None
+        woken = bool(poller.push and poller.push(wake)) or woken
+        lanes.append(
+            threading.Thread(
+                target=serve,
+                args=(lambda p=poller, s=sender, w=pool: p.cycle(s, w, stop), interval),
+                kwargs={
+                    "stop": stop,
+                    "wake": wake if woken else None,
+                    "stuck": lambda jammed, name=poller.name: mark(
+                        name, "alerts undeliverable for over an interval" if jammed else None
+                    ),
+                },
+                name=f"poller:{poller.name}",
+                daemon=True,
+            )
+        )
+    if not lanes:
+        return EXIT_UNDELIVERED
+
+    previous: dict[int, object] = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous[signum] = signal.signal(signum, lambda *_: stop.set())
+    try:
+        for lane in lanes:
+            lane.start()
+        while any(lane.is_alive() for lane in lanes):
+            stop.wait(1)
+            if stop.is_set():
+                # Each lane finishes the cycle it is in; the journal covers the rest.
+                for lane in lanes:
+                    lane.join()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    return EXIT_CLEAN
+
+
+class Histogram:
+    """Latencies in fixed log-spaced buckets: constant memory, ~12 % resolution."""
+
+    PER_DECADE = 20
+    FLOOR = 1e-4  # seconds; everything faster lands in the first bucket
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.total = 0
+
+    def add(self, seconds: float) -> None:
+        ratio = max(seconds, self.FLOOR) / self.FLOOR
+        bucket = int(math.log10(ratio) * self.PER_DECADE)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-th sample."""
+        rank = q * self.total
+        running = 0
+        for bucket in sorted(self.counts):
+            running += self.counts[bucket]
+            if running >= rank:
+                return self.FLOOR * 10 ** ((bucket + 1) / self.PER_DECADE)
+        return 0.0
+
+
+def history_files(directory: Path) -> list[Path]:
+    """HISTORY files oldest first."""
+    rotated = [directory / f"{HISTORY_NAME}.{n}" for n in range(HISTORY_KEEP, 0, -1)]
+    return [p for p in rotated + [directory / HISTORY_NAME] if p.exists()]
+
+
+def history_stats(directory: Path, since: float) -> str:
+    """The `stats` report over every HISTORY record at or after `since`."""
+    cycles = Histogram()
+    latency: dict[str, Histogram] = {}
+    statuses: dict[str, dict[str, int]] = {}
+    announced: dict[str, int] = {}
+    blips: dict[str, int] = {}
+    runs: dict[str, int] = {}  # consecutive cycles each key has been seen
+    sent = failed = 0
+    first = last = None
+    for path in history_files(directory):
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                    at = float(record["at"])
+                    took = float(record.get("seconds", 0))
+                    confirm = record.get("confirm") or {}
+                    ran = [*record.get("checks", {}).items(), *confirm.get("checks", {}).items()]
+                    probes = [(name, float(seconds), status) for name, (seconds, status) in ran]
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue  # a torn or foreign line, or one whose probes do not unpack
+                if at < since:
+                    continue
+                first = at if first is None else first
+                last = at
+                cycles.add(took)
+                for name, seconds, status in probes:
+                    if status not in ("cached", "held"):
+                        latency.setdefault(name, Histogram()).add(seconds)
+                    counts = statuses.setdefault(name, {})
+                    counts[status] = counts.get(status, 0) + 1
+                for key in record.get("announced", []):
+                    announced[key] = announced.get(key, 0) + 1
+                keys = set(record.get("problems", []))
+                again = set(confirm.get("problems", []))  # seen by both probes: two sightings
+                for key in list(runs):
+                    if key not in keys:
+                        if runs.pop(key) < CONFIRM_RUNS:
+                            blips[key] = blips.get(key, 0) + 1
+                for key in keys:
+                    runs[key] = runs.get(key, 0) + (2 if key in again else 1)
+                sent += int(record.get("sent", 0))
+                failed += int(record.get("failed", 0))
+
+    if first is None:
+        return f"no history in {directory}"
+    span = time.strftime("%Y-%m-%d %H:%M", time.gmtime(first)) + " .. "
+    span += time.strftime("%Y-%m-%d %H:%M", time.gmtime(last)) + " UTC"
+    lines = [
+        f"{cycles.total} cycle(s), {span}",
+        f"cycle  p50 {cycles.quantile(0.5):.3g} s  p95 {cycles.quantile(0.95):.3g} s  "
+        f"p99 {cycles.quantile(0.99):.3g} s",
+        "",
+        f"{'check':<32} {'runs':>6} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'timeout':>8} {'error':>6}",
+    ]
+    for name in sorted(statuses):
+        histogram = latency.get(name, Histogram())
+        counts = statuses[name]
+        lines.append(
+            f"{name:<32} {histogram.total:>6} {histogram.quantile(0.5):>8.3g} "
+            f"{histogram.quantile(0.95):>8.3g} {histogram.quantile(0.99):>8.3g} "
+            f"{counts.get('timeout', 0):>8} {counts.get('error', 0):>6}"
+        )
+    lines += ["", f"{'problem':<40} {'announced':>9} {'blips':>6}"]
+    for key in sorted(set(announced) | set(blips)):
+        lines.append(f"{key:<40} {announced.get(key, 0):>9} {blips.get(key, 0):>6}")
+    attempts = sent + failed
+    rate = f"{100 * sent / attempts:.1f} %" if attempts else "n/a"
+    lines += ["", f"delivery  {sent}/{attempts} sent ({rate})"]
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Offline tools for a poller's state directory; pollers never call this."""
+    parser = argparse.ArgumentParser(prog="engine.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats = commands.add_parser("stats", help="summarise a poller's cycle history")
+    stats.add_argument("directory", type=Path, help="the poller's state directory")
+    stats.add_argument("--days", type=float, default=30, help="window to report (default 30)")
+    args = parser.parse_args(argv)
+    print(history_stats(args.directory, time.time() - args.days * 86400))
+    return EXIT_CLEAN
+
+
+if __name__ == "__main__":
+    sys.exit(main())
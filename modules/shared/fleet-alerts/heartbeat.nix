@@ -12,11 +12,17 @@
 # WHAT IT IS
 # ==========
 # Each poller already stamps its state file every run, so the heartbeat needs no
-# new data -- only a way for the peer to read the mtime. This exposes exactly that
-# integer over the tailnet, and nothing else.
+# new data -- only a way for the peer to read it. heartbeat.py serves what sits
+# beside the state file over the tailnet, and nothing else: the mtime as one
+# integer to a client that asks nothing, and to a client that sends `v2` one line
+# that adds the cycle's duration, the standing problems, since when a delivery
+# has been pending and a cycle sequence number (HEARTBEAT in engine.py). A peer
+# that is running but wedged on delivery no longer looks merely "alive".
 #
-# Raw TCP, not HTTP: the payload is one number. A socket-activated one-liner beats
-# a daemon and an HTTP stack for that.
+# Raw TCP, not HTTP: the payload is one line. The first version was a
+# socket-activated shell one-liner with Accept = true, which forked a process per
+# probe; heartbeat.py stays resident, takes the listening socket from systemd once
+# (Accept = false) and re-reads the state only when it changed.
 #
 # No credentials: the tailnet is authenticated at the network layer, so only fleet
 # hosts can reach 100.64.0.0/10, and the firewall opens this port on tailscale0
@@ -36,6 +42,13 @@
 }:
 let
   cfg = config.nixcfg.fleetAlerts.heartbeat;
+  server = pkgs.runCommand "fleet-heartbeat" { } ''
+    mkdir -p "$out"
+    cp ${./engine.py} "$out/engine.py"
+    cp ${pkgs.writeText "fleet-heartbeat.py" (
+      builtins.replaceStrings [ "@STATE_PATH@" ] [ cfg.statePath ] (builtins.readFile ./heartbeat.py)
+    )} "$out/heartbeat.py"
+  '';
 in
 {
   options.nixcfg.fleetAlerts.heartbeat = {
@@ -72,25 +85,23 @@ in
         # tailscale0 may not exist yet when sockets.target is reached; FreeBind
         # lets the socket bind the address anyway instead of failing at boot.
         FreeBind = true;
-        Accept = true;
+        # One resident server takes the listening socket (started by the first
+        # probe), instead of a process forked per connection.
+        Accept = false;
       };
     };
 
-    # Accept = true means systemd hands each connection's stdout to the client,
-    # so printing the mtime is the entire protocol.
-    systemd.services."fleet-heartbeat@" = {
+    systemd.services.fleet-heartbeat = {
       description = "Report this host's poller heartbeat (OPS-107)";
+      requires = [ "fleet-heartbeat.socket" ];
       serviceConfig = {
-        StandardOutput = "socket";
-        ExecStart = "${pkgs.writeShellScript "fleet-heartbeat" ''
-          # Epoch seconds of the last poll, or 0 if the poller has never run.
-          if [ -e ${lib.escapeShellArg cfg.statePath} ]; then
-            ${pkgs.coreutils}/bin/stat -c %Y ${lib.escapeShellArg cfg.statePath}
-          else
-            echo 0
-          fi
-        ''}";
-        # Read-only, single integer, no secrets in reach.
+        Type = "simple";
+        ExecStart = "${pkgs.python3}/bin/python3 ${server}/heartbeat.py";
+        Restart = "always";
+        RestartSec = "5s";
+        # Read-only: one line about the poller, no secrets in reach. It parses the
+        # whole state file but answers with counts and times only; the alert
+        # texts in it are never served.
         ProtectSystem = "strict";
         ProtectHome = true;
         PrivateDevices = true;
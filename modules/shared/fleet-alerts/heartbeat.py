@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Poller heartbeat server — OPS-107. See heartbeat.nix for why it exists.
+
+The first heartbeat was a socket-activated shell script with Accept = true:
+every probe forked a process to print one mtime. This is the resident
+replacement. systemd still owns the listening socket (Accept = false hands it
+over once), so FreeBind and the tailnet-only address are unchanged.
+
+It keeps a snapshot of the poller it reports on and refreshes it only when the
+state file, its journal or its history changed -- a probe costs three stat()
+calls, not a fork and an exec. The snapshot is served two ways (HEARTBEAT in
+engine.py):
+
+  * a client that sends `v2` gets one line: cycle end, duration, announced
+    problems, since when a delivery has been pending, and a sequence number
+  * a client that sends nothing gets the bare number it always got
+
+The poller may be an engine poller (ops-alerts) or hausv-alerts, which keeps
+its own state format; both are read here, nothing else is assumed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import threading
+
+import engine
+from engine import Heartbeat
+
+STATE_PATH = "@STATE_PATH@"
+
+# How long a connection may take to send its request before it is answered as a
+# legacy client -- which never sends one, so this is also what a legacy probe waits.
+REQUEST_WAIT_SECONDS = 1.0
+# Connections answered at once. The tailnet is the only way in, so this only
+# bounds a misbehaving fleet host, not an attacker.
+MAX_CLIENTS = 8
+# sd_listen_fds(3): the first socket systemd hands over.
+LISTEN_FDS_START = 3
+
+
+class Snapshot:
+    """What the poller last did, re-read only when its files change."""
+
+    def __init__(self, state_path: str) -> None:
+        self.state_path = state_path
+        self.paths = [
+            state_path,
+            state_path + ".journal",
+            os.path.join(os.path.dirname(state_path), engine.HISTORY_NAME),
+        ]
+        self.lock = threading.Lock()
+        self.files: list | None = None
+        self.beat = Heartbeat(0)
+        self.seq = 0
+        self.pending_since = 0.0
+
+    def current(self) -> Heartbeat:
+        with self.lock:
+            files = engine.signature(self.paths)
+            if files != self.files:
+                self.files = files
+                self.beat = self._read()
+            return self.beat
+
+    def _read(self) -> Heartbeat:
+        try:
+            at = os.stat(self.state_path).st_mtime
+        except OSError:
+            return Heartbeat(0)
+        problems, pending = self._state()
+        if not pending:
+            self.pending_since = 0.0
+        elif isinstance(pending, (int, float)) and not isinstance(pending, bool):
+            self.pending_since = float(pending)
+        elif not self.pending_since:
+            # No time recorded with the event: the first cycle we saw it pending.
+            self.pending_since = at
+        self.seq += 1
+        return Heartbeat(at, self._seconds(), problems, self.pending_since, self.seq)
+
+    def _state(self) -> tuple[int | None, object]:
+        """(announced problems, pending) -- pending is the event's time if known."""
+        try:
+            with open(self.state_path, encoding="utf-8") as handle:
+                raw = json.load(handle)
+        except (OSError, ValueError):
+            return None, None
+        if isinstance(raw, dict) and "schema" in raw:
+            # hausv-alerts' own format: `active` keys, one `pending` event.
+            active = raw.get("active")
+            return (len(active) if isinstance(active, list) else None), isinstance(raw.get("pending"), dict)
+        state = engine.load_state(self.state_path)
+        problems = sum(1 for entry in state["seen"].values() if entry.get("alerted"))
+        outbox = state["outbox"]
+        return problems, (outbox[0].get("at") or True) if outbox else False
+
+    def _seconds(self) -> float | None:
+        """The last cycle's duration from the engine's history, if it keeps one."""
+        try:
+            with open(self.paths[2], "rb") as handle:
+                handle.seek(0, os.SEEK_END)
+                handle.seek(max(handle.tell() - 4096, 0))
+                tail = handle.read().decode(errors="replace")
+            return float(json.loads(tail.strip().splitlines()[-1])["seconds"])
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
+
+
+def answer(conn: socket.socket, snapshot: Snapshot, slots: threading.Semaphore) -> None:
+    try:
+        conn.settimeout(REQUEST_WAIT_SECONDS)
+        try:
+            request = conn.recv(16)
+        except (TimeoutError, socket.timeout):
+            request = b""
+        beat = snapshot.current()
+        reply = beat.line() if request.strip() == b"v2" else str(int(beat.at))
+        conn.sendall(reply.encode() + b"\n")
+    except OSError:
+        pass  # the client went away; nothing to report to anyone
+    finally:
+        conn.close()
+        slots.release()
+
+
+def serve(listener: socket.socket, snapshot: Snapshot, stop: threading.Event | None = None) -> int:
+    """Answer heartbeat probes on `listener` until stopped."""
+    stop = stop or threading.Event()
+    slots = threading.BoundedSemaphore(MAX_CLIENTS)
+    listener.settimeout(1.0)
+    while not stop.is_set():
+        try:
+            conn, _ = listener.accept()
+        except (TimeoutError, socket.timeout):
+            continue
+        if not slots.acquire(blocking=False):
+            conn.close()
+            continue
+        threading.Thread(target=answer, args=(conn, snapshot, slots), daemon=True).start()
+    return engine.EXIT_CLEAN
+
+
+def main() -> int:
+    if os.environ.get("LISTEN_PID") != str(os.getpid()) or int(os.environ.get("LISTEN_FDS", "0")) < 1:
+        print("no listening socket from systemd; run via fleet-heartbeat.socket")
+        return 1
+    listener = socket.socket(fileno=LISTEN_FDS_START)
+    listener.setblocking(True)
+    snapshot = Snapshot(STATE_PATH)
+    snapshot.current()  # warm: the first probe after a restart answers from memory
+    return serve(listener, snapshot)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# One process for all of a host's fleet-alert pollers — OPS-107.
+#
+# WHY THIS EXISTS
+# ===============
+# csb1 ran peer-watch, tailnet-watch and fleet-drift as three oneshot units on
+# three timers. Every run started its own Python, imported engine.py again,
+# parsed the same WATCHTOWER_NOTIFICATION_URL again and opened its own TLS
+# connection to Telegram -- three times the start-up cost for one host's alerting.
+#
+# WHAT IT IS
+# ==========
+# Each poller module registers its built poller here. With `enable` set, they run
+# in one resident unit (fleet-alerts-host) built by lib.nix's mkHostRunner, and
+# each module's own unit and timer step aside; with it unset nothing changes, so
+# the per-poller units stay the fallback. What is shared and what is not is
+# described under HOST RUNNER in engine.py: in short, one interpreter and one
+# Telegram connection, but a state file, interval and worker pool per poller, so
+# no check set can starve another.
+#
+# The sandbox is the union of the hosted pollers' needs -- state directories,
+# writable and read-only paths, a read-only /home if any poller reads one.
+# Register a poller here only if that widening is acceptable for all of them.
+{
+  config,
+  lib,
+  pkgs,
+  ...
+}:
+let
+  cfg = config.nixcfg.fleetAlerts.hostRunner;
+  fleetLib = import ./lib.nix { inherit pkgs lib; };
+  pollers = lib.attrValues cfg.pollers;
+  runner = fleetLib.mkHostRunner {
+    name = "fleet-alerts-host";
+    pollers = lib.mapAttrsToList (name: p: {
+      inherit name;
+      inherit (p) interval;
+      poller = p.package;
+    }) cfg.pollers;
+  };
+in
+{
+  options.nixcfg.fleetAlerts.hostRunner = {
+    enable = lib.mkEnableOption "one resident process for this host's fleet-alert pollers (OPS-107)";
+
+    pollers = lib.mkOption {
+      default = { };
+      description = "Built pollers (lib.nix mkPoller) this host can run in the shared process.";
+      type = lib.types.attrsOf (
+        lib.types.submodule {
+          options = {
+            package = lib.mkOption {
+              type = lib.types.package;
+              description = "The mkPoller output; its checks.py must define poller().";
+            };
+            interval = lib.mkOption {
+              type = lib.types.ints.positive;
+              description = "Seconds between cycles -- the old timer's OnUnitActiveSec.";
+            };
+            stateDirectory = lib.mkOption {
+              type = lib.types.str;
+              description = "The poller's StateDirectory, unchanged so its state carries over.";
+            };
+            readWritePaths = lib.mkOption {
+              type = lib.types.listOf lib.types.str;
+              default = [ ];
+            };
+            readOnlyPaths = lib.mkOption {
+              type = lib.types.listOf lib.types.str;
+              default = [ ];
+            };
+            readsHome = lib.mkOption {
+              type = lib.types.bool;
+              default = false;
+              description = "Needs /home read-only (otherwise /home is hidden).";
+            };
+          };
+        }
+      );
+    };
+  };
+
+  config = lib.mkIf (cfg.enable && cfg.pollers != { }) {
+    systemd.services.fleet-alerts-host = {
+      description = "This host's fleet-alert pollers in one resident process (OPS-107)";
+      after = [
+        "network-online.target"
+        "tailscaled.service"
+      ];
+      wants = [ "network-online.target" ];
+      wantedBy = [ "multi-user.target" ];
+      serviceConfig = {
+        Type = "simple";
+        ExecStart = "${pkgs.python3}/bin/python3 ${runner}/runner.py";
+        # Resident: a poller whose alerts are undeliverable, or which cannot start
+        # for want of a notification target, is paged by the first poller that
+        # did start (HOST RUNNER in engine.py); the rest keep running. Only a
+        # host with no usable poller exits 2, and stays failed so it is seen.
+        Restart = "always";
+        RestartSec = "30s";
+        RestartPreventExitStatus = [ 2 ];
+        StateDirectory = map (p: p.stateDirectory) pollers;
+        StateDirectoryMode = "0700";
+        ReadWritePaths = lib.concatMap (p: p.readWritePaths) pollers;
+        ReadOnlyPaths = lib.concatMap (p: p.readOnlyPaths) pollers;
+        # No EnvironmentFile: each poller reads only the one key it needs out of
+        # its operator-channel file, as in the per-poller units.
+        PrivateTmp = true;
+        PrivateDevices = true;
+        ProtectHome = if lib.any (p: p.readsHome) pollers then "read-only" else true;
+        ProtectSystem = "strict";
+        ProtectKernelTunables = true;
+        ProtectKernelModules = true;
+        NoNewPrivileges = true;
+        LockPersonality = true;
+        RestrictRealtime = true;
+        RestrictSUIDSGID = true;
+        RestrictAddressFamilies = [
+          "AF_UNIX"
+          "AF_INET"
+          "AF_INET6"
+        ];
+        SystemCallArchitectures = "native";
+      };
+    };
+  };
+}
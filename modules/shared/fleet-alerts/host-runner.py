@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Several fleet-alert pollers in one resident process — OPS-107.
+
+See HOST RUNNER in engine.py for why and what is shared. mkHostRunner (lib.nix)
+substitutes POLLERS_JSON at build time: one entry per hosted poller, naming its
+built checks.py and its interval in seconds. Each checks.py is loaded as a
+module of its own and asked for its poller(); their `import engine` resolves to
+the engine.py copied beside this file, so every poller shares one engine.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+
+import engine
+
+POLLERS_JSON = r"""@POLLERS_JSON@"""
+
+
+def load(name: str, path: str) -> engine.Poller:
+    spec = importlib.util.spec_from_file_location(f"poller_{name.replace('-', '_')}", path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"{name}: cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module.poller()
+
+
+def main() -> int:
+    entries = json.loads(POLLERS_JSON)
+    return engine.host([(load(e["name"], e["checks"]), float(e["interval"])) for e in entries])
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
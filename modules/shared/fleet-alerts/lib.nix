@@ -9,6 +9,17 @@
 # holds literals and no runtime data flows into a request URL (the CodeQL
 # partial-SSRF finding on the first ops-alerts revision, 2026-07-30). It also
 # makes target changes a rebuild, which is the correct shape for fleet config.
+#
+# The built checks.py runs one cycle and exits, for a oneshot unit on a timer.
+# To keep it resident instead (warm interpreter, config and connections), run it
+# from a Type=simple unit with FLEET_ALERTS_SERVE_SECONDS in its Environment,
+# RestartPreventExitStatus = [ 2 ] and a timer that starts it again after an
+# undeliverable exit; see RESIDENT MODE in engine.py.
+#
+# mkHostRunner hosts several built pollers in ONE resident process (HOST RUNNER
+# in engine.py): one interpreter, one engine import, one Telegram connection,
+# each poller still on its own interval with its own state file and workers.
+# host-runner.nix wires it into a unit.
 { pkgs, lib }:
 {
   mkPoller =
@@ -33,4 +44,27 @@
       cp ${./engine.py} "$out/engine.py"
       cp ${checksPy} "$out/checks.py"
     '';
+
+  # pollers: [ { name; poller = <mkPoller output>; interval = <seconds>; } ]
+  mkHostRunner =
+    {
+      name,
+      pollers,
+    }:
+    let
+      entries = map (p: {
+        inherit (p) name interval;
+        checks = "${p.poller}/checks.py";
+      }) pollers;
+      runnerPy = pkgs.writeText "${name}-runner.py" (
+        builtins.replaceStrings [ "@POLLERS_JSON@" ] [ (builtins.toJSON entries) ] (
+          builtins.readFile ./host-runner.py
+        )
+      );
+    in
+    pkgs.runCommand name { } ''
+      mkdir -p "$out"
+      cp ${./engine.py} "$out/engine.py"
+      cp ${runnerPy} "$out/runner.py"
+    '';
 }
@@ -9,19 +9,49 @@ pollers watch services, not the mesh they ride on.
 This is a tiny OPS-107 unit with one job: read THIS host's own view of the
 tailnet and page when it is persistently broken. Deliberately separate from
 hausv-alerts and peer-watch (both mature and test-pinned). One shared check
-file; each host's tailnet-watch.nix substitutes HOSTNAME, TAILSCALE_BIN and the
-env file carrying its WATCHTOWER_NOTIFICATION_URL.
+file; each host's tailnet-watch.nix substitutes HOSTNAME, TAILSCALED_SOCKET,
+MESH_PEERS_JSON and the env file carrying its WATCHTOWER_NOTIFICATION_URL.
 
-What it reads (each command bounded to TIMEOUT seconds):
-  * `tailscale status --json` — must run, parse, and report BackendState=Running;
+What it reads, straight from tailscaled's LocalAPI over its unix socket -- the
+API the `tailscale` CLI itself calls -- on one connection, both answers within
+TIMEOUT seconds:
+  * status, without the peer list — must parse and report BackendState=Running;
     every entry in `.Health` (tailscaled's own list of detected problems, e.g.
     "Tailscale could not connect to any relay server") is a problem of its own,
     keyed by a digest of the message so ordering changes do not re-page.
-  * `tailscale debug derp-map` — zero regions is exactly the 2026-08-21 state.
+  * the DERP map — zero regions is exactly the 2026-08-21 state.
 
-The engine confirms a problem on two consecutive runs before paging, so with
-the 10-minute timer a real outage pages ~10–20 min after onset and the
-transient health lines tailscaled emits while reconnecting never page.
+It used to run the CLI twice per cycle (`status --json`, `debug derp-map`):
+two process spawns and Go runtime start-ups, and the whole peer list marshalled
+to stdout only to be parsed again here and thrown away.
+
+The engine confirms a problem on two consecutive sightings before paging. With
+fast confirm the second sighting is a re-probe of just that check a minute
+later in the same run, so a real outage pages ~1 min after the run that first
+sees it (0–10 min after onset on the 10-minute timer), while the transient
+health lines tailscaled emits while reconnecting are gone by the re-probe and
+never page.
+
+Resident (csb1's host runner; hsb1's own unit with FLEET_ALERTS_SERVE_SECONDS),
+the poller also holds tailscaled's IPN notification bus open (BusWatch). A
+change of BackendState, Health or the DERP map wakes a cycle within seconds, so
+the 2026-08-21 state is seen when headscale pushes the empty map, not up to ten
+minutes later. Confirmation is then the fast-confirm re-probe a minute on --
+"still broken after FAST_CONFIRM_SECONDS" -- rather than a second timer run, so
+a real outage pages about a minute after onset. An idle bus is a blocked read:
+no polling, no CPU.
+
+The mesh from here: every fleet peer in MESH_PEERS gets a disco ping through
+the LocalAPI each cycle, one check per peer so the engine's workers ping them
+concurrently. Round trip and path (direct, DERP region, none) go into a
+day-long per-peer history (MeshHistory, mesh.json next to the state), and each
+peer is judged against its own:
+  * mesh:<peer>:derp — a peer that is normally direct answered only via DERP.
+    The tailnet still works, so nothing else notices; every packet now takes a
+    detour through a relay.
+  * mesh:<peer>:slow — direct, but several times its usual round trip.
+A peer without a day's baseline yet pages for neither; one that does not
+answer at all is left to the pollers that watch its services.
 
 Scope: this host's view only. `.Health` is per-node; a witness, not fleet
 truth. csb1 shares the netcup failure domain with headscale (catches the
@@ -32,16 +62,20 @@ can page while netcup is dark. Two witnesses, two failure domains.
 from __future__ import annotations
 
 import hashlib
+import http.client
 import json
-import subprocess
+import os
+import socket
+import threading
 import time
+from functools import partial
 
 import engine
-from engine import Problem
+from engine import Check, Problem
 
 STATE_PATH = "/var/lib/tailnet-watch/state.json"
 NOTIFICATION_ENV = "@NOTIFICATION_ENV@"
-TAILSCALE = "@TAILSCALE_BIN@"
+TAILSCALED_SOCKET = "@TAILSCALED_SOCKET@"
 HOSTNAME = "@HOSTNAME@"
 TIMEOUT = 15
 
@@ -50,34 +84,290 @@ TIMEOUT = 15
 # and a test pinning it (tests/test_tailnet_watch_checks.py).
 SUPPRESSED_HEALTH: frozenset[str] = frozenset()
 
+# The fleet peers this host pings every cycle, by name and tailnet address
+# (hosts/<host>/tailnet-watch.nix; the host itself is not in its own list).
+MESH_PEERS = json.loads(r"""@MESH_PEERS_JSON@""")
+# Per-peer round trips and paths: the last MESH_SAMPLES pings, a day of
+# 10-minute cycles, so one evening on DERP is still measured against the peer's
+# normal rather than becoming it. Rewritten at most once per MESH_FLUSH_SECONDS
+# -- every peer's check records into it, and each used to fsync it -- and once
+# more when a timer run exits; a hosted restart loses at most one cycle of it.
+MESH_PATH = os.path.join(os.path.dirname(STATE_PATH), "mesh.json")
+MESH_SAMPLES = 144
+MESH_FLUSH_SECONDS = 60
+# Fewer direct samples than this and a peer has no baseline yet: nothing to
+# fall from and nothing to be slow against.
+MESH_MIN_SAMPLES = 12
+# A peer is "normally direct" when at least this share of its history was. A
+# peer relayed for half a day has a new normal and its page clears.
+MESH_DIRECT_SHARE = 0.5
+# Slow = above MESH_SLOW_FACTOR times the peer's median direct round trip AND
+# above it by MESH_SLOW_MARGIN_MS: 3 ms -> 12 ms on a quiet LAN link is noise.
+MESH_SLOW_FACTOR = 3
+MESH_SLOW_MARGIN_MS = 25
+# Pings per peer per cycle. The first disco ping to an idle peer often goes
+# over DERP while magicsock finds the direct path; `tailscale ping` keeps
+# going until it is direct for the same reason. Each gets PING_TIMEOUT at most.
+MESH_PINGS = 3
+PING_TIMEOUT = 5
+
+# ipn.NotifyWatchOpt for the bus: the current state and health at once, no
+# private keys in netmaps, and netmap updates coalesced by tailscaled instead of
+# one per peer change on a busy tailnet.
+BUS_MASK = 2 | 16 | 128 | 256  # InitialState | NoPrivateKeys | InitialHealthState | RateLimit
+# Reconnects after the bus drops (a tailscaled restart) back off up to BUS_RETRY_MAX.
+BUS_RETRY_SECONDS = 5
+BUS_RETRY_MAX = 300
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP/1.1 over a unix socket; the host name is only what goes in Host:."""
+
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        super().__init__("local-tailscaled.sock", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except BaseException:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class LocalAPI:
+    """A minimal client for tailscaled's LocalAPI, on kept-alive connections.
+
+    JSON objects only, which is all this witness reads. A resident poller keeps
+    its connections across cycles; one tailscaled closed while idle (a restart)
+    is retried once on a fresh one, not reported as an outage. The mesh checks
+    call it from several workers at once, so each request takes an idle
+    connection of its own and hands it back when the answer is in.
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self.lock = threading.Lock()
+        self.idle: list[UnixHTTPConnection] = []
+
+    def status(self, deadline: float, peers: bool = True) -> dict:
+        """ipnstate.Status; without `peers` just the node, BackendState and Health."""
+        return self.get("status" if peers else "status?peers=false", deadline)
+
+    def derp_map(self, deadline: float) -> dict:
+        return self.get("derpmap", deadline)
+
+    def ping(self, address: str, deadline: float) -> dict:
+        """ipnstate.PingResult of one disco ping -- the kind that reports its path."""
+        return self.request("POST", f"ping?ip={address}&type=disco", deadline)
+
+    def get(self, endpoint: str, deadline: float) -> dict:
+        """GET /localapi/v0/<endpoint>, all of it read by `deadline` (monotonic)."""
+        return self.request("GET", endpoint, deadline)
+
+    def request(self, method: str, endpoint: str, deadline: float) -> dict:
+        for attempt in (1, 2):
+            with self.lock:
+                connection = self.idle.pop() if self.idle else None
+            reused = connection is not None
+            if connection is None:
+                connection = UnixHTTPConnection(self.socket_path, remaining(deadline))
+            try:
+                body, status = self._exchange(connection, method, endpoint, deadline)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused and attempt == 1:
+                    continue
+                raise
+            except BaseException:
+                connection.close()  # a half-read response leaves the connection unusable
+                raise
+            with self.lock:
+                self.idle.append(connection)
+            break
+        if status != 200:
+            raise ConnectionError(f"LocalAPI {endpoint}: HTTP {status}")
+        parsed = json.loads(body)
+        if not isinstance(parsed, dict):
+            raise ValueError("unexpected JSON shape")
+        return parsed
+
+    @staticmethod
+    def _exchange(
+        connection: UnixHTTPConnection, method: str, endpoint: str, deadline: float
+    ) -> tuple[bytes, int]:
+        connection.timeout = remaining(deadline)
+        if connection.sock is not None:
+            connection.sock.settimeout(connection.timeout)
+        # Sec-Tailscale marks a deliberate LocalAPI client; tailscaled refuses
+        # requests that look like a browser's where it is strict about that.
+        connection.request(method, f"/localapi/v0/{endpoint}", headers={"Sec-Tailscale": "localapi"})
+        response = connection.getresponse()
+        chunks = []
+        while True:
+            # Per read the socket timeout bounds a stall; across reads the
+            # deadline bounds a slow drip, as the CLI run's own timeout did.
+            left = remaining(deadline)
+            if connection.sock is not None:  # None once a Connection: close reply is in
+                connection.sock.settimeout(left)
+            chunk = response.read(1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks), response.status
+
+    def close(self) -> None:
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
 
-def run_json(args: list[str]) -> dict:
-    """Run a tailscale subcommand and parse its JSON. Raises on any failure."""
-    completed = subprocess.run(  # noqa: S603 -- literal argv, substituted at build
-        [TAILSCALE, *args],
-        capture_output=True,
-        text=True,
-        timeout=TIMEOUT,
-        check=True,
-    )
-    parsed = json.loads(completed.stdout)
-    if not isinstance(parsed, dict):
-        raise ValueError("unexpected JSON shape")
-    return parsed
+
+def remaining(deadline: float) -> float:
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise TimeoutError("LocalAPI deadline passed")
+    return left
+
+
+LOCALAPI = LocalAPI(TAILSCALED_SOCKET)
+
+
+class BusWatch:
+    """tailscaled's IPN bus held open; sets `wake` when the tailnet picture changes.
+
+    The picture is BackendState, the health warnings and the DERP region ids --
+    what the checks judge. Everything else on the bus (peer churn, engine
+    stats) is read and dropped without waking anyone. The cycle a wake starts
+    reads status and the DERP map afresh through LOCALAPI, so the bus is only a
+    trigger and never the source of a verdict. A bus that drops wakes too: a
+    tailscaled that stopped talking is the first thing to look at.
+    """
+
+    def __init__(self, socket_path: str, wake) -> None:
+        self.socket_path = socket_path
+        self.wake = wake
+        self.picture: dict | None = None
+        self.stopped = threading.Event()
+        self.connection: UnixHTTPConnection | None = None
+
+    def start(self) -> "BusWatch":
+        # Named like the poller's own lane so host() labels its log lines the same.
+        threading.Thread(target=self._run, name="poller:tailnet-watch", daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        self.stopped.set()
+        connection = self.connection
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)  # unblocks the idle read
+            except OSError:
+                pass
+
+    def apply(self, notify: dict) -> None:
+        """Fold one ipn.Notify into the picture; wake if the picture moved."""
+        picture = dict(self.picture or {})
+        if "State" in notify:
+            picture["state"] = notify["State"]
+        if "Health" in notify:
+            warnings = (notify["Health"] or {}).get("Warnings") or {}
+            picture["health"] = sorted(warnings) if isinstance(warnings, dict) else []
+        if isinstance(notify.get("NetMap"), dict):
+            regions = (notify["NetMap"].get("DERPMap") or {}).get("Regions") or {}
+            picture["derp"] = sorted(regions) if isinstance(regions, dict) else []
+        if notify.get("ErrMessage"):
+            picture["error"] = notify["ErrMessage"]
+        # The first picture is the baseline; the poller's first cycle covers it.
+        if self.picture is not None and picture != self.picture:
+            self.wake.set()
+        self.picture = picture
+
+    def _run(self) -> None:
+        delay = BUS_RETRY_SECONDS
+        while not self.stopped.is_set():
+            began = time.monotonic()
+            try:
+                self._session()
+            except Exception as error:  # noqa: BLE001 - every failure means "reconnect"
+                if self.stopped.is_set():
+                    return
+                print(f"IPN bus lost ({type(error).__name__}); polling on the timer meanwhile", flush=True)
+            if self.picture is not None:
+                self.wake.set()  # whatever ended the session is worth a cycle
+            if time.monotonic() - began > BUS_RETRY_MAX:
+                delay = BUS_RETRY_SECONDS
+            else:
+                delay = min(2 * delay, BUS_RETRY_MAX)
+            self.stopped.wait(delay)
+
+    def _session(self) -> None:
+        connection = self.connection = UnixHTTPConnection(self.socket_path, TIMEOUT)
+        try:
+            connection.request(
+                "GET", f"/localapi/v0/watch-ipn-bus?mask={BUS_MASK}", headers={"Sec-Tailscale": "localapi"}
+            )
+            response = connection.getresponse()
+            if response.status != 200:
+                raise ConnectionError(f"watch-ipn-bus: HTTP {response.status}")
+            # Connected and answered within TIMEOUT; from here silence is normal
+            # and the read may block for as long as the tailnet stays quiet.
+            connection.sock.settimeout(None)
+            for line in response:
+                if line.strip():
+                    notify = json.loads(line)
+                    if isinstance(notify, dict):
+                        self.apply(notify)
+            raise ConnectionError("watch-ipn-bus ended")
+        finally:
+            connection.close()
+
+
+# Set by start_watch(); only a resident poller holds the bus open.
+BUS: BusWatch | None = None
+
+
+def start_watch(wake) -> bool:
+    """Engine push source (PUSH SOURCES): hold the IPN bus open for this poller."""
+    global BUS
+    BUS = BusWatch(TAILSCALED_SOCKET, wake).start()
+    return True
 
 
 def health_key(message: str) -> str:
     return "tailnet:health:" + hashlib.sha256(message.encode()).hexdigest()[:12]
 
 
-def check_status() -> list[Problem]:
+def check_tailscaled() -> list[Problem]:
+    """Status and DERP map from one LocalAPI connection, both inside TIMEOUT."""
+    deadline = time.monotonic() + TIMEOUT
+    status: dict | Exception
+    derp: dict | Exception
     try:
-        status = run_json(["status", "--json"])
+        status = LOCALAPI.status(deadline, peers=False)  # Health and BackendState are all we read
     except Exception as error:  # noqa: BLE001
+        status = error
+    if isinstance(status, TimeoutError):
+        # A tailscaled that let the status read time out is wedged; asking it for
+        # the DERP map too would only wait out the rest of the same deadline.
+        derp = status
+    else:
+        try:
+            derp = LOCALAPI.derp_map(deadline)
+        except Exception as error:  # noqa: BLE001
+            derp = error
+    return status_problems(status) + derp_problems(derp)
+
+
+def status_problems(status: dict | Exception) -> list[Problem]:
+    if isinstance(status, Exception):
         return [
             Problem(
                 "tailnet:status",
-                f"{HOSTNAME}: `tailscale status` unreadable ({type(error).__name__}). "
+                f"{HOSTNAME}: tailscaled status unreadable ({type(status).__name__}). "
                 f"tailscaled may be down or wedged; this host's tailnet view is unknown.",
             )
         ]
@@ -97,14 +387,12 @@ def check_status() -> list[Problem]:
     return found
 
 
-def check_derp_map() -> list[Problem]:
-    try:
-        derp = run_json(["debug", "derp-map"])
-    except Exception as error:  # noqa: BLE001
+def derp_problems(derp: dict | Exception) -> list[Problem]:
+    if isinstance(derp, Exception):
         return [
             Problem(
                 "tailnet:derpmap",
-                f"{HOSTNAME}: `tailscale debug derp-map` unreadable ({type(error).__name__}).",
+                f"{HOSTNAME}: tailscaled DERP map unreadable ({type(derp).__name__}).",
             )
         ]
     if not (derp.get("Regions") or {}):
@@ -119,8 +407,159 @@ def check_derp_map() -> list[Problem]:
     return []
 
 
+class MeshHistory:
+    """A fixed-size window of ping results per peer, mirrored to disk.
+
+    Whole milliseconds plus one character per sample for the path -- "d" direct,
+    "r" relayed through DERP, "-" no answer -- with a write cursor, so the file
+    stays a few hundred bytes per peer however long the poller runs. Every
+    peer's check writes to it from its own worker.
+    """
+
+    def __init__(self, path: str, size: int = MESH_SAMPLES) -> None:
+        self.path = path
+        self.size = size
+        self.lock = threading.Lock()
+        self.peers: dict[str, dict] | None = None  # read on first use
+        self.dirty = False
+        self.flushed = 0.0
+
+    def add(self, name: str, ms: int, via: str) -> None:
+        with self.lock:
+            ring = self._peers().setdefault(name, {"next": 0, "ms": [], "via": ""})
+            at = ring["next"]
+            if len(ring["ms"]) < self.size:
+                ring["ms"].append(ms)
+                ring["via"] += via
+            else:
+                ring["ms"][at] = ms
+                ring["via"] = ring["via"][:at] + via + ring["via"][at + 1 :]
+            ring["next"] = (at + 1) % self.size
+            self.dirty = True
+
+    def samples(self, name: str) -> list[tuple[int, str]]:
+        """(ms, path) for `name`, in no particular order."""
+        with self.lock:
+            ring = self._peers().get(name, {"ms": [], "via": ""})
+            return list(zip(ring["ms"], ring["via"]))
+
+    def tick(self, now: float) -> None:
+        """Flush, unless the history was written less than MESH_FLUSH_SECONDS ago."""
+        with self.lock:
+            if not self.dirty or now - self.flushed < MESH_FLUSH_SECONDS:
+                return
+            self.flushed = now  # claimed under the lock: one writer per interval
+        self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return
+            peers = json.loads(json.dumps(self._peers()))
+            self.dirty = False
+        try:
+            engine.atomic_write_state(self.path, {"peers": peers})
+        except OSError as error:
+            print(f"mesh history not written ({type(error).__name__}); kept in memory", flush=True)
+
+    def _peers(self) -> dict[str, dict]:
+        if self.peers is None:
+            self.peers = {}
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    raw = json.load(handle)["peers"]
+                for name, ring in raw.items():
+                    ms = [int(sample) for sample in ring["ms"]][: self.size]
+                    via = str(ring["via"])[: len(ms)]
+                    if len(via) == len(ms) and not set(via) - set("dr-"):
+                        self.peers[str(name)] = {"next": int(ring["next"]) % self.size, "ms": ms, "via": via}
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass  # a lost history refills within a day; until then nothing pages
+        return self.peers
+
+
+MESH = MeshHistory(MESH_PATH)
+
+
+def ping_peer(address: str, deadline: float) -> tuple[int, str, str]:
+    """(round trip ms, path, DERP region) of the best of up to MESH_PINGS pings.
+
+    Stops at the first direct answer. A ping that errs or times out is no path;
+    a later one in the same cycle can still find it.
+    """
+    best = (0, "-", "")
+    for _ in range(MESH_PINGS):
+        try:
+            result = LOCALAPI.ping(address, min(deadline, time.monotonic() + PING_TIMEOUT))
+        except TimeoutError:
+            if time.monotonic() >= deadline:
+                break
+            continue
+        if result.get("Err"):
+            continue
+        ms = int(round(float(result.get("LatencySeconds") or 0) * 1000))
+        if result.get("Endpoint"):
+            return ms, "d", ""
+        if result.get("DERPRegionID"):
+            best = (ms, "r", str(result.get("DERPRegionCode") or result["DERPRegionID"]))
+    return best
+
+
+def check_mesh(peer: dict) -> list[Problem]:
+    """Ping one fleet peer, judge it against its own history, then record it."""
+    deadline = time.monotonic() + TIMEOUT
+    try:
+        ms, via, region = ping_peer(peer["address"], deadline)
+    except Exception as error:  # noqa: BLE001 - tailscaled unreadable: tailnet:status says so
+        print(f"mesh: {peer['name']} not pinged ({type(error).__name__})", flush=True)
+        return []
+    found = judge_mesh(peer["name"], ms, via, region, MESH.samples(peer["name"]))
+    MESH.add(peer["name"], ms, via)
+    MESH.tick(time.time())
+    return found
+
+
+def judge_mesh(name: str, ms: int, via: str, region: str, history: list[tuple[int, str]]) -> list[Problem]:
+    """A normally direct peer now on DERP, or direct but well above its baseline.
+
+    No answer at all is not judged here: a peer that is down is the business of
+    the pollers watching its services, and a dark tailnet is tailnet:status.
+    """
+    direct = sorted(sample for sample, path in history if path == "d")
+    if len(direct) < MESH_MIN_SAMPLES:
+        return []
+    baseline = direct[len(direct) // 2]
+    if via == "r" and len(direct) >= MESH_DIRECT_SHARE * len(history):
+        return [
+            Problem(
+                f"mesh:{name}:derp",
+                f"{HOSTNAME} -> {name}: relayed via DERP ({region}, {ms} ms) instead of direct "
+                f"({baseline} ms typical). A NAT or firewall change on either side, or a "
+                "blocked UDP port 41641; `tailscale netcheck` on both ends.",
+            )
+        ]
+    if via == "d" and ms > baseline * MESH_SLOW_FACTOR and ms > baseline + MESH_SLOW_MARGIN_MS:
+        return [
+            Problem(
+                f"mesh:{name}:slow",
+                f"{HOSTNAME} -> {name}: direct round trip {ms} ms, {baseline} ms typical.",
+            )
+        ]
+    return []
+
+
+def checks() -> list[Check]:
+    # One check, one connection: both reads share TIMEOUT, so a wedged tailscaled
+    # costs the cycle one timeout, as the two parallel CLI runs did. Then one
+    # check per fleet peer: the engine's worker pool pings them side by side,
+    # never more at once than it has workers.
+    return [Check("tailscaled", check_tailscaled)] + [
+        Check(f"mesh:{peer['name']}", partial(check_mesh, peer)) for peer in MESH_PEERS
+    ]
+
+
 def collect() -> list[Problem]:
-    return check_status() + check_derp_map()
+    return engine.gather(checks())
 
 
 def render(announced: list[str], cleared: list[str]) -> str:
@@ -132,17 +571,26 @@ def render(announced: list[str], cleared: list[str]) -> str:
     return "\n".join(lines)
 
 
+def poller() -> engine.Poller:
+    # 100 s: two TIMEOUT-bounded probes around the fast-confirm settle delay,
+    # inside TimeoutStartSec=150.
+    return engine.Poller(
+        "tailnet-watch",
+        STATE_PATH,
+        checks(),
+        render,
+        NOTIFICATION_ENV,
+        budget=100,
+        confirm_after=engine.FAST_CONFIRM_SECONDS,
+        push=start_watch,
+    )
+
+
 def main() -> int:
-    target = engine.env_file_value(NOTIFICATION_ENV, "WATCHTOWER_NOTIFICATION_URL")
-    if not target:
-        print("notification target missing")
-        return engine.EXIT_UNDELIVERED
     try:
-        sender = engine.shoutrrr_telegram_sender(target)
-    except ValueError as error:
-        print(f"notification target unusable: {error}")
-        return engine.EXIT_UNDELIVERED
-    return engine.run_cycle(STATE_PATH, time.time(), collect, render, sender)
+        return engine.run_poller(poller())
+    finally:
+        MESH.flush()  # whatever the last interval added
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ repo="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 engine="${repo}/modules/shared/fleet-alerts/engine.py"
 heartbeat="${repo}/modules/shared/fleet-alerts/heartbeat.nix"
 fleetlib="${repo}/modules/shared/fleet-alerts/lib.nix"
+hostrunner="${repo}/modules/shared/fleet-alerts/host-runner.nix"
 csb0mod="${repo}/hosts/csb0/ops-alerts.nix"
 csb0checks="${repo}/hosts/csb0/ops-alerts-checks.py"
 csb1mod="${repo}/hosts/csb1/peer-watch.nix"
@@ -19,7 +20,13 @@ PYTHONDONTWRITEBYTECODE=1 python3 -m unittest \
 # loud failure rather than a silently skipped suite.
 PYTHONDONTWRITEBYTECODE=1 python3 -m unittest \
   discover -s "${repo}/tests" -p 'test_ops_alerts_smarthome_link.py' -v
-for module in "${heartbeat}" "${fleetlib}" "${csb0mod}" "${csb1mod}"; do
+# OPS-104: one /api/template round trip per house, restrictions intact.
+PYTHONDONTWRITEBYTECODE=1 python3 -m unittest \
+  discover -s "${repo}/tests" -p 'test_ops_alerts_home_assistant.py' -v
+# OPS-107 heartbeat: the resident server and its v2 line, legacy peers included.
+PYTHONDONTWRITEBYTECODE=1 python3 -m unittest \
+  discover -s "${repo}/tests" -p 'test_fleet_heartbeat.py' -v
+for module in "${heartbeat}" "${fleetlib}" "${hostrunner}" "${csb0mod}" "${csb1mod}"; do
   nix-instantiate --parse "${module}" >/dev/null
 done
 
@@ -30,6 +37,18 @@ grep -Fq 'SMARTHOME_LINKS_JSON' "${csb0mod}"
 grep -Fq 'SMARTHOME_LINKS_JSON' "${csb0checks}"
 grep -Fq 'check_smarthome_link' "${csb0checks}"
 grep -Fq 'paho-mqtt' "${csb0mod}"
+# The HA push watch needs its library and a resident poller to live in.
+grep -Fq 'websocket-client' "${csb0mod}"
+grep -Fq 'FLEET_ALERTS_SERVE_SECONDS' "${csb0mod}"
+# Resident, an undeliverable exit must still leave the unit failed, and the
+# timer must start it again.
+grep -Fq 'RestartPreventExitStatus = [ 2 ];' "${csb0mod}"
+grep -Fq 'OnUnitInactiveSec = "15min";' "${csb0mod}"
+grep -Fq 'push=start_watches' "${csb0checks}"
+# ...and the broker tracker keeps its last-seen index in the state directory.
+grep -Fq 'LINK_INDEX_PATH = os.path.join(os.path.dirname(STATE_PATH)' "${csb0checks}"
+# Every house carries a latency budget, or a slow one can never page.
+[ "$(grep -c 'tokenVar = ' "${csb0mod}")" = "$(grep -Ec 'latencyBudgetSeconds = [0-9]+;' "${csb0mod}")" ]
 grep -Fq 'age.secrets.mqtt-csb0.path' "${csb0mod}"
 grep -Fq '127.0.0.1:1883:1883' "${repo}/hosts/csb0/docker/compose-spec.nix"
 
@@ -59,12 +78,19 @@ if grep -Fq 'networking.firewall.allowedTCPPorts' "${heartbeat}"; then
   printf 'heartbeat must not open a port on the public interface\n' >&2
   exit 1
 fi
+# One resident server, not a process forked per probe; both peers ask for v2.
+grep -Fq 'Accept = false;' "${heartbeat}"
+grep -Fq '@STATE_PATH@' "${repo}/modules/shared/fleet-alerts/heartbeat.py"
+for checks in "${csb0checks}" "${csb1checks}"; do
+  grep -Fq 'engine.read_heartbeat' "${checks}"
+done
 
 # Durability contract (adopted from hausv-alerts, NIX-332). An alert that cannot
 # be delivered must be retried, not dropped, and must fail the unit.
 grep -Fq 'EXIT_UNDELIVERED = 2' "${engine}"
 grep -Fq 'atomic_write_state' "${engine}"
-grep -Fq '"pending"' "${engine}"
+grep -Fq '"outbox"' "${engine}"
+grep -Fq 'OUTBOX_LIMIT' "${engine}"
 grep -Fq 'CONFIRM_RUNS = 2' "${engine}"
 for module in "${csb0mod}" "${csb1mod}"; do
   grep -Fq 'SuccessExitStatus' "${module}"
@@ -90,6 +116,24 @@ if grep -Fq '== "unknown"' "${csb0checks}"; then
   exit 1
 fi
 
+# OPS-107 host runner: csb1's pollers share one process, but each must still be
+# loadable on its own (poller()) and keep its own unit as the fallback.
+grep -Fq 'fleet-alerts/host-runner.nix' "${repo}/hosts/csb1/configuration.nix"
+grep -Fq 'mkHostRunner' "${fleetlib}"
+grep -Fq '@POLLERS_JSON@' "${repo}/modules/shared/fleet-alerts/host-runner.py"
+for name in peer-watch tailnet-watch fleet-drift; do
+  grep -Fq "nixcfg.fleetAlerts.hostRunner.pollers.${name}" "${repo}/hosts/csb1/${name}.nix"
+  grep -Fq 'lib.mkIf (!runner.enable)' "${repo}/hosts/csb1/${name}.nix"
+done
+for checks in "${csb1checks}" "${repo}/hosts/csb1/fleet-drift-checks.py" \
+  "${repo}/modules/shared/fleet-alerts/tailnet-watch-checks.py"; do
+  grep -Fq 'def poller() -> engine.Poller' "${checks}"
+done
+if grep -Eq '^[^#]*EnvironmentFile[[:space:]]*=' "${hostrunner}"; then
+  printf 'host runner must not inherit the complete operator env file\n' >&2
+  exit 1
+fi
+
 # csb1's peer watch must not inherit the whole operator environment -- same rule
 # tests/T34-hausv-alerts.sh enforces for hausv-alerts.
 if grep -Eq '^[^#]*EnvironmentFile[[:space:]]*=' "${csb1mod}"; then
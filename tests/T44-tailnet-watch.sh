@@ -22,14 +22,31 @@ for host in csb1 hsb1; do
   grep -Fq 'name = "tailnet-watch"' "${mod}"
   grep -Fq '../../modules/shared/fleet-alerts/tailnet-watch-checks.py' "${mod}"
   grep -Fq "HOSTNAME = \"${host}\"" "${mod}"
-  grep -Fq 'config.services.tailscale.package' "${mod}"
+  grep -Fq 'TAILSCALED_SOCKET = "/run/tailscale/tailscaled.sock"' "${mod}"
   grep -Fq '"AF_UNIX"' "${mod}"
   grep -Fq 'ReadWritePaths = [ "/run/tailscale" ]' "${mod}"
-  grep -Fq 'OnUnitActiveSec = "10m"' "${mod}"
   grep -Fq 'StateDirectory = "tailnet-watch"' "${mod}"
   # Exit contract: 2 (undeliverable) must fail the unit; 0/1 must not.
   grep -Fq 'SuccessExitStatus = [' "${mod}"
+  # Mesh checks: every other fleet peer, never the host itself.
+  grep -Fq 'MESH_PEERS_JSON = builtins.toJSON meshPeers;' "${mod}"
+  if grep -Fq "name = \"${host}\";" "${mod}"; then
+    echo "${host} must not ping itself in meshPeers" >&2
+    exit 1
+  fi
 done
+# Cadence: csb1 runs resident in its host runner (10 min) and keeps the timer
+# unit as the fallback; hsb1 is resident in its own unit. Both hold the IPN bus.
+grep -Fq 'interval = 10 * 60;' "${repo}/hosts/csb1/tailnet-watch.nix"
+grep -Fq 'OnUnitActiveSec = "10m"' "${repo}/hosts/csb1/tailnet-watch.nix"
+grep -Fq 'environment.FLEET_ALERTS_SERVE_SECONDS = toString (10 * 60);' "${repo}/hosts/hsb1/tailnet-watch.nix"
+# Resident, exit 2 must stay a failed unit that the timer starts again.
+grep -Fq 'RestartPreventExitStatus = [ 2 ];' "${repo}/hosts/hsb1/tailnet-watch.nix"
+grep -Fq 'OnUnitInactiveSec = "10m";' "${repo}/hosts/hsb1/tailnet-watch.nix"
+grep -Fq 'RestartPreventExitStatus = [ 2 ];' "${repo}/modules/shared/fleet-alerts/host-runner.nix"
+grep -Fq 'push=start_watch' "${checks}"
+grep -Fq 'watch-ipn-bus' "${checks}"
+
 # Per-host notification env: csb1 reuses its watchtower env, hsb1 has its own agenix secret.
 grep -Fq 'age.secrets.csb1-watchtower-env.path' "${repo}/hosts/csb1/tailnet-watch.nix"
 grep -Fq 'age.secrets.hsb1-tailnet-watch-env.path' "${repo}/hosts/hsb1/tailnet-watch.nix"
@@ -37,11 +54,21 @@ grep -Fq '../../secrets/hsb1-tailnet-watch-env.age' "${repo}/hosts/hsb1/tailnet-
 grep -Fq '"hsb1-tailnet-watch-env.age".publicKeys = markus ++ hsb1;' "${secrets}"
 
 # Check-file contract
-grep -Fq '@TAILSCALE_BIN@' "${checks}"
+grep -Fq '@TAILSCALED_SOCKET@' "${checks}"
 grep -Fq '@NOTIFICATION_ENV@' "${checks}"
 grep -Fq '"/var/lib/tailnet-watch/state.json"' "${checks}"
 grep -Fq 'WATCHTOWER_NOTIFICATION_URL' "${checks}"
 grep -Fq 'SUPPRESSED_HEALTH' "${checks}"
 grep -Fq '@HOSTNAME@' "${checks}"
-grep -Fq '"debug", "derp-map"' "${checks}"
+# LocalAPI, not the CLI: peer-less status and the DERP map on one connection.
+grep -Fq '"status?peers=false"' "${checks}"
+grep -Fq '"derpmap"' "${checks}"
+# Mesh: disco pings (they report the path) and a fixed-size history beside the state.
+grep -Fq '@MESH_PEERS_JSON@' "${checks}"
+grep -Fq 'type=disco' "${checks}"
+grep -Fq '"mesh.json"' "${checks}"
+if grep -Fq 'subprocess' "${checks}"; then
+  echo "tailnet-watch must read the LocalAPI, not spawn the tailscale CLI" >&2
+  exit 1
+fi
 echo "T44 ok"
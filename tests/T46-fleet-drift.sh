@@ -24,4 +24,15 @@ for ph in '@STORE_PATH@' '@NIXCFG_CHECKOUT@' '@GIT_BIN@' '@NOTIFICATION_ENV@'; d
 done
 grep -Fq 'STALE_SECONDS' "${checks}"
 grep -Fq '"/var/lib/fleet-drift/state.json"' "${checks}"
+# Commit times: one batched git run for new revisions, cached beside the state.
+grep -Fq '"cat-file", "--batch"' "${checks}"
+grep -Fq '"commits.json"' "${checks}"
+# Counts the beacon leaves out: an incremental commit graph of origin/main.
+grep -Fq '"rev-list", "--parents"' "${checks}"
+grep -Fq '"graph.json"' "${checks}"
+grep -Fq 'MAIN_REF = "refs/remotes/origin/main"' "${checks}"
+if grep -Fq '"log", "-1"' "${checks}"; then
+  echo "fleet-drift must not run git log per host per cycle" >&2
+  exit 1
+fi
 echo "T46 ok"
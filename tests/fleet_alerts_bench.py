@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""Benchmark and replay suite for the fleet-alert engine — OPS-107.
+
+The unit tests say the engine is right; they say nothing about what a change
+costs. This runs the hot paths against synthetic problem streams -- thousands
+of keys, flapping, one long outage -- and, with --replay, against the problem
+keys a real poller recorded in its history.jsonl (see HISTORY in engine.py),
+and reports operations per second and peak allocation per operation.
+
+Runner speed varies far more than any change worth catching, so every rate is
+divided by a fixed pure-Python calibration loop measured in the same run. Those
+normalised rates are what tests/baselines/fleet-alerts-bench.json stores and
+what a run is compared against: a workload more than --tolerance slower than
+its baseline fails the run (exit 1).
+
+    python3 tests/fleet_alerts_bench.py             # compare with the baseline
+    python3 tests/fleet_alerts_bench.py --record    # accept the current numbers
+    python3 tests/fleet_alerts_bench.py --replay /var/lib/ops-alerts
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+REPO = Path(__file__).resolve().parents[1]
+SCRIPT = REPO / "modules" / "shared" / "fleet-alerts" / "engine.py"
+BASELINE = REPO / "tests" / "baselines" / "fleet-alerts-bench.json"
+SPEC = importlib.util.spec_from_file_location("fleet_engine", SCRIPT)
+if SPEC is None or SPEC.loader is None:
+    raise RuntimeError("unable to load the fleet alert engine")
+engine = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = engine
+SPEC.loader.exec_module(engine)
+
+# Loose on purpose: two runs on one idle machine differ by 5-10 %, a shared CI
+# runner by more. A real regression in these paths is usually a multiple.
+TOLERANCE = 0.30
+
+
+@dataclass
+class Result:
+    name: str
+    ops: float  # operations per second, best round
+    peak_kib: float  # peak traced allocation of one operation
+    score: float = 0.0  # ops divided by the calibration rate
+
+
+def rate(op: Callable[[], object], seconds: float, rounds: int = 5) -> float:
+    """Best operations/second over `rounds` time-boxed rounds, with the cyclic GC
+    held off so a collection triggered by an earlier workload is not billed here."""
+    best = 0.0
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            done = 0
+            began = time.perf_counter()
+            deadline = began + seconds / rounds
+            while True:
+                op()
+                done += 1
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+            best = max(best, done / (now - began))
+    finally:
+        gc.enable()
+    return best
+
+
+def peak_kib(op: Callable[[], object]) -> float:
+    """Peak memory traced while one operation runs, in KiB."""
+    op()  # warm caches so the number is the steady state, not the first call
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak - base) / 1024
+
+
+def calibration() -> float:
+    """A fixed mix of dict, string and json work; the yardstick for this machine."""
+    payload = {f"host{i}:api": {"text": f"host{i}: unreachable", "count": i % 3} for i in range(200)}
+
+    def op() -> None:
+        json.loads(json.dumps(payload, sort_keys=True))
+
+    return rate(op, 0.2)
+
+
+# ----------------------------------------------------------------------------
+# Problem streams: each yields one cycle's problem list at a time.
+# ----------------------------------------------------------------------------
+
+
+def problem(key: str) -> "engine.Problem":
+    return engine.Problem(key, f"{key}: unreachable (URLError)")
+
+
+def steady(keys: int, cycles: int) -> Iterator[list]:
+    """Every key down for the whole stream: the saturated, nothing-changes case."""
+    down = [problem(f"host{i}:api") for i in range(keys)]
+    for _ in range(cycles):
+        yield down
+
+
+def flapping(keys: int, cycles: int) -> Iterator[list]:
+    """Each key goes up and down on its own period: the worst case for transitions."""
+    for cycle in range(cycles):
+        yield [problem(f"host{i}:api") for i in range(keys) if (cycle // (1 + i % 4)) % 2 == 0]
+
+
+def outage(keys: int, cycles: int) -> Iterator[list]:
+    """Quiet, then everything down at once for most of the stream, then recovery."""
+    down = [problem(f"host{i}:api") for i in range(keys)]
+    for cycle in range(cycles):
+        yield down if cycles // 5 <= cycle < cycles - cycles // 5 else []
+
+
+def recorded(directory: Path) -> list[list]:
+    """Every cycle's problem keys from a poller's HISTORY files, oldest first."""
+    cycles = []
+    for path in engine.history_files(directory):
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                cycles.append([problem(key) for key in json.loads(line)["problems"]])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return cycles
+
+
+def replay(stream: list[list]) -> Callable[[], None]:
+    """One operation = folding the whole stream through advance() and event_id()."""
+
+    def op() -> None:
+        state = engine.empty_state()
+        for stamp, problems in enumerate(stream):
+            state, announced, cleared = engine.advance(state, problems)
+            if announced or cleared:
+                engine.event_id(stamp * 900.0, announced, cleared)
+
+    return op
+
+
+# ----------------------------------------------------------------------------
+# Workloads
+# ----------------------------------------------------------------------------
+
+
+def workloads(scratch: Path, keys: int = 2000, replay_dir: Path | None = None) -> dict[str, Callable[[], object]]:
+    """name -> one operation. `keys` sizes everything; the baseline uses the default."""
+    found: dict[str, Callable[[], object]] = {
+        "advance:steady": replay(list(steady(keys, 20))),
+        "advance:flapping": replay(list(flapping(keys // 4, 40))),
+        "advance:outage": replay(list(outage(keys, 20))),
+    }
+    if replay_dir is not None:
+        found["advance:replay"] = replay(recorded(replay_dir))
+
+    state, _, _ = engine.advance(engine.empty_state(), [problem(f"host{i}:api") for i in range(keys)])
+    v1 = scratch / "v1.json"
+    v1.write_text(json.dumps({k: v["text"] for k, v in state["seen"].items()}))
+    v2 = scratch / "v2.json"
+    v2.write_text(
+        json.dumps({k: {"msg": v["text"], "count": 2, "alerted": True} for k, v in state["seen"].items()})
+    )
+    journal = str(scratch / "journal.json")
+    store = engine.StateStore(journal)
+    for cycle in range(engine.COMPACT_RECORDS - 2):
+        # A slow flap on a slice of the keys: many small records, like a real journal.
+        flipped = dict(state["seen"])
+        flipped.pop(f"host{cycle % keys}:api", None)
+        store.save({**state, "seen": flipped}, "advance")
+
+    found["load_state:v1"] = lambda: engine.load_state(str(v1))
+    found["load_state:v2"] = lambda: engine.load_state(str(v2))
+    found["load_state:journal"] = lambda: engine.load_state(journal)
+    found["atomic_write_state"] = lambda: engine.atomic_write_state(str(scratch / "write.json"), state)
+    announced = [f"host{i}: unreachable (URLError)" for i in range(100)]
+    found["event_id"] = lambda: engine.event_id(1_800_000_000.0, announced, [])
+
+    checks = [engine.Check(f"noop{i}", lambda: []) for i in range(20)]
+    cycle_state = str(scratch / "cycle" / "state.json")
+    found["run_cycle:quiet"] = lambda: engine.run_cycle(
+        cycle_state, time.time(), checks, lambda a, c: "", lambda t, i: True
+    )
+    return found
+
+
+def measure(operations: dict[str, Callable[[], object]], seconds: float) -> list[Result]:
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):  # run_cycle narrates every cycle
+        for name, op in operations.items():
+            ops = rate(op, seconds)
+            # Calibrate on both sides of every workload: a machine whose speed
+            # drifts mid-run (turbo, a noisy neighbour) is then compared like
+            # with like, and the faster reading discounts a momentary stall.
+            yardstick = max(calibration(), calibration())
+            results.append(Result(name, ops, peak_kib(op), ops / yardstick))
+    return results
+
+
+def compare(results: list[Result], baseline: dict, tolerance: float) -> list[str]:
+    """Workloads slower than baseline by more than `tolerance`, as report lines."""
+    slow = []
+    for result in results:
+        recorded_score = baseline.get(result.name, {}).get("score")
+        if recorded_score and result.score < recorded_score * (1 - tolerance):
+            slow.append(
+                f"{result.name}: {100 * (1 - result.score / recorded_score):.0f} % slower than baseline"
+            )
+    return slow
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--record", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--replay", type=Path, help="a poller state directory with history.jsonl")
+    parser.add_argument("--only", action="append", default=[], help="run only workloads with this prefix")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per workload (default 1)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    args = parser.parse_args(argv)
+
+    scratch = Path(tempfile.mkdtemp(prefix="fleet-alerts-bench-"))
+    try:
+        operations = workloads(scratch, replay_dir=args.replay)
+        if args.only:
+            operations = {n: op for n, op in operations.items() if any(n.startswith(p) for p in args.only)}
+        results = measure(operations, args.seconds)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    print(f"{'workload':<22} {'ops/s':>10} {'peak KiB':>9} {'score':>9} {'baseline':>9}")
+    for r in results:
+        before = baseline.get(r.name, {}).get("score")
+        shown = f"{before:>9.4g}" if before else f"{'-':>9}"
+        print(f"{r.name:<22} {r.ops:>10.4g} {r.peak_kib:>9.1f} {r.score:>9.4g} {shown}")
+
+    if args.record:
+        baseline.update({r.name: {"score": round(r.score, 6), "peak_kib": round(r.peak_kib, 1)} for r in results})
+        baseline.pop("advance:replay", None)  # site data, not a reproducible workload
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    slow = compare(results, baseline, args.tolerance)
+    for line in slow:
+        print(f"REGRESSION {line}")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Smoke tests for the fleet-alert benchmark harness — OPS-107.
+
+The numbers themselves are only meaningful on a quiet machine, so these check
+the harness: every workload runs, a recorded history replays, and a slowdown
+past the tolerance is reported while noise inside it is not.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+SCRIPT = REPO / "tests" / "fleet_alerts_bench.py"
+SPEC = importlib.util.spec_from_file_location("fleet_alerts_bench", SCRIPT)
+if SPEC is None or SPEC.loader is None:
+    raise RuntimeError("unable to load the fleet alert benchmark")
+bench = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = bench
+SPEC.loader.exec_module(bench)
+engine = bench.engine
+
+
+class Harness(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+
+    def test_every_workload_runs(self) -> None:
+        operations = bench.workloads(self.dir, keys=20)
+        results = bench.measure(operations, 0.05)
+        self.assertEqual([r.name for r in results], list(operations))
+        self.assertTrue(all(r.ops > 0 and r.score > 0 for r in results))
+
+    def test_baseline_covers_every_workload(self) -> None:
+        recorded = json.loads(bench.BASELINE.read_text())
+        self.assertEqual(set(recorded), set(bench.workloads(self.dir, keys=20)))
+
+    def test_replays_a_recorded_history(self) -> None:
+        lines = [{"at": n, "problems": ["hsb1:api"] if n % 3 else []} for n in range(12)]
+        (self.dir / engine.HISTORY_NAME).write_text("".join(json.dumps(l) + "\n" for l in lines))
+        stream = bench.recorded(self.dir)
+        self.assertEqual(len(stream), 12)
+        self.assertIn("advance:replay", bench.workloads(self.dir, keys=20, replay_dir=self.dir))
+
+    def test_slowdown_past_the_tolerance_fails(self) -> None:
+        baseline = {"advance:steady": {"score": 1.0}, "event_id": {"score": 1.0}}
+        results = [bench.Result("advance:steady", 1, 0, 0.5), bench.Result("event_id", 1, 0, 0.9)]
+        slow = bench.compare(results, baseline, 0.3)
+        self.assertEqual(len(slow), 1)
+        self.assertTrue(slow[0].startswith("advance:steady: 50 % slower"))
+
+
+if __name__ == "__main__":
+    unittest.main()
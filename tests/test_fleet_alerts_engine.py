@@ -9,18 +9,64 @@ Each rule here exists because of a specific incident:
     announced and *then* sent, ignoring the result. A Telegram outage therefore
     lost the alert permanently: state said announced, nothing was delivered,
     nothing retried. In a tool built to catch silent failures.
+  * the outbox — the single `pending` slot that fixed that also stopped all
+    evaluation while the channel was down, so new transitions went unseen.
+  * chunked delivery — a fleet-wide outage rendered past Telegram's 4096
+    characters was rejected on every retry and wedged the outbox for good.
   * atomic state — a plain json.dump over the live file corrupts it on a crash,
     after which the loader falls back to empty and every problem re-announces.
+  * pooled delivery — one TLS context and one kept-alive connection serve every
+    recipient and retry, and the handshake can be paid while checks still run.
+  * the state journal — a quiet cycle must not rewrite and fsync the whole state
+    file; a crash at ANY point of an append or a compaction must leave state at
+    some whole earlier-or-equal version, with no alert lost or sent twice.
+  * parallel checks — run one after another, csb0's five probes cost the SUM of
+    their 15 s timeouts when the tailnet is down; side by side they cost one, and
+    a probe that overruns is reported as unknown rather than waited for.
+  * cadence — the monthly Tesla budget counter was fetched every five minutes
+    per house; a slow check now runs on its own schedule, and its cached answer
+    keeps an alert standing without ever confirming or clearing one.
+  * push sources — csb0 saw a Tesla integration go unavailable up to half an
+    hour late; a resident check set's own listeners now wake the next cycle,
+    under host() as well as on their own.
+  * watched files — fleet-drift re-parsed pharosd's store every hour whether
+    or not it had changed, and a drifted host waited up to that hour to page;
+    a rewrite of a watched file now makes the check due, and wakes a resident
+    poller within seconds.
+  * circuit breaker — a dead house cost its full 15 s timeout every cycle; after
+    repeated expensive failures it is only probed every few cycles, its alert
+    held rather than cleared.
+  * metrics — one "ok" line per cycle could not say which check was eating the
+    cycle budget; every cycle now leaves a textfile of what it cost.
+  * host runner — csb1's three pollers each paid for an interpreter, an engine
+    import and a Telegram connection; hosted together they share those, but a
+    check set whose probes all hang must still not starve its neighbours.
+  * visible failure — resident, an undeliverable alert or a hosted poller with
+    no notification target only left a journal line while the unit stayed
+    green; a stuck delivery now fails the unit again, and a hosted poller that
+    cannot alert is paged by one that can.
+  * history — CONFIRM_RUNS and the timeouts were set by guesswork; a bounded
+    per-cycle log and `engine.py stats` let them be tuned from data.
 """
 
 from __future__ import annotations
 
+import contextlib
+import http.server
 import importlib.util
+import io
 import json
+import shutil
+import ssl
+import subprocess
 import sys
 import tempfile
+import threading
+import time
+import types
 import unittest
 from pathlib import Path
+from unittest import mock
 
 REPO = Path(__file__).resolve().parents[1]
 SCRIPT = REPO / "modules" / "shared" / "fleet-alerts" / "engine.py"
@@ -62,7 +108,7 @@ class Harness:
         )
 
     def stored(self) -> dict:
-        return json.loads(Path(self.state).read_text())
+        return engine.load_state(self.state)
 
 
 class ConfirmBeforeAlert(unittest.TestCase):
@@ -108,14 +154,14 @@ class DurableDelivery(unittest.TestCase):
         self.h.deliver = False
         self.assertEqual(self.h.run(), engine.EXIT_UNDELIVERED)
         self.assertEqual(self.h.sent, [], "nothing was delivered")
-        self.assertIsNotNone(self.h.stored()["pending"], "pending must survive on disk")
+        self.assertEqual(len(self.h.stored()["outbox"]), 1, "the event must survive on disk")
 
         # Channel returns. The identical text must go out before anything commits.
         self.h.deliver = True
         self.h.run()
         self.assertEqual(len(self.h.sent), 1)
         self.assertIn("NEW", self.h.sent[0][0])
-        self.assertIsNone(self.h.stored()["pending"], "pending must clear after delivery")
+        self.assertEqual(self.h.stored()["outbox"], [], "the outbox must clear after delivery")
 
     def test_undelivered_alert_is_not_announced_twice(self) -> None:
         self.h.problems = [PROBLEM]
@@ -138,6 +184,307 @@ class DurableDelivery(unittest.TestCase):
         self.assertNotEqual(engine.EXIT_UNDELIVERED, engine.EXIT_CLEAN)
 
 
+class Outbox(unittest.TestCase):
+    """While delivery is down, evaluation goes on and events queue in order."""
+
+    OTHER = engine.Problem("hsb8:api", "hsb8: HA unreachable (URLError)")
+
+    def setUp(self) -> None:
+        self.h = Harness()
+
+    def test_transitions_keep_being_staged_while_the_channel_is_down(self) -> None:
+        self.h.problems = [PROBLEM]
+        self.h.run()
+        self.h.deliver = False
+        self.h.run()  # PROBLEM confirmed, undeliverable
+        self.h.problems = [PROBLEM, self.OTHER]
+        self.h.run()
+        self.assertEqual(self.h.run(), engine.EXIT_UNDELIVERED)  # OTHER confirmed too
+        outbox = self.h.stored()["outbox"]
+        self.assertEqual(len(outbox), 2, "the second transition was evaluated and queued")
+        self.assertIn("hsb1", outbox[0]["text"])
+        self.assertIn("hsb8", outbox[1]["text"])
+
+    def test_backlog_drains_in_order_as_one_digest_and_only_once(self) -> None:
+        self.h.problems = [PROBLEM]
+        self.h.run()
+        self.h.deliver = False
+        self.h.run()
+        self.h.problems = []
+        self.h.run()  # the clear queues behind the announcement
+        self.h.deliver = True
+        self.assertEqual(self.h.run(), engine.EXIT_CLEAN)
+        self.assertEqual(len(self.h.sent), 1, "consecutive events go out as one digest")
+        text = self.h.sent[0][0]
+        self.assertIn("2 updates held back", text)
+        self.assertLess(text.index("NEW"), text.index("CLEARED"), "oldest first")
+        self.assertEqual(self.h.stored()["outbox"], [])
+        self.h.run()
+        self.assertEqual(len(self.h.sent), 1, "nothing is sent twice")
+
+    def test_a_lone_retry_is_the_identical_text(self) -> None:
+        self.h.problems = [PROBLEM]
+        self.h.run()
+        self.h.deliver = False
+        self.h.run()
+        queued = self.h.stored()["outbox"][0]
+        self.h.deliver = True
+        self.h.run()
+        self.assertEqual(self.h.sent, [(queued["text"], queued["event_id"])])
+
+    def test_digest_respects_the_message_limit(self) -> None:
+        events = [{"event_id": str(i), "text": "x" * 1500} for i in range(5)]
+        identifier, text, count = engine.digest(events)
+        self.assertLessEqual(len(text), engine.MESSAGE_LIMIT)
+        self.assertEqual(count, 2)
+
+    def test_outbox_is_bounded_without_dropping_anything(self) -> None:
+        outbox: list[dict] = []
+        for i in range(engine.OUTBOX_LIMIT + 5):
+            outbox = engine.enqueue(outbox, {"event_id": f"e{i}", "text": f"event {i}"})
+        self.assertEqual(len(outbox), engine.OUTBOX_LIMIT)
+        joined = "\n".join(e["text"] for e in outbox)
+        for i in range(engine.OUTBOX_LIMIT + 5):
+            self.assertIn(f"event {i}\n", joined + "\n")
+
+    def test_migrates_the_single_pending_slot(self) -> None:
+        Path(self.h.state).write_text(json.dumps({
+            "seen": {},
+            "pending": {
+                "event_id": "abc",
+                "text": "NEW hsb1: down",
+                "next_state": {"seen": {"hsb1:api": {"text": "hsb1: down", "count": 2, "alerted": True}}},
+            },
+        }))
+        self.h.problems = [engine.Problem("hsb1:api", "hsb1: down")]
+        self.h.run()
+        self.assertEqual(self.h.sent, [("NEW hsb1: down", "abc")], "the old pending event goes out once")
+        self.h.run()
+        self.assertEqual(len(self.h.sent), 1, "and its committed state means no re-announce")
+
+
+class ChunkedDelivery(unittest.TestCase):
+    """An event over the message limit goes out in numbered, individually committed chunks."""
+
+    def setUp(self) -> None:
+        self.h = Harness()
+        # Thirty houses down at once, each with a line long enough to matter.
+        self.h.problems = [
+            engine.Problem(f"house{i:02}:api", f"house{i:02}: HA unreachable " + "x" * 400) for i in range(30)
+        ]
+        self.h.run()
+
+    def test_sent_in_order_within_the_limit(self) -> None:
+        self.assertEqual(self.h.run(), engine.EXIT_PROBLEMS)
+        texts = [text for text, _ in self.h.sent]
+        self.assertGreater(len(texts), 1)
+        self.assertTrue(all(len(t) <= engine.MESSAGE_LIMIT for t in texts))
+        self.assertTrue(texts[0].startswith(f"(1/{len(texts)}) NEW house00"))
+        self.assertTrue(texts[-1].startswith(f"({len(texts)}/{len(texts)}) "))
+        body = "\n".join(t.split(" ", 1)[1] for t in texts)
+        self.assertEqual(body.count("house"), 30, "every line arrives exactly once")
+        self.assertEqual(self.h.stored()["outbox"], [])
+
+    def test_a_retry_resends_only_the_chunks_that_failed(self) -> None:
+        delivered: list[str] = []
+
+        def flaky(text: str, identifier: str) -> bool:
+            if len(delivered) == 2 and self.h.deliver:
+                self.h.deliver = False  # the channel drops after two chunks
+                return False
+            delivered.append(identifier)
+            return True
+
+        self.h.send = flaky
+        self.assertEqual(self.h.run(), engine.EXIT_UNDELIVERED)
+        left = self.h.stored()["outbox"][0]
+        self.assertEqual(left["sent"], 2)
+        self.h.run()
+        event = delivered[0].rsplit(".", 1)[0]
+        self.assertEqual(delivered, [f"{event}.{n}" for n in range(1, len(delivered) + 1)], "no chunk twice")
+        self.assertEqual(self.h.stored()["outbox"], [])
+
+    def test_chunking_resumes_where_it_left_off(self) -> None:
+        text = "\n".join(f"line {i} " + "y" * (i * 37 % 900) for i in range(200)) + "\n" + "z" * 9000
+        pieces = engine.chunks(text)
+        self.assertTrue(all(len(piece) <= engine.CHUNK_LIMIT for piece, _ in pieces))
+        self.assertEqual(engine.chunks(text[pieces[0][1]:]), pieces[1:])
+
+    def test_a_split_on_a_blank_line_resumes_exactly(self) -> None:
+        # enqueue folds a digest with "\n\n": the cut lands right before a blank line.
+        first = "a" * engine.CHUNK_LIMIT
+        text = f"{first}\n\nsecond event\n\n\nthird"
+        pieces = engine.chunks(text)
+        self.assertEqual(pieces[0], (first, len(first) + 1))
+        rest = text[pieces[0][1]:]
+        self.assertEqual(rest, "\nsecond event\n\n\nthird", "the blank line is still there")
+        self.assertEqual(engine.chunks(rest), pieces[1:])
+
+    def test_a_break_that_ends_the_text_leaves_no_empty_piece(self) -> None:
+        text = "a" * engine.CHUNK_LIMIT + "\n"
+        self.assertEqual(engine.chunks(text), [("a" * engine.CHUNK_LIMIT, len(text))])
+        # Resumed mid-event with exactly that left: one last chunk, not two.
+        outbox = [{"event_id": "big", "text": text, "sent": 1}]
+        sent: list[str] = []
+        state = {**engine.empty_state(), "outbox": outbox}
+        store = engine.StateStore(self.h.state)
+        self.assertTrue(engine.drain(store, state, lambda text, _id: sent.append(text) or True))
+        self.assertEqual(sent, [f"(2/2) {'a' * engine.CHUNK_LIMIT}"])
+
+    def test_pieces_join_back_to_the_text(self) -> None:
+        for text in (
+            "\n\n".join(f"event {i}\n" + "w" * (i * 131 % 3000) for i in range(40)),
+            "\n" * 5000,
+            "v" * 10000 + "\n\n" + "u" * 4100,
+            "t" * 500 + "\n",
+        ):
+            pieces = engine.chunks(text, 500)
+            self.assertEqual(sum(consumed for _, consumed in pieces), len(text))
+            at, joined = 0, ""
+            for piece, consumed in pieces:
+                self.assertLessEqual(len(piece), 500)
+                self.assertEqual(text[at:at + len(piece)], piece)
+                joined += text[at:at + consumed]
+                at += consumed
+            self.assertEqual(joined, text)
+
+    def test_a_digest_with_blank_lines_arrives_whole(self) -> None:
+        event = "\n\n".join(f"event {i}: " + "q" * 700 for i in range(12))
+        outbox = [{"event_id": "big", "text": event}]
+        sent: list[str] = []
+        state = {**engine.empty_state(), "outbox": outbox}
+        store = engine.StateStore(self.h.state)
+        self.assertTrue(engine.drain(store, state, lambda text, _id: sent.append(text) or True))
+        body = "\n".join(text.split(" ", 1)[1] for text in sent)
+        self.assertEqual(body, event, "nothing repeated, nothing lost")
+
+    def test_folding_keeps_the_progress(self) -> None:
+        outbox = [{"event_id": "big", "text": "rest", "sent": 3}]
+        for i in range(engine.OUTBOX_LIMIT):
+            outbox = engine.enqueue(outbox, {"event_id": f"e{i}", "text": f"event {i}"})
+        self.assertEqual(outbox[0]["sent"], 3)
+        self.assertTrue(outbox[0]["text"].startswith("rest\n\nevent 0"))
+
+
+class Crash(BaseException):
+    """Stands in for the process dying at an injected point."""
+
+
+class StateJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        self.h = Harness()
+        self.journal = Path(self.h.state + ".journal")
+
+    def journal_size(self) -> int:
+        return self.journal.stat().st_size if self.journal.exists() else 0
+
+    def backdate(self) -> float:
+        os_time = 1_700_000_000
+        engine.os.utime(self.h.state, (os_time, os_time))
+        return os_time
+
+    def test_quiet_cycle_writes_nothing_but_still_stamps_the_heartbeat(self) -> None:
+        self.h.run()
+        snapshot = Path(self.h.state).read_bytes()
+        before = self.backdate()
+        self.h.run()
+        self.assertEqual(self.journal_size(), 0, "nothing changed, nothing appended")
+        self.assertEqual(Path(self.h.state).read_bytes(), snapshot, "snapshot not rewritten")
+        self.assertGreater(Path(self.h.state).stat().st_mtime, before, "heartbeat stamp moved")
+
+    def test_a_steady_outage_is_a_no_op_for_the_store(self) -> None:
+        self.h.problems = [PROBLEM]
+        for _ in range(3):
+            self.h.run()
+        size = self.journal_size()
+        self.h.run()
+        self.h.run()
+        self.assertEqual(self.journal_size(), size)
+
+    def test_transitions_append_records_without_rewriting_the_snapshot(self) -> None:
+        self.h.run()
+        snapshot = Path(self.h.state).read_bytes()
+        self.h.problems = [PROBLEM]
+        self.h.run()
+        self.h.run()
+        ops = [json.loads(line)["op"] for line in self.journal.read_text().splitlines()]
+        self.assertEqual(ops, ["advance", "stage", "commit"])
+        self.assertEqual(Path(self.h.state).read_bytes(), snapshot)
+        self.assertTrue(self.h.stored()["seen"]["hsb1:api"]["alerted"])
+
+    def test_torn_tail_is_discarded_and_cut_before_the_next_append(self) -> None:
+        self.h.problems = [PROBLEM]
+        self.h.run()
+        with self.journal.open("ab") as handle:
+            handle.write(b'{"seq":99,"op":"stage","patch":{"seen":')
+        self.assertEqual(self.h.stored()["seen"]["hsb1:api"]["count"], 1, "torn record ignored")
+        self.h.run()
+        self.assertEqual(len(self.h.sent), 1)
+        self.assertTrue(self.h.stored()["seen"]["hsb1:api"]["alerted"], "later records replay")
+
+    def test_crash_mid_append_loses_nothing_and_sends_once(self) -> None:
+        self.h.problems = [PROBLEM]
+        self.h.run()
+        real_write = engine.os.write
+
+        def torn(descriptor: int, data: bytes) -> int:
+            real_write(descriptor, data[: len(data) // 2])
+            raise Crash
+
+        with mock.patch.object(engine.os, "write", torn), self.assertRaises(Crash):
+            self.h.run()  # dies while staging the announcement
+        self.assertEqual(self.h.sent, [])
+        self.h.run()
+        self.h.run()
+        self.assertEqual(len(self.h.sent), 1, "announced exactly once after the crash")
+
+    def test_crash_between_snapshot_and_truncate_replays_nothing_twice(self) -> None:
+        with mock.patch.object(engine, "COMPACT_RECORDS", 3):
+            self.h.problems = [PROBLEM]
+            self.h.run()
+            self.h.run()
+            expected = self.h.stored()
+            with mock.patch.object(engine.os, "truncate", side_effect=Crash):
+                self.h.problems = []
+                with self.assertRaises(Crash):
+                    self.h.run()  # the clear's stage record triggers compaction
+            state = self.h.stored()
+            self.assertEqual(len(state["outbox"]), 1, "the staged clear survived")
+            self.assertNotEqual(state, expected)
+            self.h.run()
+        self.assertEqual(len(self.h.sent), 2)
+        self.assertEqual(self.h.stored()["outbox"], [])
+        self.h.run()
+        self.assertEqual(len(self.h.sent), 2, "no record replayed into a second send")
+
+    def test_crash_inside_the_snapshot_write_keeps_the_journal_authoritative(self) -> None:
+        with mock.patch.object(engine, "COMPACT_RECORDS", 3):
+            self.h.problems = [PROBLEM]
+            self.h.run()
+            self.h.run()
+            expected = self.h.stored()
+            with mock.patch.object(engine.os, "replace", side_effect=Crash), self.assertRaises(Crash):
+                self.h.problems = []
+                self.h.run()
+            self.assertEqual(self.h.stored(), expected, "old snapshot + journal, intact")
+            self.h.run()
+        self.assertEqual(len(self.h.sent), 2)
+
+    def test_compaction_folds_the_journal_into_the_snapshot(self) -> None:
+        with mock.patch.object(engine, "COMPACT_RECORDS", 3):
+            self.h.problems = [PROBLEM]
+            for _ in range(3):
+                self.h.run()
+            self.h.problems = []
+            self.h.run()
+        snapshot = json.loads(Path(self.h.state).read_text())
+        self.assertGreater(snapshot["seq"], 0)
+        records = [json.loads(line) for line in self.journal.read_text().splitlines()]
+        self.assertLess(len(records), 3, "the journal was truncated at compaction")
+        self.assertTrue(all(r["seq"] > snapshot["seq"] for r in records))
+        self.assertEqual(self.h.stored()["seen"], {})
+
+
 class StateHandling(unittest.TestCase):
     def setUp(self) -> None:
         self.h = Harness()
@@ -172,11 +519,924 @@ class StateHandling(unittest.TestCase):
         self.h.problems = [PROBLEM]
         self.h.run()
         self.h.run()
+        journal = Path(self.h.state + ".journal")
         body = Path(self.h.state).read_text().lower()
+        body += journal.read_text().lower() if journal.exists() else ""
         for forbidden in ("bearer", "token", "telegram", "chat_id"):
             self.assertNotIn(forbidden, body)
 
 
+class ParallelChecks(unittest.TestCase):
+    """Named checks run side by side, each against its own deadline."""
+
+    @staticmethod
+    def sleeper(seconds: float, problems: list[engine.Problem] | None = None):
+        def run() -> list[engine.Problem]:
+            time.sleep(seconds)
+            return list(problems or [])
+
+        return run
+
+    def test_slow_checks_cost_the_slowest_not_the_sum(self) -> None:
+        checks = [engine.Check(f"c{i}", self.sleeper(0.3)) for i in range(5)]
+        began = time.monotonic()
+        engine.run_checks(checks)
+        self.assertLess(time.monotonic() - began, 1.0, "five 0.3 s checks must not run in series")
+
+    def test_overrun_is_its_own_unknown_problem_and_blocks_nothing(self) -> None:
+        release = threading.Event()
+        wedged = engine.Check("wedged", lambda: release.wait(5) and [], deadline=0.2)
+        fine = engine.Check("fine", self.sleeper(0.05, [PROBLEM]))
+        began = time.monotonic()
+        outcomes = engine.run_checks([wedged, fine])
+        release.set()
+        self.assertLess(time.monotonic() - began, 1.0)
+        self.assertEqual([o.status for o in outcomes], ["timeout", "problems"])
+        self.assertEqual(outcomes[0].problems[0].key, "check:wedged")
+        self.assertIn("unknown", outcomes[0].problems[0].text)
+        self.assertEqual(outcomes[1].problems, [PROBLEM])
+
+    def test_cycle_budget_caps_checks_that_never_started(self) -> None:
+        release = threading.Event()
+        blocker = engine.Check("blocker", lambda: release.wait(5) and [], deadline=10)
+        queued = engine.Check("queued", self.sleeper(0))
+        outcomes = engine.run_checks([blocker, queued], budget=0.3, pool=engine.WorkerPool(1))
+        release.set()
+        self.assertEqual([o.status for o in outcomes], ["timeout", "timeout"])
+        self.assertIn("never started", outcomes[1].problems[0].text)
+
+    def test_abandoned_worker_is_replaced_so_the_queue_still_drains(self) -> None:
+        release = threading.Event()
+        wedged = engine.Check("wedged", lambda: release.wait(5) and [], deadline=0.2)
+        queued = engine.Check("queued", self.sleeper(0, [PROBLEM]))
+        outcomes = engine.run_checks([wedged, queued], pool=engine.WorkerPool(1))
+        release.set()
+        self.assertEqual([o.status for o in outcomes], ["timeout", "problems"])
+
+    def test_crashing_check_is_a_problem_not_a_crash(self) -> None:
+        def boom() -> list[engine.Problem]:
+            raise RuntimeError("bad parse")
+
+        outcomes = engine.run_checks([engine.Check("boom", boom)])
+        self.assertEqual(outcomes[0].status, "error")
+        self.assertIn("RuntimeError", outcomes[0].problems[0].text)
+
+    def test_run_cycle_accepts_named_checks(self) -> None:
+        h = Harness()
+        checks = [engine.Check("a", lambda: [PROBLEM]), engine.Check("b", lambda: [])]
+        for _ in range(engine.CONFIRM_RUNS):
+            code = engine.run_cycle(h.state, h.clock, checks, h.render, h.send)
+        self.assertEqual(code, engine.EXIT_PROBLEMS)
+        self.assertEqual(len(h.sent), 1)
+
+
+class FastConfirm(unittest.TestCase):
+    """A first sighting is re-probed in the same cycle; only a repeat pages."""
+
+    def setUp(self) -> None:
+        self.h = Harness()
+        self.calls = {"flaky": 0, "steady": 0}
+        self.answers: list[list[engine.Problem]] = []
+
+    def flaky(self) -> list[engine.Problem]:
+        self.calls["flaky"] += 1
+        return self.answers.pop(0)
+
+    def steady(self) -> list[engine.Problem]:
+        self.calls["steady"] += 1
+        return []
+
+    def cycle(self, **options) -> int:
+        checks = [engine.Check("flaky", self.flaky), engine.Check("steady", self.steady)]
+        options.setdefault("confirm_after", 0.01)
+        return engine.run_cycle(self.h.state, self.h.clock, checks, self.h.render, self.h.send, **options)
+
+    def test_a_repeat_inside_the_cycle_pages_at_once(self) -> None:
+        self.answers = [[PROBLEM], [PROBLEM]]
+        self.cycle()
+        self.assertEqual(len(self.h.sent), 1, "confirmed within one cycle")
+        self.assertEqual(self.calls, {"flaky": 2, "steady": 1}, "only the new sighting is re-run")
+
+    def test_a_blip_gone_by_the_reprobe_never_pages(self) -> None:
+        # The 2026-07-30 shape: tailscaled restarting, every house briefly away.
+        self.answers = [[PROBLEM], []]
+        self.assertEqual(self.cycle(), engine.EXIT_CLEAN)
+        self.answers = [[]]
+        self.cycle()
+        self.assertEqual(self.h.sent, [])
+        self.assertEqual(self.h.stored()["seen"], {})
+
+    def test_known_problems_are_not_reprobed(self) -> None:
+        self.answers = [[PROBLEM], [PROBLEM], [PROBLEM]]
+        self.cycle()
+        self.cycle()
+        self.assertEqual(self.calls["flaky"], 3)
+        self.assertEqual(len(self.h.sent), 1)
+
+    def test_no_budget_for_the_reprobe_falls_back_to_the_next_cycle(self) -> None:
+        self.answers = [[PROBLEM], [PROBLEM]]
+        self.cycle(confirm_after=5, budget=1)
+        self.assertEqual(self.h.sent, [])
+        self.assertEqual(self.calls["flaky"], 1)
+        self.cycle(confirm_after=5, budget=1)
+        self.assertEqual(len(self.h.sent), 1, "ordinary two-run confirmation still works")
+
+    def test_the_default_budget_leaves_no_room_for_the_default_settle(self) -> None:
+        # Only pollers that raise their budget (ops-alerts, tailnet-watch) fast-confirm.
+        self.answers = [[PROBLEM], [PROBLEM]]
+        began = time.monotonic()
+        self.cycle(confirm_after=engine.FAST_CONFIRM_SECONDS)
+        self.assertLess(time.monotonic() - began, 5, "skipped, not waited out")
+        self.assertEqual((self.h.sent, self.calls["flaky"]), ([], 1))
+
+    def test_a_stop_cuts_the_settle_short(self) -> None:
+        stop = threading.Event()
+        threading.Timer(0.05, stop.set).start()
+        self.answers = [[PROBLEM], [PROBLEM]]
+        began = time.monotonic()
+        self.cycle(confirm_after=60, budget=120, stop=stop)
+        self.assertLess(time.monotonic() - began, 5, "SIGTERM does not wait out the settle")
+        self.assertEqual((self.h.sent, self.calls["flaky"]), ([], 1), "no re-probe on the way out")
+        self.assertIn(PROBLEM.key, self.h.stored()["seen"], "the next start confirms it")
+
+    def test_off_by_default(self) -> None:
+        self.answers = [[PROBLEM]]
+        self.cycle(confirm_after=None)
+        self.assertEqual((self.h.sent, self.calls["flaky"]), ([], 1))
+
+
+class Cadence(unittest.TestCase):
+    """A check with `every` runs on its own schedule; between runs its answer is cached."""
+
+    def setUp(self) -> None:
+        self.h = Harness()
+        self.calls = 0
+        self.answers: list[object] = []
+
+    def slow(self) -> list[engine.Problem]:
+        self.calls += 1
+        answer = self.answers.pop(0)
+        if isinstance(answer, BaseException):
+            raise answer
+        return answer
+
+    def cycle(self, advance: float = 300) -> int:
+        self.h.clock += advance
+        checks = [engine.Check("budget", self.slow, every=3600)]
+        return engine.run_cycle(self.h.state, self.h.clock, checks, self.h.render, self.h.send)
+
+    def test_not_rerun_before_it_is_due(self) -> None:
+        self.answers = [[], []]
+        self.cycle()
+        self.cycle()
+        self.cycle()
+        self.assertEqual(self.calls, 1)
+        self.cycle(advance=3600)
+        self.assertEqual(self.calls, 2)
+
+    def test_cached_answer_never_confirms_a_first_sighting(self) -> None:
+        self.answers = [[PROBLEM], [PROBLEM]]
+        self.cycle()
+        self.cycle()
+        self.cycle()
+        self.assertEqual(self.h.sent, [], "a cached repeat is not a second observation")
+        self.cycle(advance=3600)
+        self.assertEqual(len(self.h.sent), 1, "the next real run confirms it")
+
+    def test_cached_answer_keeps_an_alert_standing(self) -> None:
+        self.answers = [[PROBLEM], [PROBLEM], []]
+        self.cycle()
+        self.cycle(advance=3600)
+        self.cycle()
+        self.cycle()
+        self.assertEqual(len(self.h.sent), 1, "neither cleared nor re-announced while cached")
+        self.assertIn(PROBLEM.key, self.h.stored()["seen"])
+        self.cycle(advance=3600)
+        self.assertEqual(len(self.h.sent), 2)
+        self.assertIn("CLEARED", self.h.sent[-1][0])
+
+    def test_failures_are_not_cached(self) -> None:
+        self.answers = [RuntimeError("boom"), []]
+        self.cycle()
+        self.assertNotIn("budget", self.h.stored().get("checks", {}))
+        self.cycle()
+        self.assertEqual(self.calls, 2, "an unknown result is retried next cycle")
+
+    def test_cache_survives_a_restart(self) -> None:
+        self.answers = [[]]
+        self.cycle()
+        store = engine.StateStore(self.h.state)
+        self.assertEqual(store.state["checks"]["budget"]["at"], self.h.clock)
+        self.cycle()
+        self.assertEqual(self.calls, 1)
+
+
+class WatchedFiles(unittest.TestCase):
+    """A check watching a file is cached until the file changes; inotify wakes serve()."""
+
+    def setUp(self) -> None:
+        self.h = Harness()
+        self.store = self.h.dir / "store.json"
+        self.store.write_text("{}")
+        self.calls = 0
+        self.during = None  # called inside the check, to race it
+
+    def read(self) -> list[engine.Problem]:
+        self.calls += 1
+        if self.during:
+            self.during()
+        return []
+
+    def cycle(self, advance: float = 300, every: float = 0) -> int:
+        self.h.clock += advance
+        checks = [engine.Check("store", self.read, watch=(str(self.store),), every=every)]
+        return engine.run_cycle(self.h.state, self.h.clock, checks, self.h.render, self.h.send)
+
+    def rewrite(self) -> None:
+        # What pharosd does: a new file renamed over the old one.
+        fresh = self.store.with_suffix(".tmp")
+        fresh.write_text('{"hosts": []}')
+        fresh.replace(self.store)
+
+    def test_unchanged_file_is_not_reread(self) -> None:
+        self.cycle()
+        self.cycle()
+        self.cycle()
+        self.assertEqual(self.calls, 1)
+        self.rewrite()
+        self.cycle()
+        self.assertEqual(self.calls, 2)
+
+    def test_every_is_the_safety_net(self) -> None:
+        self.cycle(every=3600)
+        self.cycle(every=3600)
+        self.assertEqual(self.calls, 1)
+        self.cycle(advance=3600, every=3600)
+        self.assertEqual(self.calls, 2, "due by the clock although the file is unchanged")
+
+    def test_a_rewrite_during_the_run_is_not_missed(self) -> None:
+        self.during = self.rewrite
+        self.cycle()
+        self.during = None
+        self.cycle()
+        self.assertEqual(self.calls, 2, "the cached signature is the one taken before the run")
+
+    def test_a_missing_file_appearing_makes_it_due(self) -> None:
+        self.store.unlink()
+        self.cycle()
+        self.cycle()
+        self.assertEqual(self.calls, 1)
+        self.store.write_text("{}")
+        self.cycle()
+        self.assertEqual(self.calls, 2)
+
+    def test_watch_needs_paths(self) -> None:
+        self.assertIsNone(engine.watch([engine.Check("plain", list)], threading.Event()))
+
+    def test_watcher_ignores_other_files_in_the_directory(self) -> None:
+        wake = threading.Event()
+        if engine.watch([engine.Check("store", list, watch=(str(self.store),))], wake) is None:
+            self.skipTest("inotify unavailable here")
+        (self.store.parent / "unrelated").write_text("x")
+        self.assertFalse(wake.wait(0.3))
+        self.rewrite()
+        self.assertTrue(wake.wait(5), "an atomic rename into place is seen")
+
+    def test_a_rewrite_starts_an_early_cycle(self) -> None:
+        wake = threading.Event()
+        if engine.watch([engine.Check("store", list, watch=(str(self.store),))], wake) is None:
+            self.skipTest("inotify unavailable here")
+        stop = threading.Event()
+        runs: list[float] = []
+
+        def cycle() -> int:
+            runs.append(time.monotonic())
+            if len(runs) == 1:
+                self.rewrite()
+            else:
+                stop.set()
+            return engine.EXIT_CLEAN
+
+        began = time.monotonic()
+        with mock.patch.object(engine, "WATCH_SETTLE_SECONDS", 0), contextlib.redirect_stdout(io.StringIO()) as out:
+            worker = threading.Thread(target=engine.serve, args=(cycle, 3600), kwargs={"stop": stop, "wake": wake})
+            worker.start()
+            worker.join(10)
+        stop.set()
+        self.assertEqual(len(runs), 2)
+        self.assertLess(runs[1] - began, 10, "not at the next hourly slot")
+        self.assertIn("watched change seen", out.getvalue())
+
+
+class CircuitBreaker(unittest.TestCase):
+    """Repeated expensive failures open a breaker; a cheap answer closes it."""
+
+    def setUp(self) -> None:
+        self.h = Harness()
+        self.calls = 0
+        self.down = True
+        self.stall = 0.0
+        self.deadline = engine.CHECK_DEADLINE_SECONDS
+        # Every failure in these tests counts as slow unless a test says otherwise.
+        patcher = mock.patch.object(engine, "BREAKER_SLOW_SECONDS", 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def dead(self) -> list[engine.Problem]:
+        self.calls += 1
+        time.sleep(self.stall)
+        return [PROBLEM] if self.down else []
+
+    def cycle(self) -> int:
+        self.h.clock += 900
+        checks = [engine.Check("ha:hsb1", self.dead, deadline=self.deadline)]
+        return engine.run_cycle(self.h.state, self.h.clock, checks, self.h.render, self.h.send)
+
+    def test_opens_after_repeated_failures_and_probes_every_few_cycles(self) -> None:
+        for _ in range(engine.BREAKER_FAILURES):
+            self.cycle()
+        self.assertEqual(self.calls, engine.BREAKER_FAILURES)
+        for _ in range(engine.BREAKER_PROBE_CYCLES - 1):
+            self.cycle()
+        self.assertEqual(self.calls, engine.BREAKER_FAILURES, "held, not probed")
+        self.cycle()
+        self.assertEqual(self.calls, engine.BREAKER_FAILURES + 1, "the periodic probe")
+
+    def test_alert_stays_announced_while_held(self) -> None:
+        for _ in range(engine.BREAKER_FAILURES + engine.BREAKER_PROBE_CYCLES - 1):
+            self.assertEqual(self.cycle(), engine.EXIT_PROBLEMS)
+        self.assertEqual(len(self.h.sent), 1, "announced once, never cleared")
+        self.assertTrue(self.h.stored()["seen"][PROBLEM.key]["alerted"])
+
+    def test_a_cheap_answer_closes_the_breaker(self) -> None:
+        for _ in range(engine.BREAKER_FAILURES + engine.BREAKER_PROBE_CYCLES - 1):
+            self.cycle()
+        self.down = False
+        self.cycle()
+        self.assertEqual(self.h.stored()["breakers"], {})
+        self.assertIn("CLEARED", self.h.sent[-1][0])
+        before = self.calls
+        self.cycle()
+        self.assertEqual(self.calls, before + 1, "back on every cycle")
+
+    def test_cheap_failures_never_trip_it(self) -> None:
+        with mock.patch.object(engine, "BREAKER_SLOW_SECONDS", 60.0):
+            for _ in range(engine.BREAKER_FAILURES + 2):
+                self.cycle()
+        self.assertEqual(self.calls, engine.BREAKER_FAILURES + 2)
+        self.assertNotIn("ha:hsb1", self.h.stored().get("breakers", {}))
+
+    def test_timeouts_trip_it(self) -> None:
+        self.deadline, self.stall, self.down = 0.05, 0.2, False
+        with mock.patch.object(engine, "BREAKER_SLOW_SECONDS", 60.0):
+            for _ in range(engine.BREAKER_FAILURES + 1):
+                self.cycle()
+        self.assertEqual(self.calls, engine.BREAKER_FAILURES)
+        self.assertEqual(self.h.stored()["breakers"]["ha:hsb1"]["failures"], engine.BREAKER_FAILURES)
+
+
+class Metrics(unittest.TestCase):
+    """Every cycle leaves a parseable metrics.prom beside the state file."""
+
+    def setUp(self) -> None:
+        self.h = Harness()
+        self.path = self.h.dir / engine.METRICS_NAME
+
+    def cycle(self, *checks: engine.Check) -> int:
+        self.h.clock += 900
+        return engine.run_cycle(self.h.state, self.h.clock, list(checks), self.h.render, self.h.send)
+
+    def samples(self) -> dict[str, float]:
+        text = self.path.read_text()
+        self.assertTrue(text.endswith("# EOF\n"))
+        found = {}
+        for line in text.splitlines():
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                found[name] = float(value)
+        return found
+
+    def test_per_check_latency_and_outcome(self) -> None:
+        self.cycle(
+            engine.Check("slow", lambda: time.sleep(0.05) or []),
+            engine.Check("broken", lambda: [PROBLEM]),
+        )
+        found = self.samples()
+        self.assertGreaterEqual(found['fleet_alerts_check_duration_seconds{check="slow"}'], 0.05)
+        self.assertEqual(found['fleet_alerts_check_status{check="broken",status="problems"}'], 1)
+        self.assertEqual(found['fleet_alerts_check_outcomes{status="ok"}'], 1)
+        self.assertEqual(found["fleet_alerts_confirm_backlog"], 1)
+        self.assertGreaterEqual(found["fleet_alerts_cycle_duration_seconds"], 0.05)
+
+    def test_delivery_and_outbox_age(self) -> None:
+        self.h.deliver = False
+        broken = engine.Check("broken", lambda: [PROBLEM])
+        self.cycle(broken)
+        self.cycle(broken)
+        self.cycle(broken)
+        found = self.samples()
+        self.assertEqual(found['fleet_alerts_delivery_attempts{result="failed"}'], 1)
+        self.assertEqual(found["fleet_alerts_outbox_events"], 1)
+        self.assertEqual(found["fleet_alerts_outbox_oldest_age_seconds"], 900)
+        self.h.deliver = True
+        self.cycle(broken)
+        found = self.samples()
+        self.assertEqual(found['fleet_alerts_delivery_attempts{result="sent"}'], 1)
+        self.assertEqual(found["fleet_alerts_outbox_oldest_age_seconds"], 0)
+
+    def test_labels_are_escaped(self) -> None:
+        self.cycle(engine.Check('ha:"odd"\\name', lambda: []))
+        self.assertIn('check="ha:\\"odd\\"\\\\name"', self.path.read_text())
+
+    def test_an_unwritable_metrics_file_never_fails_the_cycle(self) -> None:
+        self.path.mkdir()  # os.replace onto a directory fails
+        self.assertEqual(self.cycle(engine.Check("fine", lambda: [])), engine.EXIT_CLEAN)
+        self.assertEqual([p.name for p in self.h.dir.glob(".metrics-*")], [], "no temporary left behind")
+
+
+class History(unittest.TestCase):
+    """One JSONL record per cycle, rotated on size, summarised by `stats`."""
+
+    def setUp(self) -> None:
+        self.h = Harness()
+        self.down = False
+        self.check = engine.Check("ha:hsb1", lambda: [PROBLEM] if self.down else [])
+
+    def cycle(self) -> None:
+        self.h.clock += 900
+        engine.run_cycle(self.h.state, self.h.clock, [self.check], self.h.render, self.h.send)
+
+    def records(self) -> list[dict]:
+        return [json.loads(line) for line in (self.h.dir / engine.HISTORY_NAME).read_text().splitlines()]
+
+    def stats(self, *extra: str) -> str:
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), mock.patch.object(engine.time, "time", return_value=self.h.clock):
+            engine.main(["stats", str(self.h.dir), *extra])
+        return out.getvalue()
+
+    def test_one_record_per_cycle(self) -> None:
+        self.down = True
+        self.cycle()
+        self.cycle()
+        first, second = self.records()
+        self.assertEqual(first["problems"], [PROBLEM.key])
+        self.assertEqual(first["checks"]["ha:hsb1"][1], "problems")
+        self.assertEqual(second["announced"], [PROBLEM.key])
+        self.assertEqual((second["sent"], second["failed"]), (1, 0))
+
+    def test_rotation_bounds_the_files(self) -> None:
+        with mock.patch.object(engine, "HISTORY_BYTES", 400), mock.patch.object(engine, "HISTORY_KEEP", 2):
+            for _ in range(20):
+                self.cycle()
+        names = sorted(p.name for p in self.h.dir.glob(engine.HISTORY_NAME + "*"))
+        self.assertEqual(names, [engine.HISTORY_NAME, engine.HISTORY_NAME + ".1", engine.HISTORY_NAME + ".2"])
+        self.assertTrue(all(p.stat().st_size <= 400 for p in self.h.dir.glob(engine.HISTORY_NAME + "*")))
+
+    def test_stats_reads_across_rotations(self) -> None:
+        pattern = [True, False, True, True, False, False]  # a blip, then a real outage
+        with mock.patch.object(engine, "HISTORY_BYTES", 600):
+            for down in pattern:
+                self.down = down
+                self.cycle()
+        report = self.stats()
+        self.assertIn(f"{len(pattern)} cycle(s)", report)
+        row = next(line for line in report.splitlines() if line.startswith(PROBLEM.key))
+        self.assertEqual(row.split()[1:], ["1", "1"], "announced once, one blip")
+        self.assertIn("delivery  2/2 sent (100.0 %)", report)
+
+    def test_stats_skips_records_whose_probes_do_not_unpack(self) -> None:
+        for _ in range(2):
+            self.cycle()
+        with (self.h.dir / engine.HISTORY_NAME).open("a", encoding="utf-8") as handle:
+            for checks in ({"ha:hsb1": [0.1]}, {"ha:hsb1": None}, {"ha:hsb1": ["slow", "ok"]}, ["ha:hsb1"]):
+                handle.write(json.dumps({"at": self.h.clock, "checks": checks}) + "\n")
+        self.assertIn("2 cycle(s)", self.stats(), "skipped like a torn line, not counted")
+
+    def test_stats_window(self) -> None:
+        for _ in range(8):
+            self.cycle()
+        self.assertIn("4 cycle(s)", self.stats("--days", str(3.5 * 900 / 86400)))
+
+    def fast_cycle(self, *answers: list) -> None:
+        """One cycle with fast confirm; `answers` are the probes' results in turn."""
+        queue = list(answers)
+
+        def probe() -> list[engine.Problem]:
+            time.sleep(0.02 if len(queue) == len(answers) else 0)  # the first probe is the slow one
+            return queue.pop(0)
+
+        self.h.clock += 900
+        check = engine.Check("ha:hsb1", probe)
+        engine.run_cycle(self.h.state, self.h.clock, [check], self.h.render, self.h.send, confirm_after=0.01)
+
+    def test_a_blip_fast_confirm_swallowed_is_recorded(self) -> None:
+        self.fast_cycle([PROBLEM], [])
+        (record,) = self.records()
+        self.assertEqual(record["problems"], [PROBLEM.key], "the first probe saw it")
+        self.assertEqual(record["checks"]["ha:hsb1"][1], "problems")
+        self.assertGreaterEqual(record["checks"]["ha:hsb1"][0], 0.02, "the first probe's latency")
+        self.assertEqual(record["confirm"], {"checks": {"ha:hsb1": mock.ANY}, "problems": []})
+        self.assertEqual(record["confirm"]["checks"]["ha:hsb1"][1], "ok")
+        self.fast_cycle([])
+        row = next(line for line in self.stats().splitlines() if line.startswith(PROBLEM.key))
+        self.assertEqual(row.split()[1:], ["0", "1"], "never announced, one blip")
+
+    def test_a_confirmed_outage_is_not_a_blip(self) -> None:
+        self.fast_cycle([PROBLEM], [PROBLEM])  # both probes: announced in this cycle
+        self.fast_cycle([])
+        self.assertNotIn("confirm", self.records()[1], "no re-probe, no confirm field")
+        row = next(line for line in self.stats().splitlines() if line.startswith(PROBLEM.key))
+        self.assertEqual(row.split()[1:], ["1", "0"])
+        check_row = next(line for line in self.stats().splitlines() if line.startswith("ha:hsb1 "))
+        self.assertEqual(check_row.split()[1], "3", "both probes of the first cycle count as runs")
+
+    def test_histogram_quantiles_are_within_a_bucket(self) -> None:
+        histogram = engine.Histogram()
+        for ms in range(1, 1001):
+            histogram.add(ms / 1000)
+        for q, exact in ((0.5, 0.5), (0.95, 0.95), (0.99, 0.99)):
+            self.assertAlmostEqual(histogram.quantile(q), exact, delta=exact * 0.13)
+
+
+class ResidentMode(unittest.TestCase):
+    """serve() runs the same cycle on its own schedule and survives a bad cycle."""
+
+    def test_serve_repeats_until_stopped(self) -> None:
+        stop = threading.Event()
+        runs: list[float] = []
+
+        def cycle() -> int:
+            runs.append(time.monotonic())
+            if len(runs) == 3:
+                stop.set()
+            return engine.EXIT_CLEAN
+
+        self.assertEqual(engine.serve(cycle, 0.05, stop=stop), engine.EXIT_CLEAN)
+        self.assertEqual(len(runs), 3)
+        self.assertGreaterEqual(runs[2] - runs[0], 0.09, "cycles must keep to the interval")
+
+    def test_cycles_reuse_the_worker_threads(self) -> None:
+        h = Harness()
+        checks = [engine.Check(f"c{i}", lambda: []) for i in range(5)]
+        engine.run_cycle(h.state, h.clock, checks, h.render, h.send)
+        before = threading.active_count()
+        for n in range(10):
+            engine.run_cycle(h.state, h.clock + n, checks, h.render, h.send)
+        self.assertLessEqual(threading.active_count(), before, "no thread leak per cycle")
+
+    def test_a_crashing_cycle_does_not_end_the_service(self) -> None:
+        stop = threading.Event()
+        runs: list[int] = []
+
+        def cycle() -> int:
+            runs.append(1)
+            if len(runs) == 1:
+                raise OSError("disk hiccup")
+            stop.set()
+            return engine.EXIT_CLEAN
+
+        engine.serve(cycle, 0.01, stop=stop)
+        self.assertEqual(len(runs), 2)
+
+    def test_resident_cycles_keep_the_write_ahead_contract(self) -> None:
+        h = Harness()
+        h.problems = [PROBLEM]
+        h.deliver = False
+        stop = threading.Event()
+        codes: list[int] = []
+
+        def cycle() -> int:
+            codes.append(h.run())
+            if len(codes) == 2:
+                stop.set()
+            return codes[-1]
+
+        engine.serve(cycle, 0.01, stop=stop)
+        self.assertEqual(codes, [engine.EXIT_PROBLEMS, engine.EXIT_UNDELIVERED])
+        self.assertEqual(len(h.stored()["outbox"]), 1)
+
+    def test_an_alert_stuck_for_an_interval_fails_the_process(self) -> None:
+        # Resident, the unit can only fail if the process exits; a retry at the
+        # next slot that fails too is where a timer run would have failed.
+        stop = threading.Event()
+        guard = threading.Timer(5, stop.set)  # a failing test must still end
+        guard.start()
+        self.addCleanup(guard.cancel)
+        runs: list[int] = []
+        code = engine.serve(lambda: runs.append(1) or engine.EXIT_UNDELIVERED, 0.05, stop=stop)
+        self.assertEqual(code, engine.EXIT_UNDELIVERED)
+        self.assertFalse(stop.is_set(), "it gave up by itself")
+        self.assertGreaterEqual(len(runs), 2, "one retry first")
+
+    def test_a_delivery_in_between_resets_the_clock(self) -> None:
+        stop = threading.Event()
+        codes = [engine.EXIT_UNDELIVERED, engine.EXIT_PROBLEMS] * 3
+
+        def cycle() -> int:
+            if len(codes) == 1:
+                stop.set()
+            return codes.pop(0)
+
+        self.assertEqual(engine.serve(cycle, 0.05, stop=stop), engine.EXIT_CLEAN)
+
+    def test_a_stuck_callback_keeps_the_loop_running(self) -> None:
+        stop = threading.Event()
+        codes = [engine.EXIT_UNDELIVERED] * 3 + [engine.EXIT_CLEAN]
+        told: list[bool] = []
+
+        def cycle() -> int:
+            if len(codes) == 1:
+                stop.set()
+            return codes.pop(0)
+
+        self.assertEqual(engine.serve(cycle, 0.05, stop=stop, stuck=told.append), engine.EXIT_CLEAN)
+        self.assertEqual(told, [True, False])
+
+    def test_without_the_environment_it_runs_exactly_once(self) -> None:
+        runs: list[int] = []
+        previous = engine.os.environ.pop(engine.SERVE_INTERVAL_ENV, None)
+        try:
+            code = engine.run_or_serve(lambda: runs.append(1) or engine.EXIT_PROBLEMS)
+        finally:
+            if previous is not None:
+                engine.os.environ[engine.SERVE_INTERVAL_ENV] = previous
+        self.assertEqual((code, runs), (engine.EXIT_PROBLEMS, [1]))
+
+    def test_push_sources_start_only_when_resident(self) -> None:
+        started: list[object] = []
+        with mock.patch.dict(engine.os.environ, {engine.SERVE_INTERVAL_ENV: ""}):
+            engine.run_or_serve(lambda: engine.EXIT_CLEAN, push=lambda wake: started.append(wake) or True)
+        self.assertEqual(started, [], "a timer run opens no listeners")
+        with mock.patch.dict(engine.os.environ, {engine.SERVE_INTERVAL_ENV: "900"}), mock.patch.object(
+            engine, "serve", return_value=engine.EXIT_CLEAN
+        ) as serve:
+            engine.run_or_serve(lambda: engine.EXIT_CLEAN, push=lambda wake: started.append(wake) or True)
+        (wake,) = started
+        self.assertIs(serve.call_args.kwargs["wake"], wake, "what the listener sets is what serve() waits on")
+
+
+class HostRunner(unittest.TestCase):
+    """host() runs several pollers in one process without letting one starve another."""
+
+    URL = "telegram://123456:" + "A" * 30 + "@telegram?chats=42"
+
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        self.env = self.dir / "watchtower.env"
+        self.env.write_text(f"WATCHTOWER_NOTIFICATION_URL={self.URL}\n")
+        self.stop = threading.Event()
+        self.runs: dict[str, int] = {}
+
+    def poller(self, name: str, check, env: Path | None = None) -> engine.Poller:
+        def counted() -> list[engine.Problem]:
+            self.runs[name] = self.runs.get(name, 0) + 1
+            return check()
+
+        return engine.Poller(
+            name,
+            str(self.dir / name / "state.json"),
+            [engine.Check(f"{name}:{i}", counted, deadline=0.2) for i in range(3)],
+            lambda a, c: "",
+            str(env or self.env),
+        )
+
+    def host(self, pollers, seconds: float) -> str:
+        out = io.StringIO()
+        timer = threading.Timer(seconds, self.stop.set)
+        timer.start()
+        with contextlib.redirect_stdout(out):
+            engine.host(pollers, stop=self.stop)
+        timer.cancel()
+        return out.getvalue()
+
+    def test_pollers_keep_their_own_state_and_interval(self) -> None:
+        self.host([(self.poller("fast", lambda: []), 0.05), (self.poller("slow", lambda: []), 10)], 0.5)
+        self.assertGreaterEqual(self.runs["fast"], 3 * 4, "several cycles of three checks")
+        self.assertEqual(self.runs["slow"], 3, "one cycle: the interval is its own")
+        self.assertTrue((self.dir / "fast" / "state.json").exists())
+        self.assertTrue((self.dir / "slow" / "state.json").exists())
+
+    def test_a_hanging_check_set_cannot_starve_another(self) -> None:
+        wedged = threading.Event()
+        self.addCleanup(wedged.set)
+        self.host(
+            [(self.poller("wedged", lambda: wedged.wait(5) and []), 0.05), (self.poller("healthy", lambda: []), 0.05)],
+            0.8,
+        )
+        self.assertGreaterEqual(self.runs["healthy"], 3 * 5)
+
+    def senders(self, deliver: dict[str, bool]):
+        """Stand in for Telegram: a sender per chat id, delivering or not."""
+        sent: dict[str, list[str]] = {}
+
+        def factory(url: str, client=None) -> engine.Sender:
+            chat = url.rsplit("=", 1)[1]
+            return lambda text, _event: sent.setdefault(chat, []).append(text) or deliver[chat]
+
+        return mock.patch.object(engine, "shoutrrr_telegram_sender", factory), sent
+
+    def seen(self, name: str) -> dict:
+        return engine.load_state(str(self.dir / name / "state.json"))["seen"]
+
+    def test_one_unusable_target_does_not_silence_the_rest(self) -> None:
+        missing = self.dir / "missing.env"
+        patch, sent = self.senders({"42": True})
+        with patch:
+            out = self.host(
+                [(self.poller("broken", lambda: [], missing), 0.05), (self.poller("fine", lambda: []), 0.05)], 0.3
+            )
+        self.assertNotIn("broken", self.runs)
+        self.assertGreater(self.runs["fine"], 0)
+        self.assertIn("broken: notification target missing", out)
+        # ... and it pages, through the poller that did start.
+        self.assertTrue(self.seen("fine")[f"{engine.HOST_CHECK}:broken"]["alerted"])
+        self.assertEqual(len(sent["42"]), 1)
+
+    def test_a_poller_with_stuck_alerts_is_paged_by_another(self) -> None:
+        jammed = self.dir / "jammed.env"
+        jammed.write_text(f"WATCHTOWER_NOTIFICATION_URL={self.URL.replace('=42', '=43')}\n")
+        patch, sent = self.senders({"42": True, "43": False})
+        failing = [engine.Problem("disk", "disk full")]
+        with patch:
+            self.host(
+                [(self.poller("fine", lambda: []), 0.05), (self.poller("jammed", lambda: failing, jammed), 0.05)], 0.8
+            )
+        self.assertIn("disk", self.seen("jammed"), "still judging, still retrying")
+        self.assertTrue(self.seen("fine")[f"{engine.HOST_CHECK}:jammed"]["alerted"])
+        self.assertEqual(len(sent["42"]), 1)
+
+    def test_a_pollers_push_source_wakes_its_own_lane(self) -> None:
+        woken: list[threading.Event] = []
+
+        def push(wake: threading.Event) -> bool:
+            woken.append(wake)
+            threading.Timer(0.2, wake.set).start()  # a listener seeing a change
+            return True
+
+        pushed = engine.Poller(**{**vars(self.poller("pushed", lambda: [])), "push": push})
+        with mock.patch.object(engine, "WATCH_SETTLE_SECONDS", 0):
+            out = self.host([(pushed, 10)], 0.6)
+        self.assertEqual(len(woken), 1)
+        self.assertEqual(self.runs["pushed"], 2 * 3, "the timed cycle and one woken early")
+        self.assertIn("running an early cycle", out)
+
+    def test_log_lines_carry_the_poller_name(self) -> None:
+        out = self.host([(self.poller("peer-watch", lambda: []), 10)], 0.3)
+        self.assertIn("[peer-watch] ok — 0 active problem(s)", out)
+
+    def test_runner_loads_each_check_file_as_its_own_poller(self) -> None:
+        source = (SCRIPT.parent / "host-runner.py").read_text()
+        entries = [{"name": "peer-watch", "checks": str(self.dir / "checks.py"), "interval": 600}]
+        (self.dir / "checks.py").write_text(
+            "import engine\n"
+            "def poller():\n"
+            f"    return engine.Poller('peer-watch', {str(self.dir / 's.json')!r}, [], None, {str(self.env)!r})\n"
+        )
+        runner = types.ModuleType("fleet_host_runner")
+        with mock.patch.dict(sys.modules, {"engine": engine}):
+            exec(compile(source.replace("@POLLERS_JSON@", json.dumps(entries)), "runner.py", "exec"), runner.__dict__)
+            with mock.patch.object(engine, "host", return_value=engine.EXIT_CLEAN) as host:
+                self.assertEqual(runner.main(), engine.EXIT_CLEAN)
+        (hosted, interval), = host.call_args.args[0]
+        self.assertEqual((hosted.name, interval), ("peer-watch", 600.0))
+
+
+class FakeTelegram:
+    """A local HTTPS stand-in for api.telegram.org that counts TCP connections."""
+
+    def __init__(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        cert, key = self.dir / "cert.pem", self.dir / "key.pem"
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+             "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+             "-keyout", str(key), "-out", str(cert)],
+            check=True, capture_output=True,
+        )
+        self.connections = 0
+        self.sockets: list = []
+        self.posts: list[str] = []
+        self.status = 200
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def setup(self) -> None:
+                fake.connections += 1
+                fake.sockets.append(self.request)
+                super().setup()
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                length = int(self.headers["Content-Length"])
+                fake.posts.append(self.rfile.read(length).decode())
+                body = b'{"ok":true}'
+                self.send_response(fake.status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server_side = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_side.load_cert_chain(cert, key)
+        self.server.socket = server_side.wrap_socket(self.server.socket, server_side=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.context = ssl.create_default_context(cafile=str(cert))
+
+    def client(self) -> engine.TelegramClient:
+        return engine.TelegramClient("localhost", self.server.server_address[1], self.context)
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@unittest.skipUnless(shutil.which("openssl"), "needs openssl to mint a test certificate")
+class PooledDelivery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.telegram = FakeTelegram()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.telegram.close()
+
+    def setUp(self) -> None:
+        self.telegram.connections = 0
+        self.telegram.sockets = []
+        self.telegram.posts = []
+        self.telegram.status = 200
+        self.client = self.telegram.client()
+
+    def test_recipients_and_retries_share_one_connection(self) -> None:
+        first = engine.telegram_sender("12345:token", "1", self.client)
+        second = engine.telegram_sender("12345:token", "2", self.client)
+        self.assertTrue(first("hello", "e1"))
+        self.assertTrue(second("hello", "e1"))
+        self.assertTrue(first("again", "e2"))
+        self.assertEqual(self.telegram.connections, 1, "one handshake for the whole cycle")
+        self.assertEqual([t.connection for t in self.client.timings], ["new", "reused", "reused"])
+        self.assertGreater(self.client.timings[0].tls, 0)
+        self.assertEqual(self.client.timings[1].connect, 0)
+
+    def test_prewarm_pays_the_handshake_before_the_send(self) -> None:
+        self.client.prewarm()
+        send = engine.telegram_sender("12345:token", "1", self.client)
+        self.assertTrue(send("hello", "e1"))
+        timing = self.client.timings[-1]
+        self.assertEqual(timing.connection, "prewarmed")
+        self.assertGreater(timing.connect + timing.tls, 0, "the warm-up cost is still reported")
+        self.assertEqual(self.telegram.connections, 1)
+
+    def test_a_connection_closed_by_the_server_is_replaced_once(self) -> None:
+        send = engine.telegram_sender("12345:token", "1", self.client)
+        self.assertTrue(send("hello", "e1"))
+        for sock in self.telegram.sockets:  # the server hangs up on an idle connection
+            sock.shutdown(2)
+        time.sleep(0.05)
+        self.assertTrue(send("again", "e2"))
+        self.assertEqual(len(self.telegram.posts), 2, "retried, and sent exactly once")
+
+    def test_the_log_reports_its_own_send_not_the_latest(self) -> None:
+        # Under host() one client serves several pollers: another send can append
+        # its timing between this one releasing the lock and logging.
+        client = self.client
+        post = client.post
+
+        def raced(*args, **kwargs):
+            timing = post(*args, **kwargs)
+            client.timings.append(engine.SendTiming("other", 0, 0, 9.0, "elsewhere", 500))
+            return timing
+
+        client.post = raced  # type: ignore[method-assign]
+        send = engine.telegram_sender("12345:token", "1", client)
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as out:
+            self.assertTrue(send("hello", "e1"))
+        self.assertIn("HTTP 200, new connection", out.getvalue())
+        self.assertNotIn("elsewhere", out.getvalue())
+
+    def test_http_error_is_a_failed_delivery(self) -> None:
+        self.telegram.status = 502
+        send = engine.telegram_sender("12345:token", "1", self.client)
+        self.assertFalse(send("hello", "e1"))
+        self.assertEqual(self.client.timings[-1].status, 502)
+
+    def test_run_cycle_prewarms_only_when_something_could_be_delivered(self) -> None:
+        h = Harness()
+        warmed: list[int] = []
+        sender = lambda text, identifier: h.send(text, identifier)  # noqa: E731
+        sender.prewarm = lambda: warmed.append(1)  # type: ignore[attr-defined]
+        engine.run_cycle(h.state, h.clock, lambda: [], h.render, sender)
+        self.assertEqual(warmed, [], "a quiet fleet never dials out")
+        engine.run_cycle(h.state, h.clock, lambda: [PROBLEM], h.render, sender)
+        engine.run_cycle(h.state, h.clock, lambda: [PROBLEM], h.render, sender)
+        self.assertEqual(warmed, [1], "warm once a sighting could turn into a page")
+
+
 class ShoutrrrTarget(unittest.TestCase):
     """csb1 reuses its existing WATCHTOWER_NOTIFICATION_URL — no new secret."""
 
@@ -4,12 +4,24 @@ Pins what pages and what does not: behind+old pages, behind+young+few does not,
 diverged/ahead pages as its own problem, current/no-evidence/non-nix/stale hosts
 are ignored, an unreadable store is one loud problem, and commit age comes from
 a stubbed git lookup (no network).
+
+Commit times are cached (CommitTimes), checked against a throwaway git repo:
+new revisions cost one `git cat-file --batch` together and nothing after that,
+also across a restart; a revision the checkout lacks is asked again only once
+the checkout moved; the cache is bounded; names like `main` never reach git.
+
+The commit graph (CommitGraph) counts "behind" and answers ancestry exactly as
+`git rev-list --count` does, across merges and a force-pushed main; it asks git
+only when origin/main moved, and fills in what a beacon leaves out.
 """
 
 from __future__ import annotations
 
 import importlib.util
 import json
+import os
+import shutil
+import subprocess
 import sys
 import tempfile
 import types
@@ -27,13 +39,13 @@ sys.modules["engine"] = engine
 SPEC.loader.exec_module(engine)
 
 
-def load_checks(store_path: str):
+def load_checks(store_path: str, checkout: str = "/nonexistent/nixcfg", git: str = "/nonexistent/git"):
     source = CHECKS.read_text()
     for k, v in {
         "@NOTIFICATION_ENV@": "/nonexistent/notify.env",
         "@STORE_PATH@": store_path,
-        "@NIXCFG_CHECKOUT@": "/nonexistent/nixcfg",
-        "@GIT_BIN@": "/nonexistent/git",
+        "@NIXCFG_CHECKOUT@": checkout,
+        "@GIT_BIN@": git,
     }.items():
         source = source.replace(k, v)
     assert "@" not in source.split("json.load")[0].split("STORE_PATH")[0][-40:]
@@ -59,6 +71,9 @@ class DriftTest(unittest.TestCase):
         self.checks = load_checks(self.store)
         self.ages: dict[str, float | None] = {}
         self.checks.commit_age_days = lambda rev, now: self.ages.get(rev)
+        self.checks.COMMIT_TIMES = self.checks.CommitTimes(str(Path(self.tmp.name) / "commits.json"))
+        self.checks.cat_file = lambda revisions: {}
+        self.checks.GRAPH = self.checks.CommitGraph(str(Path(self.tmp.name) / "graph.json"))
         self.checks.time.time = lambda: NOW
 
     def tearDown(self) -> None:
@@ -109,6 +124,11 @@ class DriftTest(unittest.TestCase):
         self.assertEqual([p.key for p in problems], ["drift:store"])
         self.assertIn("unwatched", problems[0].text)
 
+    def test_the_check_watches_the_store(self):
+        (check,) = self.checks.checks()
+        self.assertEqual(check.watch, (self.store,))
+        self.assertGreater(check.every, 0, "commit ages still move with the clock")
+
     def test_engine_debounce_then_page(self):
         self.write([host("hsb9", relation="behind", behind=99, rev="d23b1814")])
         sent = []
@@ -120,5 +140,178 @@ class DriftTest(unittest.TestCase):
         self.assertIn("hsb9", sent[0])
 
 
+GIT = shutil.which("git")
+
+
+@unittest.skipUnless(GIT, "needs git")
+class CheckoutTest(unittest.TestCase):
+    """A throwaway nixcfg checkout, with every git run the checks make counted."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.repo = str(Path(tmp.name) / "nixcfg")
+        self.git("init", "-q", self.repo, cwd=tmp.name)
+        self.revs = [self.commit(NOW - days * 86400) for days in (30, 9, 1)]
+        self.checks = load_checks(str(Path(tmp.name) / "pharos.json"), self.repo, GIT)
+        self.path = str(Path(tmp.name) / "commits.json")
+        self.checks.GRAPH = self.checks.CommitGraph(str(Path(tmp.name) / "graph.json"))
+        self.runs = 0
+        real = self.checks.subprocess.run
+
+        def counted(*args, **kwargs):
+            self.runs += 1
+            return real(*args, **kwargs)
+
+        self.checks.subprocess = types.SimpleNamespace(run=counted)
+
+    def git(self, *args, cwd=None, stamp=None):
+        env = {**os.environ, "GIT_CONFIG_GLOBAL": os.devnull, "GIT_CONFIG_NOSYSTEM": "1"}
+        if stamp is not None:
+            env.update(GIT_COMMITTER_DATE=f"{int(stamp)} +0000", GIT_AUTHOR_DATE=f"{int(stamp)} +0000")
+        return subprocess.run([GIT, *args], cwd=cwd or self.repo, env=env, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def commit(self, stamp: float) -> str:
+        self.git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "x", stamp=stamp)
+        return self.git("rev-parse", "HEAD")
+
+    def publish(self, rev: str = "HEAD") -> None:
+        """What a fetch does to the checkout: move origin/main."""
+        self.git("update-ref", "refs/remotes/origin/main", rev)
+
+
+
+class CommitTimesTest(CheckoutTest):
+    def test_new_revisions_cost_one_git_run_together(self):
+        times = self.checks.CommitTimes(self.path)
+        times.resolve(self.revs + [self.revs[0][:8]])
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(times.get(self.revs[1]), NOW - 9 * 86400)
+        self.assertEqual(times.get(self.revs[0][:8]), NOW - 30 * 86400, "an abbreviation resolves too")
+
+    def test_known_revisions_cost_nothing_even_after_a_restart(self):
+        times = self.checks.CommitTimes(self.path)
+        times.resolve(self.revs)
+        times.flush()
+        times.resolve(self.revs)
+        again = self.checks.CommitTimes(self.path)
+        again.resolve(self.revs)
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(again.get(self.revs[2]), NOW - 86400)
+
+    def test_an_unknown_revision_is_asked_again_once_the_checkout_moves(self):
+        times = self.checks.CommitTimes(self.path)
+        unknown = "0123456789abcdef0123456789abcdef01234567"
+        times.resolve([unknown])
+        times.resolve([unknown])
+        self.assertEqual(self.runs, 1)
+        self.assertIsNone(times.get(unknown))
+        self.commit(NOW)  # a pull moves logs/HEAD
+        times.resolve([unknown])
+        self.assertEqual(self.runs, 2)
+
+    def test_the_cache_is_bounded_and_keeps_what_was_used(self):
+        times = self.checks.CommitTimes(self.path, size=2)
+        times.resolve(self.revs)
+        times.get(self.revs[0])  # judged again: now the most recent
+        times.flush()
+        kept = json.loads(Path(self.path).read_text())["commits"]
+        self.assertEqual(sorted(kept), sorted([self.revs[0], self.revs[2]]))
+
+    def test_a_full_cache_saves_its_use_order(self):
+        times = self.checks.CommitTimes(self.path, size=3)
+        times.resolve(self.revs)
+        times.flush()
+        times.get(self.revs[0])  # judged again: a restart must still know it is recent
+        self.assertTrue(times.dirty)
+        times.flush()
+        again = self.checks.CommitTimes(self.path, size=2)
+        again.flush()  # one more revision than fits: the least recently used goes
+        kept = json.loads(Path(self.path).read_text())["commits"]
+        self.assertEqual(sorted(kept), sorted([self.revs[0], self.revs[2]]))
+
+    def test_use_below_the_bound_writes_nothing(self):
+        times = self.checks.CommitTimes(self.path)
+        times.resolve(self.revs)
+        times.flush()
+        times.get(self.revs[0])
+        self.assertFalse(times.dirty, "nothing to evict, so the order need not be saved")
+
+    def test_names_never_reach_git(self):
+        times = self.checks.CommitTimes(self.path)
+        times.resolve(["main", "HEAD~1", ""])
+        self.assertEqual(self.runs, 0)
+
+
+class CommitGraphTest(CheckoutTest):
+    def setUp(self) -> None:
+        super().setUp()
+        # main: 30d - 9d - 1d - merge(side) - tip; side branches off at 9d.
+        self.trunk = self.git("rev-parse", "--abbrev-ref", "HEAD")
+        self.git("checkout", "-q", "-b", "side", self.revs[1])
+        self.side = [self.commit(NOW - 5 * 86400), self.commit(NOW - 4 * 86400)]
+        self.git("checkout", "-q", "-")
+        self.git("-c", "user.name=t", "-c", "user.email=t@t", "merge", "-q", "--no-ff", "-m", "m", "side")
+        self.tip = self.commit(NOW)
+        self.git("checkout", "-q", "-b", "stray", self.side[0])
+        self.stray = self.commit(NOW)  # never merged
+        self.publish(self.tip)
+
+    def count(self, rev: str, main: str = "refs/remotes/origin/main") -> int:
+        return int(self.git("rev-list", "--count", main, f"^{rev}"))
+
+    def test_counts_match_git(self):
+        graph = self.checks.GRAPH
+        graph.update()
+        for rev in self.revs + self.side + [self.tip]:
+            self.assertEqual(graph.behind(rev), self.count(rev), rev)
+        self.assertIsNone(graph.behind(self.stray), "only main's history is indexed")
+        self.assertEqual(graph.behind(self.revs[0], self.revs[2]), self.count(self.revs[0], self.revs[2]))
+
+    def test_ancestry(self):
+        graph = self.checks.GRAPH
+        graph.update()
+        self.assertTrue(graph.is_ancestor(self.side[1]), "merged in")
+        self.assertTrue(graph.is_ancestor(self.tip))
+        self.assertIsNone(graph.is_ancestor(self.stray), "not in main's history at all")
+        self.assertFalse(graph.is_ancestor(self.tip, self.revs[2]))
+        self.assertEqual(graph.behind(self.revs[0][:9]), self.count(self.revs[0]), "abbreviations resolve")
+
+    def test_only_a_moved_ref_costs_a_git_run(self):
+        self.checks.GRAPH.update()
+        self.checks.GRAPH.update()
+        self.assertEqual(self.runs, 1)
+        again = self.checks.CommitGraph(self.checks.GRAPH.path)
+        again.update()
+        self.assertEqual(self.runs, 1, "a restart reads the index from disk")
+        self.git("checkout", "-q", self.trunk)
+        self.publish(self.commit(NOW + 60))
+        self.git("pack-refs", "--all")  # the ref may sit in packed-refs
+        again.update()
+        self.assertEqual(self.runs, 2)
+        self.assertEqual(again.behind(self.tip), 1)
+
+    def test_a_force_pushed_main_is_followed(self):
+        self.checks.GRAPH.update()
+        self.git("checkout", "-q", "-b", "rewritten", self.revs[2])
+        self.publish(self.commit(NOW + 60))
+        self.checks.GRAPH.update()
+        for rev in self.revs + [self.tip]:
+            self.assertEqual(self.checks.GRAPH.behind(rev), self.count(rev), rev)
+        self.assertFalse(self.checks.GRAPH.is_ancestor(self.tip))
+
+    def test_judge_counts_what_the_beacon_left_out(self):
+        self.checks.GRAPH.update()
+        self.checks.MAX_COMMITS = 3
+        self.checks.commit_age_days = lambda rev, now: None
+        (problem,) = self.checks.judge(host("hsb8", relation="behind", behind=None, rev=self.revs[0]), NOW)
+        self.assertIn(f"{self.count(self.revs[0])} commits behind", problem.text)
+        (problem,) = self.checks.judge(host("hsb9", relation=None, rev=self.revs[1]), NOW)
+        self.assertIn("commits behind", problem.text, "no comparison at all: the graph says behind")
+        self.assertEqual(self.checks.judge(host("csb0", relation=None, rev=self.tip), NOW), [])
+        self.assertEqual(self.checks.judge(host("x", relation=None, rev=self.stray), NOW), [], "not ours to guess")
+
+
 if __name__ == "__main__":
     unittest.main()
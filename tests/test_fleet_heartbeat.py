@@ -0,0 +1,171 @@
+"""Unit tests for the resident poller heartbeat (OPS-107).
+
+The first heartbeat forked a shell per probe and could only say when the
+poller's state file was last touched, so a poller that kept running but could
+not deliver looked healthy to its peer. These tests pin:
+
+  * a client that sends nothing still gets the bare number (pre-v2 peers)
+  * a v2 client gets duration, standing problems, pending-since and a sequence
+    number that moves only when a cycle happened
+  * a pending delivery is dated from the engine's outbox, or from the first
+    cycle it was seen in hausv-alerts' own state format
+  * read_heartbeat understands an old server that answers and hangs up
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO = Path(__file__).resolve().parents[1]
+ENGINE = REPO / "modules" / "shared" / "fleet-alerts" / "engine.py"
+SERVER = REPO / "modules" / "shared" / "fleet-alerts" / "heartbeat.py"
+
+SPEC = importlib.util.spec_from_file_location("engine", ENGINE)
+engine = importlib.util.module_from_spec(SPEC)
+assert SPEC.loader is not None
+sys.modules["engine"] = engine  # heartbeat.py imports it by this name
+SPEC.loader.exec_module(engine)
+SERVER_SPEC = importlib.util.spec_from_file_location("fleet_heartbeat", SERVER)
+heartbeat = importlib.util.module_from_spec(SERVER_SPEC)
+assert SERVER_SPEC.loader is not None
+SERVER_SPEC.loader.exec_module(heartbeat)
+
+PROBLEM = engine.Problem("hsb1:api", "hsb1: unreachable (URLError)")
+
+
+class Server:
+    """heartbeat.serve() on a loopback port, for the life of one test."""
+
+    def __init__(self, state_path: str) -> None:
+        self.snapshot = heartbeat.Snapshot(state_path)
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=heartbeat.serve, args=(self.listener, self.snapshot, self.stop))
+        self.thread.start()
+
+    def close(self) -> None:
+        self.stop.set()
+        self.thread.join(5)
+        self.listener.close()
+
+    def legacy(self) -> str:
+        """What the old check_peer did: connect, read, parse one number."""
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            return sock.recv(64).decode().strip()
+
+    def v2(self) -> "engine.Heartbeat":
+        return engine.read_heartbeat("127.0.0.1", self.port, 5)
+
+
+class HeartbeatServer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.state = os.path.join(self.tmp.name, "state.json")
+        self.server = Server(self.state)
+        self.addCleanup(self.server.close)
+        patcher = mock.patch.object(heartbeat, "REQUEST_WAIT_SECONDS", 0.2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cycle(self, problems: list, deliver: bool = True) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.run_cycle(
+                self.state,
+                time.time(),
+                lambda: list(problems),
+                lambda a, c: "\n".join(a + c),
+                lambda text, ident: deliver,
+            )
+
+    def test_never_ran_is_zero_either_way(self) -> None:
+        self.assertEqual(self.server.legacy(), "0")
+        self.assertEqual(self.server.v2().at, 0)
+
+    def test_legacy_client_gets_the_bare_mtime(self) -> None:
+        self.cycle([])
+        self.assertEqual(self.server.legacy(), str(int(os.stat(self.state).st_mtime)))
+
+    def test_v2_reports_the_cycle(self) -> None:
+        self.cycle([PROBLEM])
+        self.cycle([PROBLEM])  # confirmed and delivered
+        beat = self.server.v2()
+        self.assertEqual(int(beat.at), int(os.stat(self.state).st_mtime))
+        self.assertEqual(beat.problems, 1)
+        self.assertEqual(beat.pending, 0)
+        self.assertIsNotNone(beat.seconds, "duration comes from the engine's history")
+
+    def test_seq_moves_only_with_cycles(self) -> None:
+        self.cycle([])
+        first = self.server.v2().seq
+        self.assertEqual(self.server.v2().seq, first, "a probe alone is not a cycle")
+        time.sleep(0.01)  # a distinct mtime even on coarse filesystems
+        self.cycle([])
+        self.assertGreater(self.server.v2().seq, first)
+
+    def test_wedged_delivery_is_dated_from_the_outbox(self) -> None:
+        self.cycle([PROBLEM])
+        began = time.time()
+        self.cycle([PROBLEM], deliver=False)
+        beat = self.server.v2()
+        self.assertEqual(beat.problems, 1)
+        self.assertAlmostEqual(beat.pending, began, delta=5)
+        self.cycle([PROBLEM], deliver=True)
+        self.assertEqual(self.server.v2().pending, 0)
+
+    def test_hausv_state_pending_is_dated_from_first_sight(self) -> None:
+        # hausv-alerts' own format: `active` keys and one `pending` event.
+        Path(self.state).write_text(json.dumps({"schema": 3, "active": ["a", "b"], "pending": {"event_id": "x"}}))
+        first = self.server.v2()
+        self.assertEqual(first.problems, 2)
+        self.assertEqual(first.pending, int(os.stat(self.state).st_mtime))
+        os.utime(self.state, (time.time() + 60, time.time() + 60))
+        self.assertEqual(self.server.v2().pending, first.pending, "still the first cycle it was seen")
+        self.assertIsNone(first.seconds)
+
+
+class Protocol(unittest.TestCase):
+    def test_line_round_trips(self) -> None:
+        beat = engine.Heartbeat(1_800_000_000, 1.25, 2, 1_799_999_000, 17)
+        self.assertEqual(engine.Heartbeat.parse(beat.line()), beat)
+
+    def test_legacy_number_parses(self) -> None:
+        self.assertEqual(engine.Heartbeat.parse("1800000000\n"), engine.Heartbeat(1_800_000_000))
+
+    def test_garbage_is_an_error(self) -> None:
+        for raw in ("", "v2 seq=3", "hello"):
+            with self.assertRaises(ValueError):
+                engine.Heartbeat.parse(raw)
+
+    def test_client_reads_an_old_server(self) -> None:
+        # The Accept = true shell script: print the number, hang up unread.
+        listener = socket.create_server(("127.0.0.1", 0))
+        self.addCleanup(listener.close)
+
+        def old_server() -> None:
+            for _ in range(2):
+                conn, _ = listener.accept()
+                conn.sendall(b"1800000000\n")
+                conn.close()
+
+        threading.Thread(target=old_server, daemon=True).start()
+        beat = engine.read_heartbeat("127.0.0.1", listener.getsockname()[1], 5)
+        self.assertEqual(beat.at, 1_800_000_000)
+        self.assertIsNone(beat.pending)
+
+
+if __name__ == "__main__":
+    unittest.main()
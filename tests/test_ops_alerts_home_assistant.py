@@ -0,0 +1,567 @@
+"""Unit tests for the ops-alerts Home Assistant check (OPS-104).
+
+Each house used to cost up to three sequential requests -- /api/, the witness,
+the budget counter -- each on a new connection and each bounded by its own 15 s
+timeout. The check now reads liveness and every watched entity from one
+/api/template render. Pinned here, against a fake Home Assistant on loopback:
+
+  * one request per house, on a connection kept alive across cycles, and a
+    connection HA dropped while idle is retried once, not reported as an outage
+  * what pages is unchanged: unreachable, HTTP errors, an unavailable witness,
+    a budget over its limit -- and a sleeping car ('unknown') still does not
+  * a missing entity reads as missing, not as 'unknown'
+  * the URL and path restrictions still hold, and entity ids cannot inject
+    template code
+
+Polling every 15 minutes also meant an integration going `unavailable` was seen
+up to half an hour late. A resident poller keeps a websocket per house instead
+(EntityWatch); against a fake HA websocket server:
+
+  * it subscribes to the watched entities only, and the check reads the pushed
+    states without making a request
+  * a witness change wakes the poller; a budget tick does not
+  * a refused token, a dropped connection or an unanswered ping all fall back
+    to polling, so the liveness check is never lost with the push
+
+A house that answers in 12 s is one step from the 15 s timeout yet read as
+healthy. Every request and every websocket ping is now timed into a fixed-size
+window per house (LatencyRing):
+
+  * the ring keeps only its last LATENCY_SAMPLES and survives a restart
+  * the file is rewritten at most once per LATENCY_FLUSH_SECONDS, not by every
+    house's check
+  * a p95 over the target's latencyBudgetSeconds is its own problem, and a
+    target without a budget, or a window still filling, never pages
+  * requests and websocket pings are separate windows, each judged alone
+"""
+
+from __future__ import annotations
+
+import base64
+import contextlib
+import hashlib
+import http.server
+import importlib.util
+import json
+import re
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO = Path(__file__).resolve().parents[1]
+CHECKS = REPO / "hosts" / "csb0" / "ops-alerts-checks.py"
+
+
+def load_checks():
+    """Render the poller the way lib.nix does, then import it with engine stubbed."""
+    source = CHECKS.read_text()
+    for key in ("@TARGETS_JSON@", "@PEERS_JSON@", "@SMARTHOME_LINKS_JSON@"):
+        source = source.replace(key, "[]")
+
+    engine_stub = types.ModuleType("engine")
+
+    class Problem:  # mirrors engine.Problem's shape, not its behaviour
+        def __init__(self, key: str, text: str) -> None:
+            self.key = key
+            self.text = text
+
+    def atomic_write_state(path: str, state: dict) -> None:
+        Path(path).write_text(json.dumps(state))
+
+    engine_stub.Problem = Problem
+    engine_stub.Check = object
+    engine_stub.atomic_write_state = atomic_write_state
+    sys.modules["engine"] = engine_stub
+
+    module = types.ModuleType("ops_alerts_checks")
+    module.__dict__["__file__"] = str(CHECKS)
+    exec(compile(source, str(CHECKS), "exec"), module.__dict__)  # noqa: S102
+    return module
+
+
+checks = load_checks()
+
+
+def fresh_latency(case: unittest.TestCase) -> str:
+    """Point checks.LATENCY at an empty window in a temporary file, for one test."""
+    tmp = tempfile.TemporaryDirectory()
+    case.addCleanup(tmp.cleanup)
+    path = f"{tmp.name}/latency.json"
+    case.addCleanup(setattr, checks, "LATENCY", checks.LATENCY)
+    checks.LATENCY = checks.LatencyRing(path)
+    return path
+
+
+class FakeHomeAssistant(http.server.ThreadingHTTPServer):
+    """Renders just enough of /api/template: the expand(...) pairs the check sends.
+
+    Also /api/ and /api/states/<id> for a token that is not an admin's, which
+    Home Assistant refuses the template render with 401.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.states: dict[str, str] = {}
+        self.status = 200
+        self.requests: list[str] = []
+        self.connections = 0
+        self.hang_up = False  # close after answering, without saying so
+        self.delay = 0.0  # seconds before answering
+        self.admin = True
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as Home Assistant serves it
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1  # type: ignore[attr-defined]
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server's naming
+        server: FakeHomeAssistant = self.server  # type: ignore[assignment]
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append(self.path)
+        time.sleep(server.delay)
+        ids = re.findall(r'expand\("([^"]+)"\)', body["template"])
+        rendered = json.dumps({e: [server.states[e]] if e in server.states else [] for e in ids})
+        self.answer(server.status if server.admin else 401, rendered)
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server's naming
+        server: FakeHomeAssistant = self.server  # type: ignore[assignment]
+        server.requests.append(self.path)
+        entity = self.path.removeprefix("/api/states/")
+        if self.path == "/api/":
+            self.answer(server.status, json.dumps({"message": "API running."}))
+        elif entity in server.states:
+            self.answer(server.status, json.dumps({"entity_id": entity, "state": server.states[entity]}))
+        else:
+            self.answer(404 if server.status == 200 else server.status, "{}")
+
+    def answer(self, status: int, rendered: str) -> None:
+        payload = rendered.encode() if status == 200 else b"{}"
+        self.close_connection = self.server.hang_up  # type: ignore[attr-defined]
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class HomeAssistantCheck(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ha = FakeHomeAssistant()
+        threading.Thread(target=self.ha.serve_forever, daemon=True).start()
+        self.addCleanup(self.ha.server_close)
+        self.addCleanup(self.ha.shutdown)
+        port = self.ha.server_address[1]
+        self.base = f"http://127.0.0.1:{port}"
+        # The real pattern admits only tailnet HA addresses; the fake is on loopback.
+        self._allowed = checks.ALLOWED_BASE
+        checks.ALLOWED_BASE = re.compile(rf"^http://127\.0\.0\.1:{port}$")
+        self.addCleanup(setattr, checks, "ALLOWED_BASE", self._allowed)
+        self.addCleanup(self.forget_connections)
+        self.latency = fresh_latency(self)
+        checks.os.environ["HA_TOKEN_TEST"] = "token"
+        self.target = {
+            "name": "hsb1",
+            "url": self.base,
+            "tokenVar": "HA_TOKEN_TEST",
+            "witness": "binary_sensor.model_x_status",
+            "budgetEntity": "counter.tesla_x_month",
+            "budgetLimit": 100,
+        }
+        self.ha.states = {"binary_sensor.model_x_status": "on", "counter.tesla_x_month": "12"}
+
+    def forget_connections(self) -> None:
+        for idle in checks._connections.values():
+            for connection in idle:
+                connection.close()
+        checks._connections.clear()
+        checks._template_refused.clear()
+
+    def keys(self) -> list[str]:
+        return [p.key for p in checks.check_home_assistant(self.target)]
+
+    def test_healthy_house_is_one_request(self) -> None:
+        self.assertEqual(self.keys(), [])
+        self.assertEqual(self.ha.requests, ["/api/template"])
+
+    def test_cycles_reuse_one_connection(self) -> None:
+        for _ in range(3):
+            self.assertEqual(self.keys(), [])
+        self.assertEqual(len(self.ha.requests), 3)
+        self.assertEqual(self.ha.connections, 1)
+
+    def test_a_dropped_idle_connection_is_retried_once(self) -> None:
+        # HA closes a kept-alive connection after its idle timeout, unannounced.
+        self.ha.hang_up = True
+        self.keys()
+        self.ha.hang_up = False
+        self.assertEqual(self.keys(), [])
+        self.assertEqual(self.ha.connections, 2)
+
+    def test_an_abandoned_check_does_not_share_its_connection(self) -> None:
+        # The engine stops waiting at the deadline, but the check's thread is
+        # still reading when the next cycle probes the same house.
+        self.ha.delay = 0.3
+        abandoned: list[list[str]] = []
+        slow = threading.Thread(target=lambda: abandoned.append(self.keys()))
+        slow.start()
+        time.sleep(0.1)
+        self.ha.delay = 0.0
+        self.assertEqual(self.keys(), [], "the next cycle gets a connection of its own")
+        slow.join()
+        self.assertEqual(abandoned, [[]])
+        self.assertEqual(self.ha.connections, 2)
+        self.assertEqual(len(checks._connections[self.base]), 2, "both handed back for reuse")
+
+    def test_a_non_admin_token_reads_entity_by_entity(self) -> None:
+        # /api/template is admin-only in Home Assistant; /api/ and /api/states are not.
+        self.ha.admin = False
+        self.assertEqual(self.keys(), [], "a healthy house, not an HTTP 401 page")
+        self.assertEqual(
+            self.ha.requests,
+            ["/api/template", "/api/", "/api/states/binary_sensor.model_x_status", "/api/states/counter.tesla_x_month"],
+        )
+        self.ha.requests.clear()
+        self.ha.states["binary_sensor.model_x_status"] = "unavailable"
+        self.ha.states["counter.tesla_x_month"] = "101"
+        self.assertEqual(self.keys(), ["hsb1:entry", "hsb1:budget"])
+        self.assertNotIn("/api/template", self.ha.requests, "refused once, not asked again")
+        del self.ha.states["binary_sensor.model_x_status"]
+        (problem, _budget) = checks.check_home_assistant(self.target)
+        self.assertIn("no such entity", problem.text)
+
+    def test_unavailable_witness_pages(self) -> None:
+        self.ha.states["binary_sensor.model_x_status"] = "unavailable"
+        self.assertEqual(self.keys(), ["hsb1:entry"])
+
+    def test_sleeping_car_does_not_page(self) -> None:
+        self.ha.states["binary_sensor.model_x_status"] = "unknown"
+        self.assertEqual(self.keys(), [])
+
+    def test_missing_witness_reads_as_missing(self) -> None:
+        del self.ha.states["binary_sensor.model_x_status"]
+        (problem,) = checks.check_home_assistant(self.target)
+        self.assertIn("no such entity", problem.text)
+
+    def test_budget_over_limit_pages_and_a_missing_counter_does_not(self) -> None:
+        self.ha.states["counter.tesla_x_month"] = "101"
+        self.assertEqual(self.keys(), ["hsb1:budget"])
+        del self.ha.states["counter.tesla_x_month"]
+        self.assertEqual(self.keys(), [])
+
+    def test_http_error_and_unreachable_read_differently(self) -> None:
+        self.ha.status = 401
+        (problem,) = checks.check_home_assistant(self.target)
+        self.assertIn("HTTP 401", problem.text)
+        self.ha.status = 200
+        self.target["url"] = "http://100.64.0.1:8123"  # allowed shape, not the fake
+        checks.ALLOWED_BASE = self._allowed
+        checks.TIMEOUT = 0.2
+        self.addCleanup(setattr, checks, "TIMEOUT", 15)
+        (problem,) = checks.check_home_assistant(self.target)
+        self.assertIn("unreachable", problem.text)
+
+    def test_restrictions_still_apply(self) -> None:
+        with self.assertRaises(ValueError):
+            checks.ha_request("http://example.com:8123", "token", "/api/")
+        with self.assertRaises(ValueError):
+            checks.ha_request(self.base, "token", "/auth/token")
+        with self.assertRaises(ValueError):
+            checks.ha_states(self.base, "token", ['sensor.x") }}{{ 1'])
+        self.assertEqual(self.ha.requests, [], "refused before any request")
+
+    def test_every_request_is_timed_and_the_window_is_saved(self) -> None:
+        self.keys()
+        self.keys()
+        self.assertEqual(len(checks.LATENCY.rings["hsb1:api"]["ms"]), 2)
+        saved = json.loads(Path(self.latency).read_text())
+        self.assertEqual(len(saved["houses"]["hsb1:api"]["ms"]), 1, "the second check is inside the interval")
+        checks.LATENCY.flush()  # as main() does on the way out
+        saved = json.loads(Path(self.latency).read_text())
+        self.assertEqual(len(saved["houses"]["hsb1:api"]["ms"]), 2)
+
+    def test_a_slow_house_pages_against_its_budget(self) -> None:
+        self.target["latencyBudgetSeconds"] = 5
+        for _ in range(checks.LATENCY_MIN_SAMPLES - 2):  # the check adds one more
+            checks.LATENCY.add("hsb1:api", 12.0)
+        self.assertEqual(self.keys(), [], "a window still filling says nothing")
+        for _ in range(checks.LATENCY_SAMPLES):
+            checks.LATENCY.add("hsb1:api", 12.0)
+        (problem,) = checks.check_home_assistant(self.target)
+        self.assertEqual(problem.key, "hsb1:latency")
+        self.assertIn("p95 12.0 s", problem.text)
+        del self.target["latencyBudgetSeconds"]
+        self.assertEqual(self.keys(), [], "no budget, no latency problem")
+
+    def test_pings_and_requests_are_judged_apart(self) -> None:
+        self.target["latencyBudgetSeconds"] = 5
+        for _ in range(checks.LATENCY_SAMPLES):
+            checks.LATENCY.add("hsb1:ping", 0.01)  # a quick event loop ...
+            checks.LATENCY.add("hsb1:api", 0.05 if _ % 2 else 12.0)  # ... behind slow renders
+        (problem,) = checks.check_home_assistant(self.target)
+        self.assertIn("API requests", problem.text)
+        self.assertNotIn("websocket pings", problem.text, "fast pings do not dilute slow requests")
+        for _ in range(checks.LATENCY_SAMPLES):
+            checks.LATENCY.add("hsb1:api", 0.05)
+            checks.LATENCY.add("hsb1:ping", 12.0)
+        (problem,) = checks.check_home_assistant(self.target)
+        self.assertIn("websocket pings", problem.text)
+
+    def test_a_few_slow_answers_stay_under_the_p95(self) -> None:
+        self.target["latencyBudgetSeconds"] = 5
+        for index in range(40):
+            checks.LATENCY.add("hsb1:api", 12.0 if index == 7 else 0.05)
+        self.assertEqual(self.keys(), [])
+
+
+class LatencyRingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.path = fresh_latency(self)
+
+    def test_the_ring_is_fixed_size_and_keeps_the_newest(self) -> None:
+        ring = checks.LatencyRing(self.path, size=4)
+        for ms in range(10):
+            ring.add("hsb1:api", ms / 1000)
+        self.assertEqual(sorted(ring.rings["hsb1:api"]["ms"]), [6, 7, 8, 9])
+
+    def test_the_window_survives_a_restart(self) -> None:
+        ring = checks.LatencyRing(self.path, size=4)
+        for ms in range(6):
+            ring.add("hsb1:api", ms / 1000)
+        ring.flush()
+        again = checks.LatencyRing(self.path, size=4)
+        again.add("hsb1:api", 0.1)  # overwrites the oldest, as the first ring would have
+        self.assertEqual(sorted(again.rings["hsb1:api"]["ms"]), [3, 4, 5, 100])
+
+    def test_ticks_write_at_most_once_per_interval(self) -> None:
+        ring = checks.LatencyRing(self.path, size=4)
+        with mock.patch.object(checks.engine, "atomic_write_state") as write:
+            for house in ("hsb0:api", "hsb1:api", "hsb8:api"):  # one cycle's checks
+                ring.add(house, 0.1)
+                ring.tick(1000.0)
+            self.assertEqual(write.call_count, 1)
+            ring.add("hsb1:api", 0.1)
+            ring.tick(1000.0 + checks.LATENCY_FLUSH_SECONDS)
+            self.assertEqual(write.call_count, 2)
+            ring.tick(2000.0)
+            self.assertEqual(write.call_count, 2, "nothing new, nothing written")
+            ring.add("hsb1:api", 0.1)
+            ring.flush()
+            self.assertEqual(write.call_count, 3, "the way out always writes")
+
+    def test_a_corrupt_file_starts_an_empty_window(self) -> None:
+        Path(self.path).write_text("{nope")
+        self.assertIsNone(checks.LatencyRing(self.path).p95("hsb1:api"))
+
+
+class FakeWebsocketHA:
+    """Just enough of HA's websocket API: auth, subscribe_entities, pings, pushes."""
+
+    GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+    def __init__(self, states: dict[str, str], token: str = "token") -> None:
+        self.states = states
+        self.token = token
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        self.subscribed: list[list[str]] = []
+        self.answer_pings = True
+        self.pings = 0
+        self.client: socket.socket | None = None
+        self.ready = threading.Event()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def close(self) -> None:
+        self.listener.close()
+        self.drop()
+
+    def drop(self) -> None:
+        if self.client is not None:
+            # shutdown() first: close() alone would not interrupt the serving
+            # thread's recv(), and the client would never see the connection end.
+            with contextlib.suppress(OSError):
+                self.client.shutdown(socket.SHUT_RDWR)
+            self.client.close()
+
+    def push(self, entity: str, state: str) -> None:
+        self.states[entity] = state
+        self._send(self.client, {"id": 1, "type": "event", "event": {"c": {entity: {"+": {"s": state}}}}})
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        try:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(4096)
+            key = re.search(rb"Sec-WebSocket-Key: (\S+)", request, re.I).group(1)
+            accept = base64.b64encode(hashlib.sha1(key + self.GUID).digest())
+            conn.sendall(
+                b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+            )
+            self._send(conn, {"type": "auth_required"})
+            if self._recv(conn).get("access_token") != self.token:
+                self._send(conn, {"type": "auth_invalid"})
+                conn.close()
+                return
+            self._send(conn, {"type": "auth_ok"})
+            subscribe = self._recv(conn)
+            self.subscribed.append(subscribe["entity_ids"])
+            self._send(conn, {"id": subscribe["id"], "type": "result", "success": True, "result": None})
+            self.client = conn
+            added = {e: {"s": self.states[e]} for e in subscribe["entity_ids"] if e in self.states}
+            self._send(conn, {"id": subscribe["id"], "type": "event", "event": {"a": added}})
+            self.ready.set()
+            while True:
+                message = self._recv(conn)
+                if message.get("type") == "ping":
+                    self.pings += 1
+                    if self.answer_pings:
+                        self._send(conn, {"id": message["id"], "type": "pong"})
+        except (OSError, ValueError, AttributeError):
+            conn.close()
+
+    @staticmethod
+    def _send(conn, message: dict) -> None:
+        payload = json.dumps(message).encode()
+        header = bytes([0x81, len(payload)]) if len(payload) < 126 else struct.pack("!BBH", 0x81, 126, len(payload))
+        conn.sendall(header + payload)
+
+    @staticmethod
+    def _recv(conn) -> dict:
+        def exactly(n: int) -> bytes:
+            data = b""
+            while len(data) < n:
+                chunk = conn.recv(n - len(data))
+                if not chunk:
+                    raise ValueError("client went away")
+                data += chunk
+            return data
+
+        first, second = exactly(2)
+        if first & 0x0F == 0x8:
+            raise ValueError("close frame")
+        length = second & 0x7F
+        if length == 126:
+            (length,) = struct.unpack("!H", exactly(2))
+        mask = exactly(4)
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(exactly(length)))
+        return json.loads(payload)
+
+
+def until(condition, seconds: float = 5) -> bool:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@unittest.skipUnless(importlib.util.find_spec("websocket"), "websocket-client is not installed")
+class EntityWatchTest(unittest.TestCase):
+    WITNESS = "binary_sensor.model_x_status"
+    BUDGET = "counter.tesla_x_month"
+
+    def setUp(self) -> None:
+        self.ha = FakeWebsocketHA({self.WITNESS: "on", self.BUDGET: "12", "sensor.unwatched": "1"})
+        self.addCleanup(self.ha.close)
+        for name, value in (("ALLOWED_BASE", re.compile(r"^http://127\.0\.0\.1:\d+$")), ("WATCH_RETRY_SECONDS", 0.05)):
+            self.addCleanup(setattr, checks, name, getattr(checks, name))
+            setattr(checks, name, value)
+        fresh_latency(self)
+        checks.os.environ["HA_TOKEN_TEST"] = "token"
+        self.target = {
+            "name": "hsb1",
+            "url": f"http://127.0.0.1:{self.ha.port}",
+            "tokenVar": "HA_TOKEN_TEST",
+            "witness": self.WITNESS,
+            "budgetEntity": self.BUDGET,
+            "budgetLimit": 100,
+        }
+        self.wake = threading.Event()
+
+    def watch(self, token: str = "token"):
+        watch = checks.EntityWatch(self.target, token, self.wake)
+        self.addCleanup(watch.close)
+        self.addCleanup(checks.WATCHES.clear)
+        checks.WATCHES[self.target["name"]] = watch
+        return watch
+
+    def test_subscribes_to_the_watched_entities_only(self) -> None:
+        watch = self.watch()
+        self.assertTrue(until(lambda: watch.states() is not None))
+        self.assertEqual(self.ha.subscribed, [[self.WITNESS, self.BUDGET]])
+        self.assertEqual(watch.states(), {self.WITNESS: "on", self.BUDGET: "12"})
+
+    def test_the_check_reads_pushed_states_without_a_request(self) -> None:
+        watch = self.watch()
+        self.assertTrue(until(lambda: watch.states() is not None))
+        # Nothing answers HTTP on this port: a poll would read as unreachable.
+        self.assertEqual(checks.check_home_assistant(self.target), [])
+        self.ha.push(self.WITNESS, "unavailable")
+        self.assertTrue(until(lambda: watch.states()[self.WITNESS] == "unavailable"))
+        self.assertEqual([p.key for p in checks.check_home_assistant(self.target)], ["hsb1:entry"])
+
+    def test_a_witness_change_wakes_the_poller_and_a_budget_tick_does_not(self) -> None:
+        watch = self.watch()
+        self.assertTrue(until(lambda: watch.states() is not None))
+        self.ha.push(self.BUDGET, "13")
+        self.assertTrue(until(lambda: watch.states()[self.BUDGET] == "13"))
+        self.assertFalse(self.wake.is_set())
+        self.ha.push(self.WITNESS, "unavailable")
+        self.assertTrue(self.wake.wait(5))
+
+    def test_a_refused_token_falls_back_to_polling(self) -> None:
+        watch = self.watch(token="wrong")
+        time.sleep(0.3)
+        self.assertIsNone(watch.states())
+        (problem,) = checks.check_home_assistant(self.target)
+        self.assertIn("unreachable", problem.text, "it polled, and nothing answers HTTP here")
+
+    def test_a_dropped_connection_falls_back_then_resubscribes(self) -> None:
+        watch = self.watch()
+        self.assertTrue(until(lambda: watch.states() is not None))
+        self.ha.ready.clear()
+        self.ha.drop()
+        self.assertTrue(until(lambda: watch.states() is None))
+        self.assertTrue(self.ha.ready.wait(5), "reconnects on its own")
+        self.assertTrue(until(lambda: watch.states() is not None))
+
+    def test_an_unanswered_ping_is_a_dead_connection(self) -> None:
+        self.addCleanup(setattr, checks, "WATCH_IDLE_SECONDS", checks.WATCH_IDLE_SECONDS)
+        checks.WATCH_IDLE_SECONDS = 0.2
+        self.ha.answer_pings = False
+        watch = self.watch()
+        self.assertTrue(until(lambda: watch.states() is not None))
+        self.assertTrue(until(lambda: watch.states() is None), "silence after a ping drops the watch")
+        self.assertGreaterEqual(self.ha.pings, 1)
+
+    def test_answered_pings_are_latency_samples(self) -> None:
+        self.addCleanup(setattr, checks, "WATCH_IDLE_SECONDS", checks.WATCH_IDLE_SECONDS)
+        checks.WATCH_IDLE_SECONDS = 0.05
+        watch = self.watch()
+        self.assertTrue(until(lambda: len((checks.LATENCY.rings or {}).get("hsb1:ping", {}).get("ms", [])) >= 2))
+        self.assertIsNotNone(watch.states(), "answered pings keep the watch up")
+
+
+if __name__ == "__main__":
+    unittest.main()
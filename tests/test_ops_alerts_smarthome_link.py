@@ -21,19 +21,31 @@ pinned:
     misreading it as seconds dates the heartbeat to 1970 and pages forever
   * the boundary either side of maxAgeSeconds, because an off-by-one here is
     either a permanent false page or a check that never fires
+  * links through one broker share one session, and each still gets its own
+    verdict from its own topic; a wildcard read waits for every publisher's
+    retained copy, not just the first
+  * resident, the tracker's index answers with no broker read, dates silence
+    from real arrivals, survives a restart and wakes the poller when a link
+    goes stale -- the OPS-115 outage then pages minutes after the last message
 """
 
 from __future__ import annotations
 
+import importlib.util
 import json
+import os
 import sys
+import tempfile
+import threading
 import time
 import types
 import unittest
 from pathlib import Path
+from unittest import mock
 
 REPO = Path(__file__).resolve().parents[1]
 CHECKS = REPO / "hosts" / "csb0" / "ops-alerts-checks.py"
+ENGINE = REPO / "modules" / "shared" / "fleet-alerts" / "engine.py"
 
 LINK = {
     "name": "hsb1 smart-home link",
@@ -57,17 +69,33 @@ def load_checks():
     source = source.replace("@SMARTHOME_LINKS_JSON@", json.dumps([LINK]))
     assert "@" not in source.split("json.loads(r")[1][:40], "a placeholder survived"
 
+    # The real Problem, so a field the checks name that engine.Problem lacks
+    # fails here instead of in the resident poller.
+    spec = importlib.util.spec_from_file_location("fleet_engine", ENGINE)
+    real_engine = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules["fleet_engine"] = real_engine  # dataclasses resolve the module by name
+    spec.loader.exec_module(real_engine)
+
     engine_stub = types.ModuleType("engine")
 
-    class Problem:  # mirrors engine.Problem's shape, not its behaviour
-        def __init__(self, identifier: str, text: str) -> None:
-            self.identifier = identifier
-            self.text = text
+    class Check:  # mirrors engine.Check's shape; gather below runs them in order
+        def __init__(self, name: str, run, deadline: float = 20) -> None:
+            self.name = name
+            self.run = run
+            self.deadline = deadline
 
-    engine_stub.Problem = Problem
+    engine_stub.Problem = real_engine.Problem
+    engine_stub.Check = Check
+    engine_stub.gather = lambda checks, **k: [p for c in checks for p in c.run()]
     engine_stub.EXIT_UNDELIVERED = 2
     engine_stub.run_cycle = lambda *a, **k: 0
     engine_stub.telegram_sender = lambda *a, **k: (lambda *_: True)
+
+    def atomic_write_state(path: str, state: dict) -> None:
+        Path(path).write_text(json.dumps(state))
+
+    engine_stub.atomic_write_state = atomic_write_state
     sys.modules["engine"] = engine_stub
 
     module = types.ModuleType("ops_alerts_checks")
@@ -82,21 +110,24 @@ checks = load_checks()
 class SmarthomeLinkTest(unittest.TestCase):
     def setUp(self) -> None:
         self.calls: list[tuple] = []
-        self._real = checks.read_retained
+        self._real = checks.read_retained_many
         checks.os.environ["MQTT_USER"] = "probe"
         checks.os.environ["MQTT_PASS"] = "secret"
 
     def tearDown(self) -> None:
-        checks.read_retained = self._real
+        checks.read_retained_many = self._real
+
+    def stub(self, result, **others):
+        """`result` is LINK's payload (None: nothing retained); `others` by topic."""
 
-    def stub(self, result):
-        def fake(host, port, user, password, topic, timeout):
-            self.calls.append((host, port, topic))
+        def fake(host, port, user, password, topics, timeout):
+            self.calls.append((host, port, list(topics)))
             if isinstance(result, Exception):
                 raise result
-            return result
+            payloads = {LINK["topic"]: result, **others}
+            return {topic: payloads[topic] for topic in topics if payloads.get(topic) is not None}
 
-        checks.read_retained = fake
+        checks.read_retained_many = fake
 
     def only(self, problems):
         self.assertEqual(len(problems), 1, f"expected exactly one problem, got {problems}")
@@ -106,20 +137,20 @@ class SmarthomeLinkTest(unittest.TestCase):
 
     def test_missing_credentials_is_a_problem_not_a_crash(self):
         checks.os.environ["MQTT_USER"] = ""
-        text = self.only(checks.check_smarthome_link(LINK))
+        text = self.only(checks.check_smarthome_links([LINK]))
         self.assertIn("credentials", text)
 
     # -- broker reachability ---------------------------------------------
 
     def test_unreachable_broker_says_unverifiable_not_broken(self):
         self.stub(ConnectionRefusedError("nope"))
-        text = self.only(checks.check_smarthome_link(LINK))
+        text = self.only(checks.check_smarthome_links([LINK]))
         self.assertIn("cannot read the local MQTT broker", text)
         self.assertIn("unverifiable", text)
 
     def test_empty_topic_is_reported_differently_from_unreachable(self):
         self.stub(None)
-        text = self.only(checks.check_smarthome_link(LINK))
+        text = self.only(checks.check_smarthome_links([LINK]))
         self.assertIn("nothing retained", text)
         self.assertNotIn("unverifiable", text)
 
@@ -127,35 +158,35 @@ class SmarthomeLinkTest(unittest.TestCase):
 
     def test_garbage_payload_is_reported(self):
         self.stub(b"not-a-timestamp")
-        self.assertIn("not a timestamp", self.only(checks.check_smarthome_link(LINK)))
+        self.assertIn("not a timestamp", self.only(checks.check_smarthome_links([LINK])))
 
     def test_milliseconds_are_recognised(self):
         # Node-RED's inject emits epoch ms. Read as seconds this is 1970 and the
         # check would page forever.
         self.stub(str(int(time.time() * 1000)).encode())
-        self.assertEqual(checks.check_smarthome_link(LINK), [])
+        self.assertEqual(checks.check_smarthome_links([LINK]), [])
 
     def test_seconds_are_tolerated(self):
         self.stub(str(int(time.time())).encode())
-        self.assertEqual(checks.check_smarthome_link(LINK), [])
+        self.assertEqual(checks.check_smarthome_links([LINK]), [])
 
     def test_whitespace_is_tolerated(self):
         self.stub(b"  " + str(int(time.time() * 1000)).encode() + b"\n")
-        self.assertEqual(checks.check_smarthome_link(LINK), [])
+        self.assertEqual(checks.check_smarthome_links([LINK]), [])
 
     # -- staleness boundary -----------------------------------------------
 
     def test_fresh_heartbeat_is_silent(self):
         self.stub(str(int((time.time() - 60) * 1000)).encode())
-        self.assertEqual(checks.check_smarthome_link(LINK), [])
+        self.assertEqual(checks.check_smarthome_links([LINK]), [])
 
     def test_just_inside_the_limit_is_silent(self):
         self.stub(str(int((time.time() - 590) * 1000)).encode())
-        self.assertEqual(checks.check_smarthome_link(LINK), [])
+        self.assertEqual(checks.check_smarthome_links([LINK]), [])
 
     def test_past_the_limit_pages_and_names_the_consequence(self):
         self.stub(str(int((time.time() - 3600) * 1000)).encode())
-        text = self.only(checks.check_smarthome_link(LINK))
+        text = self.only(checks.check_smarthome_links([LINK]))
         self.assertIn("60 min ago", text)
         # The operator must be told what is actually broken for a user, not just
         # that a number is large.
@@ -166,13 +197,220 @@ class SmarthomeLinkTest(unittest.TestCase):
 
     def test_the_probe_targets_the_configured_broker_and_topic(self):
         self.stub(str(int(time.time() * 1000)).encode())
-        checks.check_smarthome_link(LINK)
-        self.assertEqual(self.calls, [("127.0.0.1", 1883, "scom/jhw22/heartbeat/hsb1")])
+        checks.check_smarthome_links([LINK])
+        self.assertEqual(self.calls, [("127.0.0.1", 1883, ["scom/jhw22/heartbeat/hsb1"])])
+
+    def test_links_on_one_broker_share_one_session(self):
+        other = {**LINK, "name": "hsb2 smart-home link", "topic": "scom/jhw22/heartbeat/hsb2"}
+        self.stub(str(int(time.time() * 1000)).encode())
+        problems = checks.check_smarthome_links([LINK, other])
+        self.assertEqual(len(self.calls), 1, "one broker, one session")
+        self.assertEqual(self.calls[0][2], [LINK["topic"], other["topic"]])
+        # hsb1 answered, hsb2 did not: only hsb2 is reported, under its own key.
+        self.assertEqual([p.key for p in problems], ["link:hsb2 smart-home link"])
+        self.assertIn("nothing retained", problems[0].text)
+
+    def test_an_unreachable_broker_reports_every_link_on_it(self):
+        other = {**LINK, "name": "hsb2 smart-home link", "topic": "scom/jhw22/heartbeat/hsb2"}
+        self.stub(ConnectionRefusedError("nope"))
+        problems = checks.check_smarthome_links([LINK, other])
+        self.assertEqual(len(problems), 2)
+        self.assertTrue(all("unverifiable" in p.text for p in problems))
+
+    def test_one_check_per_broker(self):
+        elsewhere = {**LINK, "name": "remote link", "host": "10.0.0.2"}
+        second = {**LINK, "name": "hsb2 smart-home link", "topic": "scom/jhw22/heartbeat/hsb2"}
+        sessions = checks.broker_sessions([LINK, elsewhere, second])
+        self.assertEqual(sessions, {("127.0.0.1", 1883): [LINK, second], ("10.0.0.2", 1883): [elsewhere]})
 
     def test_collect_runs_the_link_check(self):
         self.stub(str(int((time.time() - 3600) * 1000)).encode())
         self.assertEqual(len(checks.collect()), 1, "collect() must include the link check")
 
 
+class ScriptedBroker:
+    """Stands in for paho's Client: retained copies arrive `at` seconds after the SUBACK."""
+
+    def __init__(self, retained: list[tuple[float, str, bytes]]) -> None:
+        self.retained = retained
+        self.subscribed: list[str] = []
+        self.acked: float | None = None
+
+    def module(self) -> types.ModuleType:
+        client = types.ModuleType("paho.mqtt.client")
+        client.CallbackAPIVersion = types.SimpleNamespace(VERSION2=2)
+        client.Client = lambda api, client_id: self
+        return client
+
+    def username_pw_set(self, user, password) -> None:
+        pass
+
+    def connect(self, host, port, keepalive) -> None:
+        pass
+
+    def subscribe(self, topics) -> None:
+        self.subscribed = [topic for topic, _qos in topics]
+
+    def loop(self, timeout: float) -> int:
+        if self.acked is None:
+            self.on_connect(self, None, {}, 0)
+            self.acked = time.monotonic()
+            self.on_subscribe(self, None, 1, [0])
+            return 0
+        time.sleep(timeout)
+        due = [entry for entry in self.retained if time.monotonic() - self.acked >= entry[0]]
+        for entry in due:
+            self.retained.remove(entry)
+            self.on_message(self, None, types.SimpleNamespace(topic=entry[1], payload=entry[2]))
+        return 0
+
+    def disconnect(self) -> None:
+        pass
+
+
+class RetainedReadTest(unittest.TestCase):
+    """read_retained_many itself, against a scripted broker."""
+
+    def read(self, broker: ScriptedBroker, topics: list[str]) -> dict[str, bytes]:
+        paho = types.ModuleType("paho")
+        paho.mqtt = types.ModuleType("paho.mqtt")
+        paho.mqtt.client = broker.module()
+        modules = {"paho": paho, "paho.mqtt": paho.mqtt, "paho.mqtt.client": paho.mqtt.client}
+        with mock.patch.dict(sys.modules, modules):
+            return checks.read_retained_many("127.0.0.1", 1883, "probe", "secret", topics, 5)
+
+    def test_a_wildcard_waits_for_every_publisher(self):
+        broker = ScriptedBroker([(0.05, "scom/a/heartbeat", b"1"), (0.3, "scom/b/heartbeat", b"2")])
+        got = self.read(broker, ["scom/+/heartbeat"])
+        self.assertEqual(got, {"scom/a/heartbeat": b"1", "scom/b/heartbeat": b"2"})
+
+    def test_exact_topics_stop_as_soon_as_all_have_answered(self):
+        broker = ScriptedBroker([(0.05, LINK["topic"], b"1")])
+        began = time.monotonic()
+        self.assertEqual(self.read(broker, [LINK["topic"]]), {LINK["topic"]: b"1"})
+        self.assertLess(time.monotonic() - began, checks.RETAINED_SETTLE_SECONDS, "no settle without a wildcard")
+
+    def test_a_wildcard_with_nothing_retained_ends_after_the_settle(self):
+        began = time.monotonic()
+        self.assertEqual(self.read(ScriptedBroker([]), ["scom/+/heartbeat"]), {})
+        self.assertLess(time.monotonic() - began, 2, "not the full timeout")
+
+
+class LinkTrackerTest(unittest.TestCase):
+    """The resident session's index, driven directly: no broker, no paho."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.index = os.path.join(tmp.name, "links.json")
+        self.wake = threading.Event()
+        self.tracker = self.make()
+        self.tracker.live = True  # as after SUBACK
+        checks.TRACKERS[(LINK["host"], LINK["port"])] = self.tracker
+        self.addCleanup(checks.TRACKERS.clear)
+        checks.os.environ["MQTT_USER"] = "probe"
+        checks.os.environ["MQTT_PASS"] = "secret"
+
+    def make(self, links=(LINK,)):
+        return checks.LinkTracker(LINK["host"], LINK["port"], list(links), "probe", "secret", self.wake, self.index)
+
+    @staticmethod
+    def stamp(ago: float = 0) -> bytes:
+        return str(int((time.time() - ago) * 1000)).encode()
+
+    def test_the_check_answers_from_the_index_without_the_broker(self):
+        def no_broker(*args):
+            raise AssertionError("a live tracker must answer without a broker read")
+
+        real, checks.read_retained_many = checks.read_retained_many, no_broker
+        self.addCleanup(setattr, checks, "read_retained_many", real)
+        self.tracker.record(LINK["topic"], self.stamp(), False, time.time())
+        self.assertEqual(checks.check_smarthome_links([LINK]), [])
+
+    def test_a_down_session_falls_back_to_a_read(self):
+        self.tracker.live = False
+        calls = []
+        real, checks.read_retained_many = checks.read_retained_many, lambda *a: calls.append(a) or {}
+        self.addCleanup(setattr, checks, "read_retained_many", real)
+        self.assertIn("nothing retained", checks.check_smarthome_links([LINK])[0].text)
+        self.assertEqual(len(calls), 1)
+
+    def test_silence_is_dated_from_the_arrival_not_the_payload(self):
+        # Stamped just now by the publisher, but the last one to actually get
+        # here arrived an hour ago: the path is silent, whatever the payload says.
+        self.tracker.record(LINK["topic"], self.stamp(), False, time.time() - 3600)
+        problems = checks.check_smarthome_links([LINK])
+        self.assertEqual(len(problems), 1)
+        self.assertIn("60 min ago", problems[0].text)
+
+    def test_a_retained_copy_is_not_an_arrival(self):
+        payload, arrived = self.stamp(), time.time() - 3600
+        self.tracker.record(LINK["topic"], payload, False, arrived)
+        self.tracker.record(LINK["topic"], payload, True, time.time())  # resubscribed
+        self.assertEqual(self.tracker.seen()[LINK["topic"]][0], arrived)
+        # A retained payload we never saw arrive is dated by its own stamp.
+        self.tracker.record(LINK["topic"], self.stamp(5), True, time.time())
+        self.assertIsNone(self.tracker.seen()[LINK["topic"]][0])
+
+    def test_going_stale_and_recovering_wake_the_poller(self):
+        now = time.time()
+        self.tracker.record(LINK["topic"], self.stamp(), False, now)
+        self.tracker.tick(now)
+        self.assertFalse(self.wake.is_set(), "the first look only sets the baseline")
+        self.tracker.tick(now + 300)
+        self.assertFalse(self.wake.is_set())
+        self.tracker.tick(now + LINK["maxAgeSeconds"] + 60)
+        self.assertTrue(self.wake.is_set(), "crossing maxAgeSeconds starts a cycle")
+        self.wake.clear()
+        self.tracker.record(LINK["topic"], self.stamp(), False, now + LINK["maxAgeSeconds"] + 90)
+        self.tracker.tick(now + LINK["maxAgeSeconds"] + 90)
+        self.assertTrue(self.wake.is_set(), "the link coming back starts one too")
+
+    def test_a_tick_with_stale_and_unheard_links_keeps_their_keys(self):
+        # Once this raised on the first stale link and took the session down,
+        # so the early wake it exists for never fired.
+        unheard = {**LINK, "name": "hsb8 smart-home link", "topic": "scom/ww87/heartbeat/hsb8"}
+        tracker = self.make([LINK, unheard])
+        tracker.live = True
+        now = time.time()
+        tracker.record(LINK["topic"], self.stamp(), False, now - LINK["maxAgeSeconds"] - 60)
+        tracker.tick(now)
+        self.assertEqual(tracker.stale, {"link:hsb1 smart-home link", "link:hsb8 smart-home link"})
+        tracker.record(LINK["topic"], self.stamp(), False, now + 1)
+        tracker.tick(now + 1)
+        self.assertTrue(self.wake.is_set(), "one link recovering changes the stale set")
+
+    def test_the_index_survives_a_restart(self):
+        arrived = time.time() - 120
+        self.tracker.record(LINK["topic"], b"1800000000000", False, arrived)
+        self.tracker.flush(time.time())
+        again = self.make()
+        self.assertEqual(again.index, {LINK["topic"]: (arrived, "1800000000000")})
+        self.assertIsNone(again.seen(), "not live until subscribed")
+
+    def test_a_corrupt_index_starts_empty(self):
+        Path(self.index).write_text("{not json")
+        self.assertEqual(self.make().index, {})
+
+    def test_a_wildcard_link_is_judged_per_publisher(self):
+        wildcard = {**LINK, "name": "houses", "topic": "scom/+/heartbeat/#"}
+        tracker = self.make([wildcard])
+        tracker.live = True
+        now = time.time()
+        tracker.record("scom/jhw22/heartbeat/hsb1", self.stamp(), False, now)
+        tracker.record("scom/ww87/heartbeat/hsb8", self.stamp(), False, now - 3600)
+        tracker.record("scom/jhw22/other", self.stamp(), False, now)  # not a link topic
+        problems = checks.judge_links([wildcard], tracker.seen(), now)
+        self.assertEqual([p.key for p in problems], ["link:houses (scom/ww87/heartbeat/hsb8)"])
+        self.assertNotIn("scom/jhw22/other", tracker.index)
+
+    def test_topic_matching(self):
+        self.assertTrue(checks.topic_matches("a/+/c", "a/b/c"))
+        self.assertTrue(checks.topic_matches("a/#", "a/b/c"))
+        self.assertTrue(checks.topic_matches("a/b", "a/b"))
+        self.assertFalse(checks.topic_matches("a/+", "a/b/c"))
+        self.assertFalse(checks.topic_matches("a/b/c", "a/b"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -13,18 +13,49 @@ minutes. These tests pin the decisions that make it page (or not):
   * through the real engine: one run does NOT page (confirm-before-alert), the
     second does, and recovery announces a clear — the 10-minute cadence makes
     that ~10–20 min after onset
+
+It reads tailscaled's LocalAPI over the unix socket instead of spawning the CLI
+twice per cycle. Against a fake tailscaled on a socket in a temp directory:
+
+  * a peer-less status and the DERP map come over ONE connection, kept for the
+    next cycle, and a connection tailscaled closed while idle is retried once
+  * both reads together stay inside TIMEOUT; a wedged status does not also
+    wait out a second read for the DERP map
+  * an HTTP error is an unreadable answer, never a healthy one
+
+From here it also pings every fleet peer (the mesh checks), one engine check
+per peer so they run side by side, and keeps a day of round trips and paths:
+
+  * a peer that is normally direct and now answers only via DERP pages, as does
+    one well above its usual round trip; a peer without a baseline, or one
+    relayed most of the time anyway, does not
+  * a first DERP answer while the direct path is being found is pinged again
+  * the history is fixed-size and survives a restart
+
+Resident, it holds tailscaled's IPN bus open (BusWatch) so the empty-DERP-map
+state wakes a cycle in seconds rather than at the next 10-minute run:
+
+  * a change of BackendState, health warnings or DERP regions wakes the poller;
+    peer churn and the initial snapshot do not
+  * the bus is read as the chunked stream tailscaled sends, and a bus that
+    drops wakes the poller and is reopened
 """
 
 from __future__ import annotations
 
+import http.server
 import importlib.util
 import json
-import subprocess
+import queue
+import socketserver
 import sys
 import tempfile
+import threading
+import time
 import types
 import unittest
 from pathlib import Path
+from unittest import mock
 
 REPO = Path(__file__).resolve().parents[1]
 CHECKS = REPO / "modules" / "shared" / "fleet-alerts" / "tailnet-watch-checks.py"
@@ -41,10 +72,11 @@ def load_checks():
     """Render the poller the way lib.nix does, then import it against the real engine."""
     source = CHECKS.read_text()
     source = source.replace("@NOTIFICATION_ENV@", "/nonexistent/notify.env")
-    source = source.replace("@TAILSCALE_BIN@", "/nonexistent/tailscale")
+    source = source.replace("@TAILSCALED_SOCKET@", "/nonexistent/tailscaled.sock")
     source = source.replace("@HOSTNAME@", "csb1")
-    assert "@NOTIFICATION_ENV@" not in source and "@TAILSCALE_BIN@" not in source
-    assert "@HOSTNAME@" not in source
+    source = source.replace("@MESH_PEERS_JSON@", "[]")  # the mesh tests set their own peers
+    assert "@NOTIFICATION_ENV@" not in source and "@TAILSCALED_SOCKET@" not in source
+    assert "@HOSTNAME@" not in source and "@MESH_PEERS_JSON@" not in source
     module = types.ModuleType("tailnet_watch_checks")
     module.__dict__["__file__"] = str(CHECKS)
     exec(compile(source, str(CHECKS), "exec"), module.__dict__)  # noqa: S102
@@ -62,39 +94,45 @@ FULL_MAP = {"Regions": {"4": {"RegionID": 4, "RegionCode": "fra"}, "26": {"Regio
 EMPTY_MAP = {"Regions": {}}
 
 
-class FakeTailscale:
-    """Stands in for run_json: answers per subcommand, or raises."""
+class FakeLocalAPI:
+    """Stands in for checks.LOCALAPI: answers per endpoint, or raises."""
 
     def __init__(self, status, derp):
-        self.status = status
+        self.status_answer = status
         self.derp = derp
-        self.calls: list[list[str]] = []
+        self.calls: list[str] = []
 
-    def __call__(self, args):
-        self.calls.append(args)
-        answer = self.status if args[0] == "status" else self.derp
+    def answer(self, answer):
         if isinstance(answer, Exception):
             raise answer
         return answer
 
+    def status(self, deadline, peers=True):
+        self.calls.append("status" if peers else "status?peers=false")
+        return self.answer(self.status_answer)
+
+    def derp_map(self, deadline):
+        self.calls.append("derpmap")
+        return self.answer(self.derp)
+
 
 class CollectTest(unittest.TestCase):
     def tearDown(self) -> None:
-        checks.run_json = checks.__dict__["_real_run_json"]
+        checks.LOCALAPI = checks.__dict__["_real_localapi"]
 
     def setUp(self) -> None:
-        checks.__dict__.setdefault("_real_run_json", checks.run_json)
+        checks.__dict__.setdefault("_real_localapi", checks.LOCALAPI)
 
     def collect_with(self, status, derp):
-        fake = FakeTailscale(status, derp)
-        checks.run_json = fake
+        fake = FakeLocalAPI(status, derp)
+        checks.LOCALAPI = fake
         problems = checks.collect()
         return fake, problems
 
     def test_clean(self):
         fake, problems = self.collect_with(RUNNING, FULL_MAP)
         self.assertEqual(problems, [])
-        self.assertEqual([c[0] for c in fake.calls], ["status", "debug"])
+        self.assertEqual(fake.calls, ["status?peers=false", "derpmap"])
 
     def test_empty_derp_map_pages(self):
         _, problems = self.collect_with(RUNNING, EMPTY_MAP)
@@ -133,12 +171,17 @@ class CollectTest(unittest.TestCase):
         self.assertEqual([p.key for p in problems], ["tailnet:backend"])
         self.assertIn("NeedsLogin", problems[0].text)
 
-    def test_status_command_failure_reads_as_unknown(self):
-        err = subprocess.TimeoutExpired(cmd="tailscale", timeout=15)
-        _, problems = self.collect_with(err, FULL_MAP)
+    def test_status_failure_reads_as_unknown(self):
+        _, problems = self.collect_with(ConnectionRefusedError(), FULL_MAP)
         self.assertEqual([p.key for p in problems], ["tailnet:status"])
         self.assertIn("unreadable", problems[0].text)
-        self.assertIn("TimeoutExpired", problems[0].text)
+        self.assertIn("ConnectionRefusedError", problems[0].text)
+
+    def test_a_wedged_status_does_not_wait_again_for_the_derp_map(self):
+        fake, problems = self.collect_with(TimeoutError(), FULL_MAP)
+        self.assertEqual(fake.calls, ["status?peers=false"])
+        # Still reported, so an open derpmap problem is not announced as cleared.
+        self.assertEqual([p.key for p in problems], ["tailnet:status", "tailnet:derpmap"])
 
     def test_derp_command_failure_reads_differently_from_empty(self):
         _, problems = self.collect_with(RUNNING, json.JSONDecodeError("x", "", 0))
@@ -154,14 +197,14 @@ class EngineIntegrationTest(unittest.TestCase):
         self.tmp = tempfile.TemporaryDirectory()
         self.state = str(Path(self.tmp.name) / "state.json")
         self.sent: list[str] = []
-        checks.__dict__.setdefault("_real_run_json", checks.run_json)
+        checks.__dict__.setdefault("_real_localapi", checks.LOCALAPI)
 
     def tearDown(self) -> None:
-        checks.run_json = checks.__dict__["_real_run_json"]
+        checks.LOCALAPI = checks.__dict__["_real_localapi"]
         self.tmp.cleanup()
 
     def run_once(self, stamp, status, derp):
-        checks.run_json = FakeTailscale(status, derp)
+        checks.LOCALAPI = FakeLocalAPI(status, derp)
         return engine.run_cycle(
             self.state, stamp, checks.collect, checks.render, lambda text, _id: self.sent.append(text) or True
         )
@@ -183,5 +226,364 @@ class EngineIntegrationTest(unittest.TestCase):
         self.assertEqual(self.sent, [])
 
 
+class FakeTailscaled(socketserver.ThreadingUnixStreamServer):
+    """Just enough of tailscaled's LocalAPI on a unix socket, with keep-alive."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path, LocalAPIHandler)
+        self.answers = {"status": RUNNING, "status?peers=false": RUNNING, "derpmap": FULL_MAP}
+        self.status_code = 200
+        self.stall = 0.0  # seconds to sit on a request before answering
+        self.requests: list[tuple[str, str | None, str | None]] = []
+        self.connections = 0
+        self.hang_up = False  # close after answering, without saying so
+        self.bus: queue.Queue = queue.Queue()  # notifies to stream; None ends the stream
+        self.watchers = 0
+        self.pings: dict[str, list[dict]] = {}  # address -> PingResults in turn; the last repeats
+
+
+class LocalAPIHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1  # type: ignore[attr-defined]
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server's naming
+        server: FakeTailscaled = self.server  # type: ignore[assignment]
+        server.requests.append((self.path, self.headers.get("Host"), self.headers.get("Sec-Tailscale")))
+        time.sleep(server.stall)
+        endpoint = self.path.removeprefix("/localapi/v0/")
+        if endpoint.startswith("watch-ipn-bus?"):
+            self.stream_bus(server)
+            return
+        payload = json.dumps(server.answers.get(endpoint, {})).encode()
+        self.close_connection = server.hang_up
+        self.send_response(server.status_code if endpoint in server.answers else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server's naming
+        server: FakeTailscaled = self.server  # type: ignore[assignment]
+        server.requests.append((self.path, self.headers.get("Host"), self.headers.get("Sec-Tailscale")))
+        time.sleep(server.stall)
+        query = dict(part.split("=", 1) for part in self.path.partition("?")[2].split("&"))
+        answers = server.pings.get(query.get("ip", ""), [{"Err": "no matching peer"}])
+        payload = json.dumps(answers.pop(0) if len(answers) > 1 else answers[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def stream_bus(self, server: "FakeTailscaled") -> None:
+        """Newline-delimited ipn.Notify JSON, chunked, until the test ends it."""
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        server.watchers += 1
+        notify = {"State": 6, "Health": {"Warnings": {}}}  # NotifyInitialState: Running
+        while notify is not None:
+            line = json.dumps(notify).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+            notify = server.bus.get()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def address_string(self) -> str:
+        return "unix"
+
+
+class LocalAPITest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.daemon = FakeTailscaled(f"{tmp.name}/tailscaled.sock")
+        threading.Thread(target=self.daemon.serve_forever, daemon=True).start()
+        self.addCleanup(self.daemon.server_close)
+        self.addCleanup(self.daemon.shutdown)
+        self.api = checks.LocalAPI(self.daemon.server_address)
+        self.addCleanup(self.api.close)
+        checks.__dict__.setdefault("_real_localapi", checks.LOCALAPI)
+        checks.LOCALAPI = self.api
+        self.addCleanup(setattr, checks, "LOCALAPI", checks.__dict__["_real_localapi"])
+
+    def paths(self) -> list[str]:
+        return [path for path, _, _ in self.daemon.requests]
+
+    def test_a_cycle_is_one_connection_and_a_peerless_status(self):
+        self.assertEqual(checks.check_tailscaled(), [])
+        self.assertEqual(self.paths(), ["/localapi/v0/status?peers=false", "/localapi/v0/derpmap"])
+        self.assertEqual(self.daemon.connections, 1)
+        _, host, marker = self.daemon.requests[0]
+        self.assertEqual((host, marker), ("local-tailscaled.sock", "localapi"))
+
+    def test_the_connection_is_kept_across_cycles(self):
+        checks.check_tailscaled()
+        checks.check_tailscaled()
+        self.assertEqual(len(self.daemon.requests), 4)
+        self.assertEqual(self.daemon.connections, 1)
+
+    def test_a_connection_closed_while_idle_is_retried_once(self):
+        self.daemon.hang_up = True  # a tailscaled restart between cycles
+        checks.check_tailscaled()
+        self.daemon.hang_up = False
+        self.assertEqual(checks.check_tailscaled(), [])
+
+    def test_the_answers_are_read(self):
+        self.daemon.answers["derpmap"] = EMPTY_MAP
+        self.daemon.answers["status?peers=false"] = RELAY_DOWN
+        keys = [p.key for p in checks.check_tailscaled()]
+        self.assertEqual(keys, [checks.health_key(RELAY_DOWN["Health"][0]), "tailnet:derpmap"])
+
+    def test_an_http_error_is_unreadable_not_healthy(self):
+        self.daemon.status_code = 403
+        problems = checks.check_tailscaled()
+        self.assertEqual([p.key for p in problems], ["tailnet:status", "tailnet:derpmap"])
+        self.assertIn("unreadable", problems[0].text)
+
+    def test_a_wedged_daemon_costs_one_timeout(self):
+        self.addCleanup(setattr, checks, "TIMEOUT", checks.TIMEOUT)
+        checks.TIMEOUT = 0.3
+        self.daemon.stall = 2
+        began = time.monotonic()
+        problems = checks.check_tailscaled()
+        self.assertLess(time.monotonic() - began, 1.0, "both reads share one TIMEOUT")
+        self.assertIn("TimeoutError", problems[0].text)
+        self.assertEqual(self.paths(), ["/localapi/v0/status?peers=false"])
+
+    def test_no_daemon_reads_as_unknown(self):
+        api = checks.LocalAPI(self.daemon.server_address + ".missing")
+        checks.LOCALAPI = api
+        problems = checks.check_tailscaled()
+        self.assertEqual([p.key for p in problems], ["tailnet:status", "tailnet:derpmap"])
+        self.assertIn("FileNotFoundError", problems[0].text)
+
+
+NETMAP_FULL = {"NetMap": {"DERPMap": FULL_MAP, "Peers": [{"Name": "hsb8"}]}}
+
+
+class BusPicture(unittest.TestCase):
+    """BusWatch.apply: which notifies are worth a cycle."""
+
+    def setUp(self) -> None:
+        self.wake = threading.Event()
+        self.bus = checks.BusWatch("/nonexistent", self.wake)
+        self.bus.apply({"State": 6, "Health": {"Warnings": {}}, **NETMAP_FULL})
+
+    def test_the_initial_snapshot_is_only_a_baseline(self):
+        self.assertFalse(self.wake.is_set())
+        self.assertEqual(self.bus.picture, {"state": 6, "health": [], "derp": ["26", "4"]})
+
+    def test_an_emptied_derp_map_wakes(self):
+        self.bus.apply({"NetMap": {"DERPMap": EMPTY_MAP}})
+        self.assertTrue(self.wake.is_set())
+
+    def test_peer_churn_and_engine_stats_do_not(self):
+        self.bus.apply({"NetMap": {"DERPMap": FULL_MAP, "Peers": []}})
+        self.bus.apply({"Engine": {"RBytes": 1, "WBytes": 2}})
+        self.assertFalse(self.wake.is_set())
+
+    def test_a_new_health_warning_wakes(self):
+        self.bus.apply({"Health": {"Warnings": {"no-derp-connection": {"Text": "could not connect"}}}})
+        self.assertTrue(self.wake.is_set())
+
+    def test_leaving_running_wakes(self):
+        self.bus.apply({"State": 2})  # NeedsLogin
+        self.assertTrue(self.wake.is_set())
+
+
+class BusStream(unittest.TestCase):
+    """BusWatch against a fake tailscaled streaming the bus over its socket."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.daemon = FakeTailscaled(f"{tmp.name}/tailscaled.sock")
+        threading.Thread(target=self.daemon.serve_forever, daemon=True).start()
+        self.addCleanup(self.daemon.server_close)
+        self.addCleanup(self.daemon.shutdown)
+        self.addCleanup(self.daemon.bus.put, None)
+        self.addCleanup(setattr, checks, "BUS_RETRY_SECONDS", checks.BUS_RETRY_SECONDS)
+        checks.BUS_RETRY_SECONDS = 0.05
+        self.wake = threading.Event()
+        self.bus = checks.BusWatch(self.daemon.server_address, self.wake).start()
+        self.addCleanup(self.bus.close)
+        self.assertTrue(until(lambda: self.bus.picture is not None), "initial state read")
+
+    def test_subscribes_with_the_mask_and_wakes_on_a_change(self):
+        path, _, marker = self.daemon.requests[0]
+        self.assertEqual(path, f"/localapi/v0/watch-ipn-bus?mask={checks.BUS_MASK}")
+        self.assertEqual(marker, "localapi")
+        self.daemon.bus.put({"Engine": {"RBytes": 1}})
+        self.daemon.bus.put({"Health": {"Warnings": {"no-derp-home": {}}}})
+        self.assertTrue(self.wake.wait(5))
+        self.assertEqual(self.bus.picture["health"], ["no-derp-home"])
+
+    def test_a_dropped_bus_wakes_and_reconnects(self):
+        self.daemon.bus.put(None)  # tailscaled restarting
+        self.assertTrue(self.wake.wait(5))
+        self.assertTrue(until(lambda: self.daemon.watchers == 2), "the bus is reopened")
+
+
+DIRECT = {"IP": "100.64.0.8", "NodeName": "csb0", "LatencySeconds": 0.012, "Endpoint": "152.53.64.166:41641"}
+VIA_DERP = {"IP": "100.64.0.8", "NodeName": "csb0", "LatencySeconds": 0.041, "DERPRegionID": 4, "DERPRegionCode": "fra"}
+MESH_PEERS = [
+    {"name": "csb0", "address": "100.64.0.8"},
+    {"name": "hsb1", "address": "100.64.0.7"},
+    {"name": "hsb8", "address": "100.64.0.3"},
+    {"name": "hsb9", "address": "100.64.0.12"},
+]
+
+
+class MeshJudge(unittest.TestCase):
+    """judge_mesh: each peer against its own history."""
+
+    def test_no_baseline_pages_for_nothing(self):
+        history = [(12, "d")] * (checks.MESH_MIN_SAMPLES - 1)
+        self.assertEqual(checks.judge_mesh("csb0", 41, "r", "fra", history), [])
+        self.assertEqual(checks.judge_mesh("csb0", 900, "d", "", history), [])
+
+    def test_a_normally_direct_peer_on_derp_pages(self):
+        history = [(12, "d")] * 30 + [(40, "r")] * 5
+        problems = checks.judge_mesh("csb0", 41, "r", "fra", history)
+        self.assertEqual([p.key for p in problems], ["mesh:csb0:derp"])
+        self.assertIn("fra", problems[0].text)
+        self.assertIn("12 ms typical", problems[0].text)
+
+    def test_a_peer_that_is_mostly_relayed_is_its_own_normal(self):
+        history = [(12, "d")] * 20 + [(40, "r")] * 30
+        self.assertEqual(checks.judge_mesh("hsb9", 41, "r", "fra", history), [])
+
+    def test_well_above_the_baseline_is_slow(self):
+        history = [(12, "d")] * 20
+        problems = checks.judge_mesh("csb0", 120, "d", "", history)
+        self.assertEqual([p.key for p in problems], ["mesh:csb0:slow"])
+
+    def test_a_small_link_jittering_is_not_slow(self):
+        history = [(2, "d")] * 20
+        self.assertEqual(checks.judge_mesh("hsb1", 9, "d", "", history), [], "under MESH_SLOW_MARGIN_MS")
+
+    def test_no_answer_is_not_judged(self):
+        self.assertEqual(checks.judge_mesh("hsb8", 0, "-", "", [(12, "d")] * 20), [])
+
+
+class MeshHistoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = f"{tmp.name}/mesh.json"
+
+    def test_the_window_is_fixed_size(self):
+        history = checks.MeshHistory(self.path, size=4)
+        for ms, via in [(1, "d"), (2, "d"), (3, "r"), (4, "-"), (5, "d"), (6, "r")]:
+            history.add("csb0", ms, via)
+        self.assertEqual(sorted(history.samples("csb0")), [(3, "r"), (4, "-"), (5, "d"), (6, "r")])
+
+    def test_it_survives_a_restart(self):
+        history = checks.MeshHistory(self.path, size=4)
+        for ms in range(6):
+            history.add("csb0", ms, "d")
+        history.flush()
+        again = checks.MeshHistory(self.path, size=4)
+        self.assertEqual(sorted(again.samples("csb0")), sorted(history.samples("csb0")))
+        again.add("csb0", 99, "r")
+        self.assertNotIn((2, "d"), again.samples("csb0"), "the cursor carried over: the oldest goes")
+
+    def test_a_cycle_of_peers_writes_it_once(self):
+        history = checks.MeshHistory(self.path, size=4)
+        with mock.patch.object(checks.engine, "atomic_write_state") as write:
+            for peer in ("csb0", "hsb0", "hsb8"):  # one cycle's checks
+                history.add(peer, 5, "d")
+                history.tick(1000.0)
+            self.assertEqual(write.call_count, 1)
+            history.add("csb0", 5, "d")
+            history.tick(1000.0 + checks.MESH_FLUSH_SECONDS)
+            self.assertEqual(write.call_count, 2, "the next cycle writes what this one added")
+            history.tick(2000.0)
+            self.assertEqual(write.call_count, 2, "nothing new, nothing written")
+
+    def test_a_damaged_file_starts_empty(self):
+        Path(self.path).write_text(json.dumps({"peers": {"csb0": {"next": 0, "ms": [1, 2], "via": "dx"}}}))
+        self.assertEqual(checks.MeshHistory(self.path).samples("csb0"), [])
+
+
+class MeshPing(unittest.TestCase):
+    """Pings through a fake tailscaled, one check per peer through the engine."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.daemon = FakeTailscaled(f"{tmp.name}/tailscaled.sock")
+        threading.Thread(target=self.daemon.serve_forever, daemon=True).start()
+        self.addCleanup(self.daemon.server_close)
+        self.addCleanup(self.daemon.shutdown)
+        api = checks.LocalAPI(self.daemon.server_address)
+        self.addCleanup(api.close)
+        for name, value in (
+            ("LOCALAPI", api),
+            ("MESH", checks.MeshHistory(f"{tmp.name}/mesh.json")),
+            ("MESH_PEERS", MESH_PEERS),
+        ):
+            self.addCleanup(setattr, checks, name, getattr(checks, name))
+            setattr(checks, name, value)
+
+    def test_pings_until_the_path_is_direct(self):
+        self.daemon.pings["100.64.0.8"] = [VIA_DERP, DIRECT]  # magicsock still finding the path
+        self.assertEqual(checks.ping_peer("100.64.0.8", time.monotonic() + 5), (12, "d", ""))
+        path, _, marker = self.daemon.requests[0]
+        self.assertEqual((path, marker), ("/localapi/v0/ping?ip=100.64.0.8&type=disco", "localapi"))
+        self.assertEqual(len(self.daemon.requests), 2, "a direct answer ends the round")
+
+    def test_derp_only_reports_the_region(self):
+        self.daemon.pings["100.64.0.8"] = [VIA_DERP]
+        self.assertEqual(checks.ping_peer("100.64.0.8", time.monotonic() + 5), (41, "r", "fra"))
+        self.assertEqual(len(self.daemon.requests), checks.MESH_PINGS)
+
+    def test_errors_are_no_path(self):
+        self.assertEqual(checks.ping_peer("100.64.0.99", time.monotonic() + 5), (0, "-", ""))
+
+    def test_a_check_records_its_sample(self):
+        self.daemon.pings["100.64.0.8"] = [VIA_DERP]
+        checks.MESH.add("csb0", 12, "d")
+        self.assertEqual(checks.check_mesh(MESH_PEERS[0]), [], "one sample is no baseline")
+        self.assertEqual(sorted(checks.MESH.samples("csb0")), [(12, "d"), (41, "r")])
+        self.assertTrue(Path(checks.MESH.path).exists())
+
+    def test_a_relayed_peer_pages_through_the_engine(self):
+        for _ in range(20):
+            checks.MESH.add("csb0", 12, "d")
+        self.daemon.pings["100.64.0.8"] = [VIA_DERP]
+        keys = [p.key for p in checks.collect()]
+        self.assertEqual(keys, ["mesh:csb0:derp"])
+
+    def test_peers_are_pinged_side_by_side(self):
+        for peer in MESH_PEERS:
+            self.daemon.pings[peer["address"]] = [DIRECT]
+        self.daemon.stall = 0.3
+        began = time.monotonic()
+        self.assertEqual(checks.collect(), [])
+        # Sequentially: status, derpmap and four pings = 1.8 s.
+        self.assertLess(time.monotonic() - began, 1.2)
+        self.assertGreater(self.daemon.connections, 1, "concurrent requests, one connection each")
+
+
+def until(condition, seconds: float = 5) -> bool:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
 if __name__ == "__main__":
     unittest.main()